@@ -23,9 +23,11 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "crispy_forms",
     "crispy_bootstrap4",
+    "rest_framework",
 ]
 
 MIDDLEWARE = [
+    "manager.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -56,12 +58,44 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "devagent.wsgi.application"
 
+# SQLite file by default, a server database is set with DATABASE_ENGINE, e.g. django.db.backends.postgresql,
+# and the other DATABASE_ variables, its driver has to be installed
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "ENGINE": os.environ.get("DATABASE_ENGINE", "manager.backends.sqlite3"),
+        "NAME": os.environ.get("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+        "USER": os.environ.get("DATABASE_USER", ""),
+        "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+        "HOST": os.environ.get("DATABASE_HOST", ""),
+        "PORT": os.environ.get("DATABASE_PORT", ""),
+        # seconds a thread keeps its connection between requests, 0 closes it after every request
+        "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+        # kept connections are checked at the start of requests, see manager.database
+        "CONN_HEALTH_CHECKS": True if os.environ.get("DATABASE_CONN_HEALTH_CHECKS", "False") == "True" else False,
+        # a pooler in transaction mode, e.g. PgBouncer, runs queries of a connection on different server
+        # connections, which cannot keep server-side cursors
+        "DISABLE_SERVER_SIDE_CURSORS": True if os.environ.get("DATABASE_POOLER", "False") == "True" else False,
     }
 }
+# applied to every SQLite connection in this order, busy_timeout first as switching journal mode waits for locks
+SQLITE_PRAGMAS = {
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # negative size is in KiB, not pages
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KB", "20000")),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE_MB", "256")) * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+# atomic blocks on SQLite take the write lock when they begin, see manager.backends.sqlite3
+SQLITE_TRANSACTION_MODE = os.environ.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE")
+# writes failing with "database is locked" are run again, WRITE_RETRY_ATTEMPTS times at most, after random delays
+# growing from WRITE_RETRY_DELAY_MS up to WRITE_RETRY_MAX_DELAY_MS, see manager.database
+WRITE_RETRY_ATTEMPTS = int(os.environ.get("WRITE_RETRY_ATTEMPTS", "5"))
+WRITE_RETRY_DELAY_MS = float(os.environ.get("WRITE_RETRY_DELAY_MS", "20"))
+WRITE_RETRY_MAX_DELAY_MS = float(os.environ.get("WRITE_RETRY_MAX_DELAY_MS", "1000"))
+# writes of a process run one at a time by a single thread instead of its threads waiting for the lock
+WRITE_QUEUE = True if os.environ.get("WRITE_QUEUE", "False") == "True" else False
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -78,6 +112,16 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # rendered table rows of manager.rows, keys contain versions of their data, so every process can have its own
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template-fragments",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("TEMPLATE_FRAGMENTS_MAX_ENTRIES", "10000"))},
+    },
+}
+
 # LANGUAGE VARIABLES
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "Europe/Warsaw"
@@ -100,10 +144,63 @@ EMAIL_PORT = os.environ.get("EMAIL_PORT", "")
 EMAIL_USE_TLS = True if os.environ.get("EMAIL_USE_TLS", "False") == "True" else False
 EMAIL_HOST_USER = os.environ.get("EMAIL_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_PASS", "")
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "webmaster@localhost")
 
 # PROJECT VARIABLES
 BASE_URL = os.environ.get("BASE_URL", "")
 AUTH_PASSWORD_AGE = int(os.environ.get("AUTH_PASSWORD_AGE", "7"))
+PROFILE_IMAGE_WORKERS = int(os.environ.get("PROFILE_IMAGE_WORKERS", "2"))
+REMINDER_LEAD_HOURS = int(os.environ.get("REMINDER_LEAD_HOURS", "24"))
+# under ASGI read-only views can run in parallel in a pool of ASYNC_VIEW_WORKERS threads,
+# it pays off when queries wait for a database server, see benchmark_asgi command.
+# Their templates are rendered in the pool too, template time of PERFORMANCE_SAMPLE_RATE is measured there.
+ASYNC_VIEWS = True if os.environ.get("ASYNC_VIEWS", "False") == "True" else False
+ASYNC_VIEW_WORKERS = int(os.environ.get("ASYNC_VIEW_WORKERS", "8"))
+# share of requests with Server-Timing header and log line of their query, template and total time, 0 to 1
+PERFORMANCE_SAMPLE_RATE = float(os.environ.get("PERFORMANCE_SAMPLE_RATE", "0"))
+METRICS_ENABLED = False if os.environ.get("METRICS_ENABLED", "True") == "False" else True
+# directory shared by worker processes, each writes its metrics there, empty it on server restart
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+# token of scrapers sent as "Authorization: Bearer <token>", staff users can see metrics without it
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# queries taking at least this many milliseconds are logged with their plan, 0 turns it off
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_BUFFER = int(os.environ.get("SLOW_QUERY_BUFFER", "100"))
+SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG", str(BASE_DIR / "slow_queries.log"))
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_QUERY_LOG,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "encoding": "utf-8",
+            # file is created with the first record
+            "delay": True,
+        },
+    },
+    "loggers": {
+        "manager.middleware": {
+            "handlers": ["console"],
+            "level": os.environ.get("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "manager.slow_queries": {"handlers": ["slow_queries"], "level": "WARNING", "propagate": False},
+    },
+}
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_PAGINATION_CLASS": "manager.api.pagination.KeysetCursorPagination",
+}
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap4"
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
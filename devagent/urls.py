@@ -8,6 +8,7 @@ from manager.views import error_403, error_404, error_500
 urlpatterns = [
     path("", include("users.urls")),
     path("", include("manager.urls")),
+    path("api/v1/", include("manager.api.urls")),
     path("admin/", admin.site.urls),
 ]
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Company, Offer, RecruitmentStep, Skill
+from .models import Company, Offer, RecruitmentStep, Reminder, Skill
 
 
 class CompanyAdmin(admin.ModelAdmin):
@@ -20,11 +20,19 @@ class OfferAdmin(admin.ModelAdmin):
         "latest_step",
     ]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("developer", "company").with_latest_step()
+
 
 class RecruitmentStepAdmin(admin.ModelAdmin):
     list_display = ["id", "offer", "status", "scheduled_on"]
 
 
+class ReminderAdmin(admin.ModelAdmin):
+    list_display = ["id", "step", "scheduled_on", "status", "sent_on"]
+    list_select_related = ["step"]
+
+
 class SkillAdmin(admin.ModelAdmin):
     list_display = ["id", "name"]
 
@@ -32,4 +40,5 @@ class SkillAdmin(admin.ModelAdmin):
 admin.site.register(Company, CompanyAdmin)
 admin.site.register(Offer, OfferAdmin)
 admin.site.register(RecruitmentStep, RecruitmentStepAdmin)
+admin.site.register(Reminder, ReminderAdmin)
 admin.site.register(Skill, SkillAdmin)
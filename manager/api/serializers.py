@@ -0,0 +1,120 @@
+from rest_framework import serializers
+
+from manager.models import Company, Offer, RecruitmentStep, Skill, StepType
+
+
+def get_requested_fields(request):
+    """Returns names from ?fields=a,b query parameter, None when all fields are requested"""
+    fields = request.query_params.get("fields") if request else None
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(",") if name.strip()}
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """Serializes only the fields listed in ?fields= of the request from context.
+    Meta.select_related and Meta.prefetch_related map field names to relations they need,
+    setup_queryset joins or prefetches only the relations of the fields being serialized."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get("request"))
+        if requested is None:
+            return
+        unknown = requested - self.fields.keys()
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}."})
+        for name in self.fields.keys() - requested:
+            self.fields.pop(name)
+
+    @classmethod
+    def get_field_names_to_serialize(cls, request):
+        return get_requested_fields(request) or set(cls.Meta.fields)
+
+    @classmethod
+    def setup_queryset(cls, queryset, request):
+        fields = cls.get_field_names_to_serialize(request)
+        select_related = getattr(cls.Meta, "select_related", {})
+        prefetch_related = getattr(cls.Meta, "prefetch_related", {})
+        related = [select_related[name] for name in fields if name in select_related]
+        if related:
+            queryset = queryset.select_related(*related)
+        prefetched = [prefetch_related[name] for name in fields if name in prefetch_related]
+        if prefetched:
+            queryset = queryset.prefetch_related(*prefetched)
+        return queryset
+
+
+class CompanySerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Company
+        fields = ["id", "name", "location", "website", "created_on", "updated_on"]
+
+
+class StepTypeSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = StepType
+        fields = ["id", "name", "created_on", "updated_on"]
+
+
+class SkillSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Skill
+        fields = ["id", "name"]
+
+
+class RecruitmentStepSerializer(SparseFieldsetSerializer):
+    type = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
+    class Meta:
+        model = RecruitmentStep
+        fields = ["id", "offer", "type", "status", "description", "scheduled_on", "created_on", "updated_on"]
+        select_related = {"type": "type"}
+
+
+class LatestStepSerializer(serializers.ModelSerializer):
+    type = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
+    class Meta:
+        model = RecruitmentStep
+        fields = ["id", "type", "status", "scheduled_on"]
+
+
+class OfferSerializer(SparseFieldsetSerializer):
+    company = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    skills_required = serializers.SlugRelatedField(slug_field="name", many=True, read_only=True)
+    skills_optional = serializers.SlugRelatedField(slug_field="name", many=True, read_only=True)
+    latest_step = LatestStepSerializer(read_only=True)
+
+    class Meta:
+        model = Offer
+        fields = [
+            "id",
+            "title",
+            "status",
+            "employment_type",
+            "level",
+            "company",
+            "skills_required",
+            "skills_optional",
+            "earnings_min",
+            "earnings_max",
+            "currency",
+            "remote",
+            "location",
+            "description",
+            "comments",
+            "application_sent_on",
+            "latest_step",
+            "created_on",
+            "updated_on",
+        ]
+        select_related = {"company": "company"}
+        prefetch_related = {"skills_required": "skills_required", "skills_optional": "skills_optional"}
+
+    @classmethod
+    def setup_queryset(cls, queryset, request):
+        queryset = super().setup_queryset(queryset, request)
+        if "latest_step" in cls.get_field_names_to_serialize(request):
+            queryset = queryset.with_latest_step()
+        return queryset
@@ -0,0 +1,12 @@
+from rest_framework.routers import SimpleRouter
+
+from manager.api import views
+
+router = SimpleRouter(trailing_slash=False)
+router.register("offers", views.OfferViewSet, basename="api-offer")
+router.register("steps", views.RecruitmentStepViewSet, basename="api-step")
+router.register("companies", views.CompanyViewSet, basename="api-company")
+router.register("step-types", views.StepTypeViewSet, basename="api-step-type")
+router.register("skills", views.SkillViewSet, basename="api-skill")
+
+urlpatterns = router.urls
@@ -0,0 +1,75 @@
+from django.core.exceptions import ValidationError
+from rest_framework import serializers, viewsets
+
+from manager.api.serializers import (
+    CompanySerializer,
+    OfferSerializer,
+    RecruitmentStepSerializer,
+    SkillSerializer,
+    StepTypeSerializer,
+)
+from manager.models import Company, Offer, RecruitmentStep, Skill, StepType
+
+
+class DeveloperScopedViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only endpoint of the requesting developer's objects, owner_field is a lookup to the owning User.
+    Related objects are joined or prefetched only for the fields being serialized."""
+
+    owner_field = None
+    ordering = ("-updated_on", "-created_on", "id")
+    filter_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.owner_field:
+            queryset = queryset.filter(**{self.owner_field: self.request.user})
+        filters = {
+            name: self.request.query_params[name] for name in self.filter_fields if name in self.request.query_params
+        }
+        try:
+            queryset = queryset.filter(**filters)
+        except (ValueError, ValidationError) as error:
+            raise serializers.ValidationError({"filters": str(error)})
+        return self.get_serializer_class().setup_queryset(queryset, self.request)
+
+
+class OfferViewSet(DeveloperScopedViewSet):
+    queryset = Offer.objects.all()
+    serializer_class = OfferSerializer
+    owner_field = "developer"
+    filter_fields = ("status",)
+
+
+class RecruitmentStepViewSet(DeveloperScopedViewSet):
+    queryset = RecruitmentStep.objects.all()
+    serializer_class = RecruitmentStepSerializer
+    owner_field = "offer__developer"
+    filter_fields = ("offer", "status")
+
+
+class CompanyViewSet(DeveloperScopedViewSet):
+    queryset = Company.objects.all()
+    serializer_class = CompanySerializer
+    owner_field = "added_by"
+
+
+class StepTypeViewSet(DeveloperScopedViewSet):
+    queryset = StepType.objects.all()
+    serializer_class = StepTypeSerializer
+    owner_field = "added_by"
+    # order of steptype_added_by_idx
+    ordering = ("name", "id")
+
+
+class SkillViewSet(DeveloperScopedViewSet):
+    """Skills are shared by all developers, ?mine=1 lists only the requesting developer's skills"""
+
+    queryset = Skill.objects.all()
+    serializer_class = SkillSerializer
+    ordering = ("name", "id")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.query_params.get("mine"):
+            queryset = queryset.filter(developers=self.request.user)
+        return queryset
@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from manager.database import close_unusable_connections
+from manager.middleware import request_timing
+
+# threads running read-only views under ASGI, every one keeps its own database connection
+ASYNC_VIEW_WORKERS = getattr(settings, "ASYNC_VIEW_WORKERS", 8)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_VIEW_WORKERS, thread_name_prefix="async-view")
+    return _executor
+
+
+def run_view(view, request, *args, **kwargs):
+    """Runs sync view and renders its response in the calling thread,
+    with the database connection handling of a WSGI request"""
+    close_old_connections()
+    close_unusable_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, "render", None)):
+            # templates of lazy TemplateResponse query the database too. PerformanceMiddleware gets the response
+            # rendered, so the time of its templates is recorded here.
+            timing = request_timing.get()
+            start = time.perf_counter()
+            response = response.render()
+            if timing is not None:
+                timing.template_seconds += time.perf_counter() - start
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Async view running a read-only sync view in the bounded pool of worker threads.
+    Django 3.2 has no async ORM and runs sync views under ASGI one at a time in a single thread,
+    views wrapped here run in parallel, at most ASYNC_VIEW_WORKERS at once."""
+
+    async def wrapper(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # active language and urlconf of the request are context variables, unlike the database connection
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(context.run, run_view, view, request, *args, **kwargs)
+        )
+
+    wrapper.__dict__.update(view.__dict__)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+def read_view(view):
+    """View of a read path, async when ASYNC_VIEWS is set for deployment with devagent.asgi"""
+    return async_view(view) if settings.ASYNC_VIEWS else view
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend beginning transactions of atomic blocks in SQLITE_TRANSACTION_MODE.
+    DEFERRED transaction takes the write lock with its first write, when another connection has written since
+    the transaction started reading SQLite fails at once with "database is locked", waiting could deadlock.
+    IMMEDIATE transaction takes the lock at BEGIN, which waits for it up to busy_timeout."""
+
+    def get_new_connection(self, conn_params):
+        if settings.SQLITE_TRANSACTION_MODE not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"SQLITE_TRANSACTION_MODE must be one of {', '.join(TRANSACTION_MODES)}.")
+        return super().get_new_connection(conn_params)
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {settings.SQLITE_TRANSACTION_MODE}")
@@ -0,0 +1,100 @@
+"""Tuning of database connections and coordination of writes, driven by settings.
+
+SQLite connections get SQLITE_PRAGMAS when they are opened. In WAL journal mode readers keep reading while
+a writer commits, with synchronous NORMAL commits do not wait for the disk, which stays consistent and loses
+at most the latest commits on power loss. Connections are kept by threads between requests for CONN_MAX_AGE
+seconds, so pragmas are applied once per thread. CONN_HEALTH_CHECKS of a database closes its kept connection
+at the start of a request when it stopped working, Django 3.2 only does it after an error of a query.
+
+SQLite has a single writer lock. Writes run by run_write, or functions decorated with atomic_write, are
+one transaction, which takes the lock when it begins, see manager.backends.sqlite3. When the lock is not
+released within busy_timeout the whole transaction is run again after a random delay. With WRITE_QUEUE
+writes of the process are run one at a time by a single thread, so only writes of other processes wait
+for the lock. Writes nested in a transaction are its part, so are writes of signal receivers of a save
+run by run_write. The retried function should do the write only, without messages or rendering."""
+
+import contextvars
+import functools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connections, transaction
+
+_writer = None
+
+
+def apply_sqlite_pragmas(connection):
+    if connection.vendor != "sqlite":
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        # the driver's connection, pragmas are not counted as queries nor logged
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def close_unusable_connections():
+    """Closes kept connections of databases with CONN_HEALTH_CHECKS that do not respond,
+    the next query opens a new one instead of failing"""
+    for connection in connections.all():
+        if (
+            connection.settings_dict.get("CONN_HEALTH_CHECKS")
+            and connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+def is_locked(error):
+    # "database is locked" of busy_timeout, "database table is locked" of shared cache
+    return isinstance(error, OperationalError) and "is locked" in str(error)
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database-writer")
+    return _writer
+
+
+def run_write(function):
+    """Runs function in a transaction, again when the database is locked, returns its result"""
+    if transaction.get_connection().in_atomic_block:
+        with transaction.atomic():
+            return function()
+    if settings.WRITE_QUEUE:
+        # active language and the request's timing are context variables
+        return get_writer().submit(contextvars.copy_context().run, run_queued_write, function).result()
+    return retry_locked(function)
+
+
+def run_queued_write(function):
+    """Runs write in the writer thread, which keeps its connection as a thread handling requests does"""
+    close_old_connections()
+    close_unusable_connections()
+    return retry_locked(function)
+
+
+def retry_locked(function):
+    """Runs function in a transaction, at most WRITE_RETRY_ATTEMPTS times while the database is locked,
+    with random delay up to exponentially growing limit, so that waiting writers do not retry together"""
+    for attempt in range(1, settings.WRITE_RETRY_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return function()
+        except OperationalError as error:
+            if not is_locked(error) or attempt == settings.WRITE_RETRY_ATTEMPTS:
+                raise
+        limit = min(settings.WRITE_RETRY_MAX_DELAY_MS, settings.WRITE_RETRY_DELAY_MS * 2 ** (attempt - 1))
+        time.sleep(random.uniform(0, limit) / 1000)
+
+
+def atomic_write(function):
+    """Decorated function is run by run_write"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return run_write(functools.partial(function, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from manager.importer import FORMATS, OFFER_FIELDS
+from manager.models import Offer, RecruitmentStep
+
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+OFFER_VALUES = ("id", "status", "company__name") + OFFER_FIELDS
+STEP_VALUES = ("offer_id", "id", "type__name", "status", "description", "scheduled_on", "created_on")
+# columns of CSV export, readable back by manager.importer
+EXPORT_FIELDS = ("id", "status", "company") + OFFER_FIELDS + ("skills_required", "skills_optional", "steps")
+SKILLS_SEPARATOR = "; "
+
+
+def get_offers(developer):
+    # the order of offer_developer_updated_idx, rows come straight from the index without sorting them all first
+    return Offer.objects.filter(developer=developer).order_by("-updated_on", "-created_on", "id").values(*OFFER_VALUES)
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def add_related(offers):
+    """Adds company, skill names and steps to a chunk of offer value dicts in one query per relation.
+    Rows are grouped by hand, prefetch_related_objects on model instances costs more than the queries."""
+    offers = {offer["id"]: offer for offer in offers}
+    for offer in offers.values():
+        offer["company"] = offer.pop("company__name")
+        offer.update({"skills_required": [], "skills_optional": [], "steps": []})
+
+    for name in ["skills_required", "skills_optional"]:
+        through = getattr(Offer, name).through
+        for offer_id, skill in through.objects.filter(offer_id__in=offers).values_list("offer_id", "skill__name"):
+            offers[offer_id][name].append(skill)
+        for offer in offers.values():
+            offer[name].sort()
+
+    steps = RecruitmentStep.objects.filter(offer_id__in=offers).order_by("id").values_list(*STEP_VALUES)
+    for offer_id, step_id, step_type, status, description, scheduled_on, created_on in steps:
+        offers[offer_id]["steps"].append(
+            {
+                "id": step_id,
+                "type": step_type,
+                "status": status,
+                "description": description,
+                "scheduled_on": isoformat(scheduled_on),
+                "created_on": isoformat(created_on),
+            }
+        )
+
+
+def iter_chunks(queryset, chunk_size):
+    """Yields lists of at most chunk_size offer dicts with related data, rows are fetched lazily"""
+    offers = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(offers, chunk_size)):
+        add_related(chunk)
+        yield chunk
+
+
+def export_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for offer in chunk:
+            offer["skills_required"] = SKILLS_SEPARATOR.join(offer["skills_required"])
+            offer["skills_optional"] = SKILLS_SEPARATOR.join(offer["skills_optional"])
+            offer["steps"] = json.dumps(offer["steps"]) if offer["steps"] else ""
+            writer.writerow(offer)
+        yield buffer.getvalue()
+
+
+def export_ndjson(chunks):
+    for chunk in chunks:
+        yield "".join(json.dumps(offer) + "\n" for offer in chunk)
+
+
+def export_offers(developer, file_format, chunk_size=1000):
+    """Yields developer's offers with their company, skills and steps as text, one piece per chunk of offers,
+    so memory does not grow with their number. The CSV header is yielded before any offer is read."""
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format {file_format}, choose one of: {', '.join(FORMATS)}")
+    chunks = iter_chunks(get_offers(developer), chunk_size)
+    return export_csv(chunks) if file_format == "csv" else export_ndjson(chunks)
@@ -1,7 +1,9 @@
 from django import forms
 from django.forms import DateTimeInput
+from django.utils.translation import gettext_lazy as _
 
-from manager.models import Company, Offer, RecruitmentStep
+from manager.importer import FORMATS
+from manager.models import Company, Offer, RecruitmentStep, Skill
 
 
 class OfferCreateForm(forms.ModelForm):
@@ -55,3 +57,24 @@ class RecruitmentStepForm(forms.ModelForm):
         widgets = {
             "scheduled_on": DateTimeInput(attrs={"type": "datetime-local", "interval": 15}),
         }
+
+
+class DeveloperSkillsForm(forms.Form):
+    skills = forms.ModelMultipleChoiceField(
+        queryset=Skill.objects.all(),
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+
+class OfferImportForm(forms.Form):
+    file = forms.FileField(
+        help_text=_(
+            "Columns: title, company, skills_required, skills_optional, employment_type, level, "
+            "earnings_min, earnings_max, currency, remote, location, description, comments."
+        )
+    )
+    format = forms.ChoiceField(
+        choices=[("", _("Guess from file name"))] + [(file_format, file_format.upper()) for file_format in FORMATS],
+        required=False,
+    )
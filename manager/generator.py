@@ -0,0 +1,236 @@
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from manager.importer import OfferImporter, insert_offers
+from manager.models import Company, DataVersion, Offer, RecruitmentStep, Skill, StepType
+
+User = get_user_model()
+
+EMAIL_DOMAIN = "generated.bench"
+TITLES = (
+    "Python Developer",
+    "Backend Engineer",
+    "Django Developer",
+    "Full Stack Developer",
+    "Data Engineer",
+    "DevOps Engineer",
+    "Software Engineer",
+    "Frontend Developer",
+    "Machine Learning Engineer",
+    "QA Automation Engineer",
+)
+SKILL_NAMES = (
+    "Python",
+    "Java",
+    "Golang",
+    "Django",
+    "Flask",
+    "FastAPI",
+    "PostgreSQL",
+    "MySQL",
+    "SQLite",
+    "Redis",
+    "Celery",
+    "Docker",
+    "Kubernetes",
+    "AWS",
+    "GCP",
+    "Azure",
+    "Linux",
+    "Git",
+    "JavaScript",
+    "TypeScript",
+    "React",
+    "Vue",
+    "HTML",
+    "CSS",
+    "REST",
+    "GraphQL",
+    "Kafka",
+    "RabbitMQ",
+    "Pandas",
+    "NumPy",
+    "Terraform",
+    "Ansible",
+)
+STEP_TYPE_NAMES = ("other", "introductory interview", "tech interview", "online quiz", "task online")
+LOCATIONS = ("Warszawa", "Kraków", "Wrocław", "Gdańsk", "Poznań", "Łódź", "Katowice", "Berlin", "London", None)
+WORDS = (
+    "team",
+    "product",
+    "platform",
+    "services",
+    "customers",
+    "scalable",
+    "cloud",
+    "data",
+    "modern",
+    "agile",
+    "remote",
+    "growth",
+    "quality",
+    "testing",
+    "architecture",
+    "performance",
+)
+# most offers are never answered, so earlier statuses are more common
+OFFER_STATUS_WEIGHTS = {
+    Offer.Statuses.CREATED: 30,
+    Offer.Statuses.APPLICATION_SENT: 30,
+    Offer.Statuses.ACTIVE: 15,
+    Offer.Statuses.SUCCESS: 3,
+    Offer.Statuses.CONTRACT_SIGNED: 2,
+    Offer.Statuses.NEGATIVE: 15,
+    Offer.Statuses.RESIGNED: 5,
+}
+STEP_STATUS_WEIGHTS = {
+    RecruitmentStep.Statuses.CREATED: 20,
+    RecruitmentStep.Statuses.PLANNED: 20,
+    RecruitmentStep.Statuses.FINISHED: 25,
+    RecruitmentStep.Statuses.SUCCESS: 15,
+    RecruitmentStep.Statuses.NEGATIVE: 15,
+    RecruitmentStep.Statuses.RESIGNED: 5,
+}
+# planned steps are scheduled up to this many days before or after now
+SCHEDULE_DAYS = 60
+
+
+@dataclass
+class GeneratorResult:
+    users: int = 0
+    companies: int = 0
+    offers: int = 0
+    steps: int = 0
+    skills: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows(self):
+        return self.users + self.companies + self.offers + self.steps + self.skills
+
+
+class DataGenerator:
+    """Generates developers with companies, step types, skills, offers and their steps with bulk inserts.
+    Every batch of offers is inserted by insert_offers of the importer, with M2M rows, skill bitsets and search index.
+    Output is reproducible for the same seed on an empty database."""
+
+    def __init__(self, seed=0, batch_size=5000, password="!"):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.password = password
+
+    def generate(self, users, companies=20, offers=1000, steps=2, skills=100, skills_per_offer=4, progress=None):
+        """Creates developers, each with companies and offers with their steps (per offer on average),
+        skills of offers are drawn from skills shared by all. Calls progress with GeneratorResult after every batch."""
+        result = GeneratorResult()
+        skill_ids = self.create_skills(skills, result)
+        for developer in self.create_developers(users, result):
+            with transaction.atomic():
+                company_ids = self.create_companies(developer, companies, result)
+                StepType.objects.bulk_create([StepType(name=name, added_by=developer) for name in STEP_TYPE_NAMES])
+                type_ids = list(StepType.objects.filter(added_by=developer).values_list("id", flat=True))
+                developer.skills.add(*self.random.sample(skill_ids, min(len(skill_ids), skills_per_offer * 2)))
+            for start in range(0, offers, self.batch_size):
+                with transaction.atomic():
+                    created = self.create_offers(
+                        developer, min(self.batch_size, offers - start), company_ids, skill_ids, skills_per_offer
+                    )
+                    result.offers += len(created)
+                    result.steps += self.create_steps(created, steps, type_ids)
+                if progress:
+                    progress(result)
+        return result
+
+    def create_skills(self, count, result):
+        """Returns ids of count skills, known skill names first, missing skills are created"""
+        names = list(SKILL_NAMES[:count]) + [f"Skill {i}" for i in range(len(SKILL_NAMES), count)]
+        existing = Skill.objects.count()
+        skill_ids = OfferImporter.get_or_create(Skill, set(names))
+        result.skills += Skill.objects.count() - existing
+        return sorted(skill_ids.values())
+
+    def create_developers(self, count, result):
+        start = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").count()
+        emails = [f"developer-{i}@{EMAIL_DOMAIN}" for i in range(start, start + count)]
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=email.split("@")[0], email=email, password=self.password) for email in emails]
+            )
+            developers = list(User.objects.filter(email__in=emails).order_by("id"))
+            # bulk inserts send no post_save signal
+            DataVersion.objects.bulk_create([DataVersion(developer=developer) for developer in developers])
+        result.users += len(developers)
+        return developers
+
+    def create_companies(self, developer, count, result):
+        Company.objects.bulk_create(
+            [
+                Company(
+                    name=f"{self.random.choice(WORDS).capitalize()} {developer.id}-{i}",
+                    location=self.random.choice(LOCATIONS),
+                    website=f"https://company-{developer.id}-{i}.example.com",
+                    added_by=developer,
+                )
+                for i in range(count)
+            ]
+        )
+        result.companies += count
+        return list(Company.objects.filter(added_by=developer).values_list("id", flat=True))
+
+    def create_offers(self, developer, count, company_ids, skill_ids, skills_per_offer):
+        offers, skills = [], []
+        for _ in range(count):
+            offers.append(self.build_offer(developer, company_ids))
+            chosen = self.random.sample(skill_ids, min(len(skill_ids), skills_per_offer))
+            split = self.random.randint(0, len(chosen))
+            skills.append((chosen[:split], chosen[split:]))
+
+        return insert_offers(offers, skills)
+
+    def build_offer(self, developer, company_ids):
+        earnings_min = self.random.choice([None, self.random.randrange(5000, 25000, 500)])
+        earnings_max = earnings_min + self.random.randrange(0, 10000, 500) if earnings_min else None
+        return Offer(
+            developer=developer,
+            company_id=self.random.choice(company_ids) if company_ids else None,
+            title=self.random.choice(TITLES),
+            status=self.random.choices(list(OFFER_STATUS_WEIGHTS), weights=OFFER_STATUS_WEIGHTS.values())[0],
+            employment_type=self.random.choice(Offer.EmploymentTypes.values),
+            level=self.random.choice(Offer.ExperienceLevels.values),
+            earnings_min=earnings_min,
+            earnings_max=earnings_max,
+            remote=self.random.random() < 0.6,
+            location=self.random.choice(LOCATIONS),
+            description=" ".join(self.random.choices(WORDS, k=self.random.randint(0, 120))) or None,
+        )
+
+    def create_steps(self, offers, count, type_ids):
+        now = timezone.now()
+        steps = []
+        for offer in offers:
+            for _ in range(self.random.randint(0, count * 2) if count else 0):
+                status = self.random.choices(list(STEP_STATUS_WEIGHTS), weights=STEP_STATUS_WEIGHTS.values())[0]
+                scheduled_on = None
+                if status == RecruitmentStep.Statuses.PLANNED:
+                    scheduled_on = now + timedelta(minutes=self.random.randint(-SCHEDULE_DAYS, SCHEDULE_DAYS) * 24 * 60)
+                steps.append(
+                    RecruitmentStep(
+                        offer_id=offer.id,
+                        type_id=self.random.choice(type_ids),
+                        status=status,
+                        scheduled_on=scheduled_on,
+                        description=" ".join(self.random.choices(WORDS, k=self.random.randint(0, 20))) or None,
+                    )
+                )
+        RecruitmentStep.objects.bulk_create(steps, batch_size=self.batch_size)
+        return len(steps)
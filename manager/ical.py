@@ -0,0 +1,151 @@
+import hashlib
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string, salted_hmac
+from django.utils.text import capfirst
+
+from manager.database import atomic_write
+from manager.models import DataVersion, RecruitmentStep
+
+TOKEN_SALT = "manager.ical.feed"
+# steps scheduled up to this many days ago stay in the feed
+PAST_DAYS = 30
+EVENT_DURATION = "PT1H"
+LINE_LENGTH = 75
+STEP_VALUES = (
+    "id",
+    "updated_on",
+    "scheduled_on",
+    "status",
+    "description",
+    "type__name",
+    "offer__title",
+    "offer__company__name",
+)
+
+
+def sign(developer_id, secret):
+    # tokens of users who never reset theirs sign the id alone, as they were issued before secrets
+    value = f"{developer_id}:{secret}" if secret else str(developer_id)
+    return salted_hmac(TOKEN_SALT, value, algorithm="sha256").hexdigest()[:32]
+
+
+def get_feed_token(user):
+    """Returns token of user's calendar feed URL, user's id and feed secret signed with SECRET_KEY"""
+    return f"{user.pk}-{sign(user.pk, user.feed_secret)}"
+
+
+@atomic_write
+def reset_feed_token(user):
+    """Replaces user's feed secret, URLs with the previous token stop working"""
+    user.feed_secret = get_random_string(32)
+    user.save(update_fields=["feed_secret"])
+    # pages showing the feed URL are rendered again
+    DataVersion.objects.bump([user.pk])
+
+
+def check_feed_token(token):
+    """Returns id and DataVersion of the developer the token was issued for in a single query,
+    None if token is not valid, was reset or the developer is inactive"""
+    developer_id, _separator, signature = token.partition("-")
+    if not developer_id.isdigit():
+        return None
+    row = (
+        DataVersion.objects.filter(developer_id=developer_id, developer__is_active=True)
+        .values_list("version", "developer__feed_secret")
+        .first()
+    )
+    if row is None or not constant_time_compare(signature, sign(int(developer_id), row[1])):
+        return None
+    return int(developer_id), row[0]
+
+
+def get_feed_since(now=None):
+    """Start of the feed's time range, at midnight so feed and its ETag only change with data or once a day"""
+    now = timezone.localtime(now)
+    return (now - timedelta(days=PAST_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_feed_etag(developer_id, version, since):
+    return f'"{hashlib.md5(f"{developer_id}:{version}:{since.isoformat()}".encode()).hexdigest()}"'
+
+
+def get_feed_steps(developer_id, since):
+    """Values of developer's planned steps in one range query over step_offer_scheduled_idx.
+    Only the columns shown are read, long offer descriptions are not."""
+    return (
+        RecruitmentStep.objects.filter(
+            offer__developer_id=developer_id, scheduled_on__gte=since, status=RecruitmentStep.Statuses.PLANNED
+        )
+        .order_by("scheduled_on", "id")
+        .values(*STEP_VALUES)
+    )
+
+
+def escape_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    """Splits content line into lines of at most 75 octets, continuation lines start with a space"""
+    encoded = line.encode()
+    if len(encoded) <= LINE_LENGTH:
+        return line
+    parts, start, limit = [], 0, LINE_LENGTH
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # do not split multi-byte characters
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, LINE_LENGTH - 1
+    return "\r\n ".join(parts)
+
+
+def format_datetime(value):
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(step, host, url, status_labels):
+    summary = f"{step['type__name'] or capfirst(RecruitmentStep._meta.verbose_name)}: {step['offer__title']}"
+    if step["offer__company__name"]:
+        summary += f" ({step['offer__company__name']})"
+    description = status_labels[step["status"]]
+    if step["description"]:
+        description += f"\n{step['description']}"
+    return [
+        "BEGIN:VEVENT",
+        f"UID:step-{step['id']}@{host}",
+        f"DTSTAMP:{format_datetime(step['updated_on'])}",
+        f"DTSTART:{format_datetime(step['scheduled_on'])}",
+        f"DURATION:{EVENT_DURATION}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(description)}",
+        f"URL:{url}",
+        "END:VEVENT",
+    ]
+
+
+def render_calendar(steps, host, step_url_prefix, name):
+    """Returns iCalendar (RFC 5545) text of step values, step URL is its id appended to step_url_prefix"""
+    # translated once per feed, not for every event
+    status_labels = {value: str(label) for value, label in RecruitmentStep.Statuses.choices}
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//DevAgent//Recruitment steps//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    for step in steps:
+        lines += render_event(step, host, f"{step_url_prefix}{step['id']}", status_labels)
+    lines.append("END:VCALENDAR")
+    return "".join(fold_line(line) + "\r\n" for line in lines)
@@ -0,0 +1,244 @@
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+
+from manager.database import atomic_write
+from manager.models import Company, DataVersion, Offer, Skill
+from manager.skills import create_offer_skill_bits, to_bitset
+
+FORMATS = ("csv", "ndjson")
+# Offer fields that can be imported as they are, company and skills are resolved by name
+OFFER_FIELDS = (
+    "title",
+    "employment_type",
+    "level",
+    "earnings_min",
+    "earnings_max",
+    "currency",
+    "remote",
+    "location",
+    "description",
+    "comments",
+)
+BOOLEAN_VALUES = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+SKILLS_SEPARATOR = re.compile(r"[;,]")
+MAX_REPORTED_ERRORS = 100
+# attempts of a chunk whose offer ids, allocated without a sequence, were taken by a concurrent insert
+ID_ALLOCATION_ATTEMPTS = 3
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, error))
+
+
+def read_rows(file, file_format):
+    """Yields (line number, row dict) from text file, one row at a time"""
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == "ndjson":
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield line_number, error
+                continue
+            yield line_number, row if isinstance(row, dict) else ValueError("row is not an object")
+    else:
+        raise ValueError(f"Unknown format {file_format}, choose one of: {', '.join(FORMATS)}")
+
+
+def guess_format(name):
+    return "ndjson" if name.lower().endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def parse_names(value):
+    """Returns list of names from a list or a string separated with commas or semicolons"""
+    if not value:
+        return []
+    names = value if isinstance(value, list) else SKILLS_SEPARATOR.split(str(value))
+    max_length = Skill._meta.get_field("name").max_length
+    return [str(name).strip()[:max_length] for name in names if str(name).strip()]
+
+
+def parse_offer(row):
+    """Returns validated Offer field values, company name and skill names of a row"""
+    if isinstance(row, Exception):
+        raise ValidationError(str(row))
+    values = {}
+    for name in OFFER_FIELDS:
+        if name not in row:
+            continue
+        value = row[name]
+        if isinstance(value, str):
+            value = value.strip()
+            if name == "remote":
+                value = BOOLEAN_VALUES.get(value.lower(), value)
+        model_field = Offer._meta.get_field(name)
+        if value in ("", None):
+            if not model_field.null:
+                # field default is used
+                continue
+            value = None
+        try:
+            values[name] = model_field.clean(value, None)
+        except ValidationError as error:
+            raise ValidationError(f"{name}: {'; '.join(error.messages)}")
+    if not values.get("title"):
+        raise ValidationError("title: This field cannot be blank.")
+    company = str(row.get("company") or "").strip()[: Company._meta.get_field("name").max_length]
+    return values, company, parse_names(row.get("skills_required")), parse_names(row.get("skills_optional"))
+
+
+def insert_offers(offers, skills):
+    """Inserts new offers with their skills, skills are (required skill ids, optional skill ids) of every offer.
+    M2M rows are inserted in bulk, without m2m_changed, so skill bitsets are created here right away."""
+    ids_allocated = allocate_ids(offers)
+    if not ids_allocated:
+        Offer.objects.bulk_create(offers)
+
+    required_rows, optional_rows, bits = [], [], {}
+    for offer, (required_ids, optional_ids) in zip(offers, skills):
+        required_rows += [(offer.id, skill_id) for skill_id in required_ids]
+        optional_rows += [(offer.id, skill_id) for skill_id in optional_ids]
+        bits[offer.id] = (to_bitset(required_ids), to_bitset(optional_ids))
+    insert_m2m_rows(Offer.skills_required.through, required_rows)
+    insert_m2m_rows(Offer.skills_optional.through, optional_rows)
+    if ids_allocated:
+        # with M2M rows inserted first, the SQLite FTS trigger indexes every offer with its skills once,
+        # instead of rewriting the document on every M2M row
+        Offer.objects.bulk_create(offers)
+    create_offer_skill_bits(bits)
+    return offers
+
+
+def insert_m2m_rows(through, rows):
+    """Inserts (offer id, skill id) rows without instantiating through models, the slowest part of bulk_create"""
+    if not rows:
+        return
+    table = connection.ops.quote_name(through._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} (offer_id, skill_id) VALUES (%s, %s)", rows)
+
+
+def allocate_ids(offers):
+    """Sets ids of new offers when the database cannot return them from bulk insert, e.g. SQLite.
+    On SQLite ids are taken from the table's AUTOINCREMENT sequence, advanced past them in the caller's
+    transaction, so ids of deleted offers are not used again and concurrent inserts wait for the write lock.
+    Returns True if ids were set."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return False
+    if connection.vendor != "sqlite":
+        last_id = Offer.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    else:
+        table = Offer._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE sqlite_sequence SET seq = seq + %s WHERE name = %s", [len(offers), table])
+            if not cursor.rowcount:
+                # no offer was inserted yet
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, len(offers)])
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+            last_id = cursor.fetchone()[0] - len(offers)
+    for offer_id, offer in enumerate(offers, start=last_id + 1):
+        offer.id = offer_id
+    return True
+
+
+class OfferImporter:
+    """Imports offers of a developer in chunks, every chunk takes a constant number of queries:
+    companies and skills are resolved with one lookup each and missing ones are created in bulk,
+    then offers and their M2M rows are inserted with bulk_create"""
+
+    def __init__(self, developer, chunk_size=1000):
+        self.developer = developer
+        self.chunk_size = chunk_size
+
+    def import_rows(self, rows, progress=None):
+        """Imports (line number, row) pairs, calls progress with ImportResult after every chunk"""
+        result = ImportResult()
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            parsed = []
+            for line, row in chunk:
+                try:
+                    parsed.append(parse_offer(row))
+                except ValidationError as error:
+                    result.add_error(line, "; ".join(error.messages))
+            result.created += self.import_chunk(parsed)
+            result.rows += len(chunk)
+            if progress:
+                progress(result)
+        return result
+
+    @atomic_write
+    def import_chunk(self, parsed):
+        for attempt in range(ID_ALLOCATION_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return self.create_offers(parsed)
+            except IntegrityError:
+                if attempt == ID_ALLOCATION_ATTEMPTS - 1:
+                    raise
+
+    def create_offers(self, parsed):
+        if not parsed:
+            return 0
+        companies = self.get_or_create(
+            Company, {company for _values, company, *_skills in parsed if company}, added_by=self.developer
+        )
+        skills = self.get_or_create(
+            Skill, {name for *_values, required, optional in parsed for name in required + optional}
+        )
+
+        offers = [
+            Offer(developer=self.developer, company_id=companies.get(company), **values)
+            for values, company, *_skills in parsed
+        ]
+        insert_offers(
+            offers,
+            [
+                ({skills[name] for name in required}, {skills[name] for name in optional})
+                for _values, _company, required, optional in parsed
+            ],
+        )
+        DataVersion.objects.bump([self.developer.pk])
+        return len(offers)
+
+    @staticmethod
+    def get_or_create(model, names, **defaults):
+        """Returns name to id mapping of model objects with given names, missing ones are created"""
+        if not names:
+            return {}
+        ids = dict(model.objects.filter(name__in=names).values_list("name", "id"))
+        missing = names - ids.keys()
+        if missing:
+            model.objects.bulk_create([model(name=name, **defaults) for name in missing], ignore_conflicts=True)
+            ids.update(model.objects.filter(name__in=missing).values_list("name", "id"))
+        return ids
@@ -0,0 +1,189 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+from manager.models import Offer, RecruitmentStep
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures requests per second and latency percentiles of the offer list, offer detail, step detail "
+        "and company list pages served by the ASGI handler, with concurrent requests on one event loop "
+        "as uvicorn serves them, or by the WSGI handler with a pool of threads as gunicorn --threads does. "
+        "Run it with ASYNC_VIEWS=True to serve the pages by async views and compare, "
+        "against a dedicated database, e.g. DATABASE_NAME=/tmp/bench.sqlite3, with testserver in ALLOWED_HOSTS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developer", required=True, help="Email of the developer requesting the pages.")
+        parser.add_argument("--handler", choices=("asgi", "wsgi"), default="asgi")
+        parser.add_argument("--requests", type=int, default=2000, help="Number of requests.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+        parser.add_argument(
+            "--query-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query, as a round trip to a database server would.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+        offer = Offer.objects.filter(developer=developer).order_by("id").first()
+        step = RecruitmentStep.objects.filter(offer__developer=developer).order_by("id").first()
+        if offer is None or step is None:
+            raise CommandError("Developer has no offers with steps.")
+        paths = [
+            reverse("offer-list"),
+            reverse("offer-detail", kwargs={"pk": offer.id}),
+            reverse("step-detail", kwargs={"pk": step.id}),
+            reverse("company-list"),
+        ]
+        client = Client()
+        client.force_login(developer)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        requests = list(islice(cycle(paths), options["requests"]))
+        if options["query_latency"]:
+            self.add_query_latency(options["query_latency"] / 1000)
+
+        try:
+            if options["handler"] == "asgi":
+                measure = self.measure_asgi
+            else:
+                measure = self.measure_wsgi
+            # first requests fill caches of templates and URL resolvers
+            measure(paths, cookie, 1)
+            statuses, latencies, seconds = measure(requests, cookie, options["concurrency"])
+        finally:
+            client.logout()
+
+        if set(statuses) != {200}:
+            raise CommandError(f"Unexpected response statuses: {sorted(set(statuses))}")
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{options['handler']} (ASYNC_VIEWS={settings.ASYNC_VIEWS}), concurrency {options['concurrency']}, "
+            f"query latency {options['query_latency']:g} ms: "
+            f"{len(requests) / seconds:.1f} requests/s, latency p50 {percentiles[49]:.1f} ms, "
+            f"p99 {percentiles[98]:.1f} ms"
+        )
+
+    @staticmethod
+    def add_query_latency(seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            # a thread reconnects with the same connection object
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        # every thread opens its own connection, kept for CONN_MAX_AGE
+        connection_created.connect(add_delay, weak=False)
+
+    @staticmethod
+    def measure_asgi(paths, cookie, concurrency):
+        application = get_asgi_application()
+
+        async def request(path):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+                "client": ("127.0.0.1", 50000),
+                "server": ("testserver", 80),
+            }
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+            status = None
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # the client stays connected until the response is sent
+                await asyncio.Future()
+
+            async def send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+
+            start = time.perf_counter()
+            await application(scope, receive, send)
+            return status, (time.perf_counter() - start) * 1000
+
+        async def connection(queue, results):
+            while queue:
+                results.append(await request(queue.pop()))
+
+        async def run():
+            queue, results = list(reversed(paths)), []
+            await asyncio.gather(*[connection(queue, results) for _ in range(concurrency)])
+            return results
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        seconds = time.perf_counter() - start
+        return [status for status, _latency in results], [latency for _status, latency in results], seconds
+
+    @staticmethod
+    def measure_wsgi(paths, cookie, concurrency):
+        application = get_wsgi_application()
+
+        def request(path):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "SCRIPT_NAME": "",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "REMOTE_ADDR": "127.0.0.1",
+                "HTTP_HOST": "testserver",
+                "HTTP_COOKIE": cookie,
+                "wsgi.version": (1, 0),
+                "wsgi.url_scheme": "http",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": io.StringIO(),
+                "wsgi.multithread": True,
+                "wsgi.multiprocess": False,
+                "wsgi.run_once": False,
+            }
+            statuses = []
+            start = time.perf_counter()
+            response = application(environ, lambda status, headers: statuses.append(int(status.split()[0])))
+            try:
+                b"".join(response)
+            finally:
+                # closes the request's database connection like a WSGI server does
+                response.close()
+            return statuses[0], (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(request, paths))
+        seconds = time.perf_counter() - start
+        return [status for status, _latency in results], [latency for _status, latency in results], seconds
@@ -0,0 +1,136 @@
+import random
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import OperationalError, connection
+from django.test import override_settings
+
+from manager.models import Offer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent reading and writing requests, as threads of a server handle them, against the database "
+        "configured as it was before tuning: rollback journal, synchronous commits and a connection per request, "
+        "and with SQLITE_PRAGMAS and CONN_MAX_AGE of settings. Writers save offers of the developer, "
+        "run it against a dedicated database, e.g. DATABASE_NAME=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developer", required=True, help="Email of the developer whose offers are used.")
+        parser.add_argument("--seconds", type=float, default=10, help="Duration of the run of every configuration.")
+        parser.add_argument("--readers", type=int, default=8, help="Threads making reading requests.")
+        parser.add_argument("--writers", type=int, default=2, help="Threads making writing requests.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Pragmas are compared on SQLite only.")
+        try:
+            self.developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+        self.offer_ids = list(Offer.objects.filter(developer=self.developer).values_list("id", flat=True))
+        if not self.offer_ids:
+            raise CommandError("Developer has no offers.")
+
+        configurations = {
+            "before": ({"journal_mode": "DELETE", "synchronous": "FULL"}, 0),
+            "tuned": (settings.SQLITE_PRAGMAS, connection.settings_dict["CONN_MAX_AGE"]),
+        }
+        results = {}
+        for name, (pragmas, max_age) in configurations.items():
+            results[name] = self.run(pragmas, max_age, options)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}: {results[name]['mode']}"))
+            for kind in ("read", "write"):
+                result = results[name][kind]
+                self.stdout.write(
+                    f"{kind}s: {result['per_second']:.1f}/s, latency p50 {result['p50']:.2f} ms, "
+                    f"p99 {result['p99']:.2f} ms, {result['errors']} errors"
+                )
+        for kind in ("read", "write"):
+            speedup = results["tuned"][kind]["per_second"] / max(results["before"][kind]["per_second"], 0.001)
+            self.stdout.write(self.style.SUCCESS(f"{kind} throughput: {speedup:.1f}x"))
+
+    def run(self, pragmas, max_age, options):
+        """Returns throughput and latency percentiles of reads and writes with pragmas and CONN_MAX_AGE"""
+        # threads share the settings of the database, connections of every thread read CONN_MAX_AGE from them
+        previous_max_age = connection.settings_dict["CONN_MAX_AGE"]
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                # journal mode is kept in the file, it is changed while no other connection is open
+                connection.close()
+                with connection.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    mode = f"journal {cursor.fetchone()[0]}, CONN_MAX_AGE {max_age}"
+                connection.close()
+
+                deadline = time.perf_counter() + options["seconds"]
+                latencies = {"read": [], "write": []}
+                errors = {"read": [], "write": []}
+                threads = [
+                    threading.Thread(target=self.work, args=(self.read, deadline, latencies["read"], errors["read"]))
+                    for _ in range(options["readers"])
+                ] + [
+                    threading.Thread(target=self.work, args=(self.write, deadline, latencies["write"], errors["write"]))
+                    for _ in range(options["writers"])
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            connection.settings_dict["CONN_MAX_AGE"] = previous_max_age
+
+        result = {"mode": mode}
+        for kind in ("read", "write"):
+            percentiles = statistics.quantiles(latencies[kind], n=100) if len(latencies[kind]) > 1 else [0] * 99
+            result[kind] = {
+                "per_second": len(latencies[kind]) / options["seconds"],
+                "p50": percentiles[49],
+                "p99": percentiles[98],
+                "errors": len(errors[kind]),
+            }
+        return result
+
+    @staticmethod
+    def work(request, deadline, latencies, errors):
+        """Makes requests until deadline, connection is handled by request signals as in a request of a server"""
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                request_started.send(sender=Command)
+                try:
+                    request()
+                except OperationalError as error:
+                    errors.append(error)
+                    continue
+                finally:
+                    request_finished.send(sender=Command)
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+    def read(self):
+        """Offer list and detail pages"""
+        offers = (
+            Offer.objects.filter(developer=self.developer, status__in=Offer.statuses_active())
+            .select_related("company")
+            .with_latest_step()
+            .order_by("-updated_on", "-created_on", "id")
+        )
+        list(offers[:25])
+        offer = Offer.objects.with_steps().select_related("company").get(pk=random.choice(self.offer_ids))
+        list(offer.steps.all())
+
+    def write(self):
+        """Offer update form"""
+        offer = Offer.objects.get(pk=random.choice(self.offer_ids))
+        offer.save()
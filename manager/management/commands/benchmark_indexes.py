@@ -0,0 +1,185 @@
+import os
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.models import OuterRef, Subquery
+
+from manager.models import Company, Offer, RecruitmentStep, StepType
+
+User = get_user_model()
+
+BENCH_EMAIL_DOMAIN = "index.bench"
+# single-column foreign key indexes that existed before composite indexes were added
+FOREIGN_KEY_INDEXES = [(Offer, "developer"), (RecruitmentStep, "offer"), (Company, "added_by"), (StepType, "added_by")]
+
+
+def add_database_argument(parser):
+    parser.add_argument(
+        "--database",
+        help="Name of the configured database, e.g. path of its SQLite file, confirming it may be seeded. "
+        "Required unless the database has no offers but benchmark ones.",
+    )
+
+
+def check_benchmark_database(database):
+    """Raises CommandError unless database names the configured one or it has no offers of other users,
+    benchmarks add a million rows and change indexes of the database they run against"""
+    name = str(connection.settings_dict["NAME"])
+    if database is not None:
+        if connection.vendor == "sqlite":
+            database, name = os.path.realpath(database), os.path.realpath(name)
+        if database != name:
+            raise CommandError(f"--database {database} is not the configured database {name}.")
+        return
+    if Offer.objects.exclude(developer__email__endswith=f"@{BENCH_EMAIL_DOMAIN}").exists():
+        raise CommandError(
+            f"Database {name} has offers, run benchmarks against a dedicated one, "
+            "e.g. DATABASE_NAME=/tmp/bench.sqlite3, or confirm it with --database."
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds the database with benchmark offers and compares EXPLAIN QUERY PLAN output and timings "
+        "of the offer and step access paths with single-column FK indexes and with composite indexes. "
+        "Run it against a dedicated database, e.g. DATABASE_NAME=/tmp/bench.sqlite3 with --database /tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        add_database_argument(parser)
+        parser.add_argument("--offers", type=int, default=1_000_000, help="Total number of benchmark offers.")
+        parser.add_argument("--developers", type=int, default=100, help="Number of developers owning the offers.")
+        parser.add_argument("--steps", type=int, default=2, help="Recruitment steps per offer.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs of every query.")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        check_benchmark_database(options["database"])
+        developers = self.seed(options["offers"], options["developers"], options["steps"], options["batch_size"])
+        developer = developers[0]
+        offer = Offer.objects.filter(developer=developer).order_by("id").first()
+        queries = self.get_queries(developer, offer)
+
+        try:
+            self.use_foreign_key_indexes()
+            before = {name: self.measure(queryset, options["repeat"]) for name, queryset in queries.items()}
+        finally:
+            self.use_composite_indexes()
+        after = {name: self.measure(queryset, options["repeat"]) for name, queryset in queries.items()}
+
+        for name in queries:
+            (before_plan, before_time), (after_plan, after_time) = before[name], after[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(f"before: {before_time:.3f} ms (median)")
+            self.stdout.write(before_plan)
+            self.stdout.write(f"after: {after_time:.3f} ms (median)")
+            self.stdout.write(after_plan)
+            self.stdout.write(self.style.SUCCESS(f"speedup: {before_time / after_time:.1f}x"))
+
+    def seed(self, offers, developers, steps, batch_size):
+        """Creates missing benchmark developers, companies, offers and steps, returns developers"""
+        User.objects.bulk_create(
+            [
+                User(username=f"index-bench-{i}", email=f"index-bench-{i}@{BENCH_EMAIL_DOMAIN}", password="!")
+                for i in range(developers)
+            ],
+            ignore_conflicts=True,
+        )
+        developers = list(User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").order_by("id"))
+        Company.objects.bulk_create(
+            [
+                Company(name=f"Bench company {developer.id}-{i}", added_by=developer)
+                for developer in developers
+                for i in range(10)
+            ],
+            ignore_conflicts=True,
+        )
+        companies = {}
+        for company in Company.objects.filter(added_by__in=developers):
+            companies.setdefault(company.added_by_id, []).append(company.id)
+
+        statuses = [status for status, _label in Offer.Statuses.choices]
+        created = Offer.objects.filter(developer__in=developers).count()
+        while created < offers:
+            size = min(batch_size, offers - created)
+            with transaction.atomic():
+                last_id = Offer.objects.order_by("id").values_list("id", flat=True).last() or 0
+                batch = []
+                for i in range(created, created + size):
+                    developer = developers[i % len(developers)]
+                    batch.append(
+                        Offer(
+                            title=f"Bench offer {i}",
+                            developer=developer,
+                            company_id=companies[developer.id][i % len(companies[developer.id])],
+                            status=statuses[i % len(statuses)],
+                        )
+                    )
+                Offer.objects.bulk_create(batch)
+                offer_ids = Offer.objects.filter(id__gt=last_id).values_list("id", flat=True)
+                RecruitmentStep.objects.bulk_create(
+                    [RecruitmentStep(offer_id=offer_id) for offer_id in offer_ids for _ in range(steps)]
+                )
+            created += size
+            self.stdout.write(f"seeded {created}/{offers} offers", ending="\r")
+        self.stdout.write("")
+        return developers
+
+    @staticmethod
+    def get_queries(developer, offer):
+        ordering = ("-updated_on", "-created_on", "id")
+        active_page = Offer.objects.filter(developer=developer, status__in=Offer.statuses_active()).order_by(*ordering)
+        archived_page = Offer.objects.filter(developer=developer).exclude(status__in=Offer.statuses_active())
+        latest_step_id = RecruitmentStep.objects.filter(offer=OuterRef("offer")).order_by("-id").values("id")[:1]
+        return {
+            "offer list: active offers page": active_page[:26],
+            "offer list: archived offers page": archived_page.order_by(*ordering)[:26],
+            "offer list: latest steps of a page": RecruitmentStep.objects.filter(
+                offer__in=list(archived_page.order_by(*ordering).values_list("id", flat=True)[:25]),
+                id=Subquery(latest_step_id),
+            ),
+            "offer detail: steps": offer.steps.all(),
+            "company list": Company.objects.filter(added_by=developer).order_by("-updated_on", "-created_on"),
+            "step form: step types": StepType.objects.filter(added_by=developer).order_by("name"),
+        }
+
+    @staticmethod
+    def measure(queryset, repeat):
+        """Returns query plan and median execution time in milliseconds"""
+        plan = queryset.explain()
+        list(queryset.all())
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return plan, statistics.median(timings)
+
+    @staticmethod
+    def composite_indexes():
+        return [
+            (model, index)
+            for model in {model for model, _field in FOREIGN_KEY_INDEXES}
+            for index in model._meta.indexes
+        ]
+
+    @staticmethod
+    def foreign_key_index(model, field):
+        return models.Index(fields=[field], name=f"bench_{model._meta.model_name}_{field}"[:30])
+
+    def use_foreign_key_indexes(self):
+        with connection.schema_editor() as editor:
+            for model, index in self.composite_indexes():
+                editor.remove_index(model, index)
+            for model, field in FOREIGN_KEY_INDEXES:
+                editor.add_index(model, self.foreign_key_index(model, field))
+
+    def use_composite_indexes(self):
+        with connection.schema_editor() as editor:
+            for model, field in FOREIGN_KEY_INDEXES:
+                editor.remove_index(model, self.foreign_key_index(model, field))
+            for model, index in self.composite_indexes():
+                editor.add_index(model, index)
@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.utils import timezone
+
+from manager.models import Company, Offer, RecruitmentStep, StepType
+
+TEMPLATES = {
+    "offer": "{% load manager_tags %}{% offer_rows items %}",
+    "company": "{% load manager_tags %}{% company_rows items %}",
+    "step": "{% load manager_tags %}{% step_rows items %}",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures rendering rows of tables by template tags of manager_tags, on objects built in memory. "
+        "Offer rows are rendered with the fragment cache empty and filled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="*", default=[1_000, 10_000], help="Numbers of rows.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed renders of every table.")
+
+    def handle(self, *args, **options):
+        cache = caches["template_fragments"]
+        for rows in options["rows"]:
+            items = self.get_items(rows)
+            for name, source in TEMPLATES.items():
+                template = Template(source)
+                context = Context({"items": items[name]})
+                render_time = self.measure(lambda: template.render(context), options["repeat"], cache.clear)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"== {rows} {name} rows"))
+                self.stdout.write(f"rendered: {render_time:.1f} ms (median)")
+                if name == "offer":
+                    cached_time = self.measure(lambda: template.render(context), options["repeat"])
+                    self.stdout.write(f"rows cached: {cached_time:.1f} ms (median)")
+            cache.clear()
+
+    @staticmethod
+    def get_items(rows):
+        """Returns offers of every status with every kind of latest step, their companies and steps,
+        as lists show them, without querying the database"""
+        now = timezone.now()
+        step_type = StepType(id=1, name="Technical interview", updated_on=now)
+        offer_statuses, step_statuses = Offer.Statuses.values, RecruitmentStep.Statuses.values
+        items = {"offer": [], "company": [], "step": []}
+        for i in range(1, rows + 1):
+            company = Company(
+                id=i,
+                name=f"Company {i}",
+                location="Kraków" if i % 2 else None,
+                website=f"company-{i}.dev" if i % 3 else None,
+                updated_on=now,
+            )
+            step = RecruitmentStep(
+                id=i,
+                type=step_type,
+                status=step_statuses[i % len(step_statuses)],
+                scheduled_on=now if i % 2 else None,
+                description=f"Step {i}",
+                updated_on=now,
+            )
+            offer = Offer(
+                id=i,
+                title=f"Offer {i}",
+                status=offer_statuses[i % len(offer_statuses)],
+                company=company,
+                updated_on=now,
+            )
+            offer.latest_steps = [step] if i % 5 else []
+            items["offer"].append(offer)
+            items["company"].append(company)
+            items["step"].append(step)
+        return items
+
+    @staticmethod
+    def measure(render, repeat, setup=None):
+        """Returns median render time in milliseconds"""
+        timings = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,116 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from manager.management.commands.benchmark_indexes import (
+    Command as BenchmarkIndexesCommand,
+)
+from manager.management.commands.benchmark_indexes import (
+    add_database_argument,
+    check_benchmark_database,
+)
+from manager.models import Offer
+from manager.search import (
+    FTS_TABLE,
+    build_match_query,
+    get_terms,
+    search_offers,
+    search_offers_fallback,
+)
+
+# vocabulary of generated benchmark offer descriptions
+WORDS = (
+    "python django flask fastapi celery redis postgres sqlite docker kubernetes terraform aws gcp azure linux "
+    "java kotlin spring scala golang rust typescript react angular vue node graphql rest api microservices "
+    "backend frontend fullstack devops data engineer analyst scientist machine learning senior junior regular "
+    "lead architect remote hybrid office warsaw krakow wroclaw gdansk poznan berlin london startup fintech "
+    "ecommerce healthcare insurance banking gaming agile scrum team product ownership testing pytest ci cd "
+    "monitoring observability performance scaling security cloud migration legacy greenfield mentoring english"
+).split()
+# long tail of rarer words, e.g. "x7python", that are not prefixed by common ones as in natural text,
+# descriptions draw words with Zipf distribution
+VOCABULARY = WORDS + [f"x{i}{word}" for i in range(1, 50) for word in WORDS]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+DESCRIPTION_WORDS = 40
+QUERIES = [
+    "python",
+    "django remote",
+    "senior kotlin spring",
+    "senior kot*",
+    "fin*",
+    "gdansk healthcare pytest",
+    "x12kotlin",
+    "x7rust mentoring",
+    "nonexistent",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds benchmark offers with generated descriptions and compares the FTS5 offer search "
+        "with plain icontains filtering. Run it against a dedicated database, "
+        "e.g. DATABASE_NAME=/tmp/bench.sqlite3 with --database /tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        add_database_argument(parser)
+        parser.add_argument("--offers", type=int, default=1_000_000, help="Total number of benchmark offers.")
+        parser.add_argument("--developers", type=int, default=100, help="Number of developers owning the offers.")
+        parser.add_argument("--repeat", type=int, default=10, help="Timed runs of every query.")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--refill", action="store_true", help="Regenerate descriptions of all benchmark offers.")
+
+    def handle(self, *args, **options):
+        check_benchmark_database(options["database"])
+        seeder = BenchmarkIndexesCommand(stdout=self.stdout, stderr=self.stderr)
+        developers = seeder.seed(options["offers"], options["developers"], 0, options["batch_size"])
+        self.fill_descriptions(developers, options["batch_size"], options["refill"])
+        developer = developers[0]
+
+        self.stdout.write(f"offers of developer: {Offer.objects.filter(developer=developer).count()}")
+        for query in QUERIES:
+            terms = get_terms(query)
+            fts_time, fts_count = self.measure(lambda: search_offers(developer, query), options["repeat"])
+            like_time, like_count = self.measure(
+                lambda: search_offers_fallback(developer, terms, 50), options["repeat"]
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {query!r}"))
+            self.stdout.write(f"match query: {build_match_query(terms)}")
+            self.stdout.write(f"icontains: {like_time:.3f} ms (median), {like_count} results")
+            self.stdout.write(f"fts5: {fts_time:.3f} ms (median), {fts_count} results")
+            self.stdout.write(self.style.SUCCESS(f"speedup: {like_time / fts_time:.1f}x"))
+
+    def fill_descriptions(self, developers, batch_size, refill=False):
+        """Generates deterministic descriptions of benchmark offers, FTS index follows via triggers"""
+        offers = Offer.objects.filter(developer__in=developers)
+        if not refill:
+            offers = offers.filter(description__isnull=True)
+        offer_ids = list(offers.values_list("id", flat=True))
+        if not offer_ids:
+            return
+        for start in range(0, len(offer_ids), batch_size):
+            rows = []
+            for offer_id in offer_ids[start : start + batch_size]:
+                words = random.Random(offer_id).choices(VOCABULARY, weights=WEIGHTS, k=DESCRIPTION_WORDS)
+                rows.append((" ".join(words).capitalize(), offer_id))
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany("UPDATE manager_offer SET description = %s WHERE id = %s", rows)
+            self.stdout.write(f"described {start + len(rows)}/{len(offer_ids)} offers", ending="\r")
+        self.stdout.write("")
+        # merges index segments written by the triggers, like FTS5 automerge eventually does
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+    @staticmethod
+    def measure(search, repeat):
+        """Returns median execution time in milliseconds and number of results"""
+        results = search()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), len(results)
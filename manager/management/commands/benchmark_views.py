@@ -0,0 +1,171 @@
+import json
+import platform
+import statistics
+import time
+from http.cookies import SimpleCookie
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from manager.ical import get_feed_token
+from manager.models import Company, Offer, RecruitmentStep, Skill
+
+User = get_user_model()
+
+URLCONFS = ("manager.urls", "users.urls")
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests every named URL of manager and users apps as a developer and records latency percentiles "
+        "and query counts as JSON, to compare runs on data from generate_data command. Every request is rolled "
+        "back, so the data stays the same. Run it against a dedicated database, e.g. DATABASE_NAME=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developer", required=True, help="Email of the developer requesting the pages.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests of every URL.")
+        parser.add_argument("--names", nargs="*", default=(), help="Only URLs with these names.")
+        parser.add_argument("--exclude", nargs="*", default=(), help="URLs with these names are skipped.")
+        parser.add_argument("--output", default="-", help='Path of the JSON results file, "-" writes standard output.')
+        parser.add_argument("--compare", help="Path of JSON results of an earlier run to compare with.")
+
+    def handle(self, *args, **options):
+        try:
+            self.developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+        self.offer = Offer.objects.filter(developer=self.developer, steps__isnull=False).order_by("id").first()
+        if self.offer is None:
+            raise CommandError("Developer has no offers with steps.")
+        self.step = self.offer.steps.order_by("id").first()
+        self.company = Company.objects.filter(added_by=self.developer).order_by("id").first()
+
+        client = Client()
+        client.force_login(self.developer)
+        session_cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        results = {}
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for name, path in self.get_paths(options["names"], options["exclude"]):
+                    results[name] = self.measure(client, session_cookie, path, options["repeat"])
+                    self.stderr.write(self.format_result(name, results[name]))
+        finally:
+            client.logout()
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "sizes": self.get_sizes(),
+            "results": results,
+        }
+        content = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(content)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(content)
+            self.stderr.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                self.compare(json.load(file), report)
+
+    def get_paths(self, names, exclude):
+        """Yields name and path of every named URL, with objects of the developer as its arguments"""
+        for urlconf in URLCONFS:
+            for pattern in get_resolver(urlconf).url_patterns:
+                if not isinstance(pattern, URLPattern) or not pattern.name:
+                    continue
+                if (names and pattern.name not in names) or pattern.name in exclude:
+                    continue
+                kwargs = self.get_kwargs(pattern.name, pattern.pattern.regex.groupindex)
+                yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+    def get_kwargs(self, name, params):
+        objects = {"offer": self.offer, "step": self.step, "company": self.company}
+        kwargs = {}
+        for param in params:
+            if param == "pk":
+                kwargs[param] = objects[name.split("-")[0]].pk
+            elif param == "offer_id":
+                kwargs[param] = self.offer.pk
+            elif param == "uidb64":
+                kwargs[param] = urlsafe_base64_encode(force_bytes(self.developer.pk))
+            elif param == "token" and "uidb64" in params:
+                kwargs[param] = default_token_generator.make_token(self.developer)
+            elif param == "token":
+                kwargs[param] = get_feed_token(self.developer)
+            else:
+                raise CommandError(f"No value of {param} argument of {name} URL.")
+        return kwargs
+
+    @staticmethod
+    def measure(client, session_cookie, path, repeat):
+        """Returns status, size, query count and latency percentiles in milliseconds of GET requests of path"""
+        timings, queries = [], []
+        # the first request fills caches of templates and URL resolvers and is not timed
+        for _ in range(repeat + 1):
+            # previous response may have logged out or set a message cookie
+            client.cookies = SimpleCookie({settings.SESSION_COOKIE_NAME: session_cookie})
+            with transaction.atomic(), CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = client.get(path)
+                content = b"".join(response.streaming_content) if response.streaming else response.content
+                timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(context))
+                transaction.set_rollback(True)
+        timings = timings[1:]
+        percentiles = statistics.quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else timings * 99
+        return {
+            "path": path,
+            "status": response.status_code,
+            "bytes": len(content),
+            "queries": max(queries[1:]),
+            "mean_ms": round(statistics.mean(timings), 3),
+            "p50_ms": round(percentiles[49], 3),
+            "p90_ms": round(percentiles[89], 3),
+            "p99_ms": round(percentiles[98], 3),
+        }
+
+    def get_sizes(self):
+        return {
+            "users": User.objects.count(),
+            "companies": Company.objects.count(),
+            "offers": Offer.objects.count(),
+            "steps": RecruitmentStep.objects.count(),
+            "skills": Skill.objects.count(),
+            "developer_offers": Offer.objects.filter(developer=self.developer).count(),
+            "developer_steps": RecruitmentStep.objects.filter(offer__developer=self.developer).count(),
+        }
+
+    @staticmethod
+    def format_result(name, result):
+        return (
+            f"{name:<24} {result['status']} {result['queries']:>4} queries  p50 {result['p50_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms"
+        )
+
+    def compare(self, before, after):
+        self.stderr.write(self.style.MIGRATE_HEADING(f"Compared with run of {before['created']}:"))
+        for name, result in after["results"].items():
+            if name not in before["results"]:
+                continue
+            previous = before["results"][name]
+            change = (result["p50_ms"] / previous["p50_ms"] - 1) * 100 if previous["p50_ms"] else 0
+            self.stderr.write(
+                f"{name:<24} p50 {previous['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms ({change:+.0f}%)  "
+                f"queries {previous['queries']} -> {result['queries']}"
+            )
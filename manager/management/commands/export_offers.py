@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.exporter import export_offers
+from manager.importer import FORMATS
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Exports offers of a developer with their steps, companies and skills as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developer", required=True, help="Email of the developer whose offers are exported.")
+        parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format.")
+        parser.add_argument("--output", default="-", help='Path of the output file, "-" writes standard output.')
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Offers read and prefetched at once.")
+
+    def handle(self, *args, **options):
+        try:
+            developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+
+        pieces = export_offers(developer, options["format"], options["chunk_size"])
+        if options["output"] == "-":
+            for piece in pieces:
+                self.stdout.write(piece, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as file:
+            for piece in pieces:
+                file.write(piece)
+        self.stderr.write(self.style.SUCCESS(f"Offers exported to {options['output']}."))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from manager.generator import EMAIL_DOMAIN, DataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates developers with companies, skills, offers and recruitment steps in bulk, "
+        f"developers get emails developer-<number>@{EMAIL_DOMAIN}. "
+        "Run it against a dedicated database, e.g. DATABASE_NAME=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10, help="Number of developers created.")
+        parser.add_argument("--companies", type=int, default=20, help="Companies per developer.")
+        parser.add_argument("--offers", type=int, default=1000, help="Offers per developer.")
+        parser.add_argument("--steps", type=int, default=2, help="Recruitment steps per offer on average.")
+        parser.add_argument("--skills", type=int, default=100, help="Skills shared by all offers.")
+        parser.add_argument("--skills-per-offer", type=int, default=4, help="Required and optional skills of an offer.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Offers inserted at once.")
+
+    def handle(self, *args, **options):
+        generator = DataGenerator(options["seed"], options["batch_size"])
+        result = generator.generate(
+            options["users"],
+            companies=options["companies"],
+            offers=options["offers"],
+            steps=options["steps"],
+            skills=options["skills"],
+            skills_per_offer=options["skills_per_offer"],
+            progress=lambda result: self.stdout.write(
+                f"{result.offers} offers, {result.steps} steps generated", ending="\r"
+            ),
+        )
+        self.stdout.write("")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {result.users} developers, {result.companies} companies, {result.skills} skills, "
+                f"{result.offers} offers and {result.steps} steps in {result.seconds:.1f}s "
+                f"({result.rows / result.seconds:.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,49 @@
+import io
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.importer import FORMATS, OfferImporter, guess_format, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Imports offers of a developer from a CSV or NDJSON file, streaming it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Path of the file to import, "-" reads standard input.')
+        parser.add_argument("--developer", required=True, help="Email of the developer owning imported offers.")
+        parser.add_argument("--format", choices=FORMATS, help="File format, guessed from its extension by default.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows inserted in one transaction.")
+
+    def handle(self, *args, **options):
+        try:
+            developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+
+        file_format = options["format"] or guess_format(options["path"])
+        if options["path"] == "-":
+            file = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        else:
+            file = open(options["path"], encoding="utf-8-sig", newline="")
+
+        with file:
+            result = OfferImporter(developer, options["chunk_size"]).import_rows(
+                read_rows(file, file_format), progress=self.report_progress
+            )
+
+        self.stdout.write("")
+        for line, error in result.errors:
+            self.stderr.write(f"line {line}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} offers imported, {result.failed} rows failed, "
+                f"{result.rows} rows in {result.seconds:.1f} s ({result.rows_per_second:.0f} rows/s)."
+            )
+        )
+
+    def report_progress(self, result):
+        self.stdout.write(f"{result.rows} rows, {result.rows_per_second:.0f} rows/s", ending="\r")
@@ -0,0 +1,47 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from manager.reminders import ReminderDispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Sends email reminders of planned recruitment steps, once or in a loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lead-hours",
+            type=int,
+            default=settings.REMINDER_LEAD_HOURS,
+            help="Steps scheduled within this many hours are reminded.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Steps claimed and sent at once.")
+        parser.add_argument("--loop", action="store_true", help="Keep checking for due reminders until stopped.")
+        parser.add_argument("--interval", type=float, default=60, help="Seconds between checks with --loop.")
+
+    def handle(self, *args, **options):
+        dispatcher = ReminderDispatcher(timedelta(hours=options["lead_hours"]), options["batch_size"])
+        while True:
+            try:
+                result = dispatcher.dispatch()
+            except Exception:
+                if not options["loop"]:
+                    raise
+                # e.g. the mail server is down, reminders not sent are claimed again by a later check
+                logger.exception("Reminders could not be dispatched")
+            else:
+                if result.sent or result.failed or not options["loop"]:
+                    self.stderr.write(
+                        self.style.SUCCESS(
+                            f"{result.sent} reminders sent, {result.failed} failed "
+                            f"in {result.seconds:.2f}s ({result.messages_per_second:.0f}/s)."
+                        )
+                    )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
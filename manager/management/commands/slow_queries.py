@@ -0,0 +1,53 @@
+import glob
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.slow_queries import aggregate, read_log
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregates the slow query log by query fingerprint, queries differing only by parameters are counted "
+        "together. Prints the worst fingerprints by total time with their views, code locations "
+        "and plan of the slowest query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log", default=settings.SLOW_QUERY_LOG, help="Slow query log, its rotated files are read too."
+        )
+        parser.add_argument("--apps", nargs="*", default=["manager", "users"], help="Queries made by code of apps.")
+        parser.add_argument("--limit", type=int, default=10, help="Number of fingerprints shown.")
+        parser.add_argument("--sort", choices=["total", "max", "mean", "count"], default="total")
+        parser.add_argument("--json", action="store_true", help="Print fingerprints as JSON.")
+
+    def handle(self, *args, **options):
+        # rotated files hold older records
+        paths = sorted(glob.glob(f"{glob.escape(options['log'])}.*"), reverse=True)
+        paths += [options["log"]] if os.path.exists(options["log"]) else []
+        if not paths:
+            raise CommandError(f"No slow query log {options['log']}, queries are logged when SLOW_QUERY_MS is set.")
+
+        results = aggregate(read_log(paths), options["apps"] or None)
+        key = "count" if options["sort"] == "count" else f"{options['sort']}_ms"
+        results = sorted(results, key=lambda stats: stats[key], reverse=True)[: options["limit"]]
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for position, stats in enumerate(results, 1):
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{position}. {stats['fingerprint']}  {stats['count']} queries  total {stats['total_ms']:.1f} ms  "
+                    f"mean {stats['mean_ms']:.1f} ms  max {stats['max_ms']:.1f} ms"
+                )
+            )
+            self.stdout.write(f"  {stats['normalized']}")
+            self.stdout.write(f"  views: {', '.join(stats['views'])}")
+            self.stdout.write(f"  locations: {', '.join(stats['locations'])}")
+            self.stdout.write(f"  slowest params: {json.dumps(stats['example']['params'])}")
+            for row in stats["example"]["plan"] or ():
+                self.stdout.write(f"    {row}")
@@ -0,0 +1,132 @@
+import functools
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import override_settings
+
+from manager import database
+from manager.models import Offer
+
+User = get_user_model()
+
+CONFIGURATIONS = {
+    # transactions of atomic blocks read first and take the write lock later, errors are not retried
+    "before": {"SQLITE_TRANSACTION_MODE": "DEFERRED", "WRITE_RETRY_ATTEMPTS": 1, "WRITE_QUEUE": False},
+    "coordinated": {"SQLITE_TRANSACTION_MODE": "IMMEDIATE", "WRITE_QUEUE": False},
+    "queued": {"SQLITE_TRANSACTION_MODE": "IMMEDIATE", "WRITE_QUEUE": True},
+}
+
+
+def update_offer(offer_id):
+    """Offer update form: the offer is read and saved, signals bump the developer's DataVersion"""
+    offer = Offer.objects.get(pk=offer_id)
+    offer.save()
+
+
+def login(user_id):
+    update_last_login(None, User.objects.get(pk=user_id))
+
+
+def run_writers(overrides, seconds, threads, offer_ids, user_ids):
+    """Runs threads of a worker process making writes until seconds pass,
+    returns latencies of writes in milliseconds and number of "database is locked" errors"""
+    latencies, errors = [], []
+
+    def work():
+        try:
+            while time.perf_counter() < deadline:
+                if random.random() < 0.5:
+                    write = functools.partial(
+                        database.run_write, functools.partial(update_offer, random.choice(offer_ids))
+                    )
+                else:
+                    write = functools.partial(login, random.choice(user_ids))
+                start = time.perf_counter()
+                try:
+                    write()
+                except OperationalError as error:
+                    if not database.is_locked(error):
+                        raise
+                    errors.append(error)
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+    with override_settings(**overrides):
+        deadline = time.perf_counter() + seconds
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if settings.WRITE_QUEUE:
+            # connection of the writer thread
+            database.get_writer().submit(lambda: connection.close()).result()
+    return latencies, len(errors)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent writers in several processes, as workers of a server, every one with threads saving "
+        "offers as the offer update form does and saving last_login of users as logins do. Compares transactions "
+        "beginning DEFERRED without retries with the write coordination of manager.database, "
+        "without and with WRITE_QUEUE. Run it against a dedicated SQLite database, "
+        "e.g. DATABASE_NAME=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developer", required=True, help="Email of the developer whose offers are saved.")
+        parser.add_argument("--processes", type=int, default=4, help="Worker processes.")
+        parser.add_argument("--threads", type=int, default=4, help="Writing threads of every process.")
+        parser.add_argument("--seconds", type=float, default=10, help="Duration of the run of every configuration.")
+        parser.add_argument("--configurations", nargs="*", choices=list(CONFIGURATIONS), default=list(CONFIGURATIONS))
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Writes are coordinated for SQLite only.")
+        try:
+            developer = User.objects.get(email=options["developer"])
+        except User.DoesNotExist:
+            raise CommandError(f"Developer {options['developer']} does not exist.")
+        offer_ids = list(Offer.objects.filter(developer=developer).values_list("id", flat=True))
+        if not offer_ids:
+            raise CommandError("Developer has no offers.")
+        user_ids = list(User.objects.order_by("id").values_list("id", flat=True)[:100])
+
+        for name in options["configurations"]:
+            # processes are forked without connections of this one
+            connections.close_all()
+            with ProcessPoolExecutor(options["processes"], mp_context=multiprocessing.get_context("fork")) as pool:
+                runs = [
+                    pool.submit(
+                        run_writers,
+                        CONFIGURATIONS[name],
+                        options["seconds"],
+                        options["threads"],
+                        offer_ids,
+                        user_ids,
+                    )
+                    for _ in range(options["processes"])
+                ]
+                results = [run.result() for run in runs]
+            latencies = [latency for run_latencies, _errors in results for latency in run_latencies]
+            errors = sum(run_errors for _latencies, run_errors in results)
+            percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+            overrides = {**CONFIGURATIONS[name]}
+            overrides.setdefault("WRITE_RETRY_ATTEMPTS", settings.WRITE_RETRY_ATTEMPTS)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}: {overrides}"))
+            style = self.style.ERROR if errors else self.style.SUCCESS
+            self.stdout.write(
+                f"{len(latencies) / options['seconds']:.1f} writes/s, latency p50 {percentiles[49]:.1f} ms, "
+                f"p99 {percentiles[98]:.1f} ms, " + style(f'{errors} "database is locked" errors')
+            )
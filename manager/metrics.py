@@ -0,0 +1,186 @@
+"""Request and workflow metrics in Prometheus text format.
+
+Every process aggregates its metrics in memory, a lock is held only for a few additions.
+When METRICS_DIR is set, the process writes its metrics to its own file there at most every
+METRICS_FLUSH_SECONDS and at exit, and the metrics view sums files of all processes, so it works
+with many WSGI workers. Files of stopped workers are kept, so counters do not go back; a file is named
+by the pid and a random suffix, so a worker reusing the pid of a stopped one does not overwrite its file.
+The directory should be emptied when the server is restarted."""
+
+import atexit
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+HISTOGRAMS = {
+    "devagent_request_duration_seconds": ("Time of handling requests by view.", DURATION_BUCKETS),
+    "devagent_request_queries": ("Database queries of requests by view.", QUERY_BUCKETS),
+}
+COUNTERS = {
+    "devagent_responses_total": "Responses by view and status code.",
+    "devagent_status_transitions_total": "Objects changed by status transitions by model and transition.",
+}
+# views not resolved share one label, so paths do not add label values
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flushing = False
+        self.flushed = time.monotonic()
+        self.file_pid = self.file_name = None
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            # (name, labels) -> [count of every bucket and +Inf..., sum] or value of counter
+            self.histograms = {}
+            self.counters = {}
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = [0] * (len(buckets) + 2)
+            values = self.histograms[key]
+            # counts are not cumulative here, they are summed up when rendered
+            values[bisect_left(buckets, value)] += 1
+            values[-1] += value
+
+    def increment(self, name, labels, value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": [
+                    [name, list(labels), list(values)] for (name, labels), values in self.histograms.items()
+                ],
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            }
+
+    def flush(self, force=False):
+        """Writes metrics of this process to its file in METRICS_DIR, at most every METRICS_FLUSH_SECONDS"""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        with self.lock:
+            if not (self.histograms or self.counters):
+                return
+            if self.flushing or (not force and time.monotonic() - self.flushed < settings.METRICS_FLUSH_SECONDS):
+                return
+            self.flushing = True
+        try:
+            path = os.path.join(directory, self.get_file_name())
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            os.makedirs(directory, exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(self.snapshot(), file)
+            # readers never see a file partially written
+            os.replace(temporary, path)
+        finally:
+            with self.lock:
+                self.flushing = False
+                self.flushed = time.monotonic()
+
+    def get_file_name(self):
+        """Returns name of the file of this process, a new one after fork"""
+        pid = os.getpid()
+        if self.file_pid != pid:
+            self.file_pid, self.file_name = pid, f"{pid}-{secrets.token_hex(4)}.json"
+        return self.file_name
+
+
+registry = Registry()
+atexit.register(registry.flush, force=True)
+
+
+def observe_request(view_name, status, seconds, queries):
+    view = view_name or UNRESOLVED_VIEW
+    registry.observe("devagent_request_duration_seconds", (("view", view),), seconds)
+    registry.observe("devagent_request_queries", (("view", view),), queries)
+    registry.increment("devagent_responses_total", (("view", view), ("status", str(status))))
+    registry.flush()
+
+
+def count_transition(transition, count):
+    labels = (("model", transition.model._meta.model_name), ("transition", transition.name))
+    registry.increment("devagent_status_transitions_total", labels, count)
+    registry.flush()
+
+
+def collect():
+    """Returns metrics of all processes, summed"""
+    snapshots = []
+    if settings.METRICS_DIR:
+        # this process' file is written first, so it is up to date
+        registry.flush(force=True)
+        for filename in sorted(os.listdir(settings.METRICS_DIR)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIR, filename), encoding="utf-8") as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                # file removed or written by a process killed while writing it
+                continue
+    else:
+        snapshots.append(registry.snapshot())
+
+    histograms, counters = {}, {}
+    for snapshot in snapshots:
+        for name, labels, values in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            summed = histograms.setdefault(key, [0] * len(values))
+            histograms[key] = [a + b for a, b in zip(summed, values)]
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def format_number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render():
+    """Returns metrics of all processes in Prometheus text exposition format"""
+    histograms, counters = collect()
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, "+Inf"], values):
+                cumulative += count
+                le = bound if bound == "+Inf" else format_number(bound)
+                lines.append(f"{name}_bucket{format_labels([*labels, ('le', le)])} {cumulative}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_number(values[-1])}")
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{format_labels(labels)} {format_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from manager import metrics
+
+logger = logging.getLogger(__name__)
+
+# timing of the request being handled, context variables follow it to async view threads
+request_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+@dataclass
+class RequestTiming:
+    queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0
+    view_name: str = None
+    sampled: bool = False
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding queries to the timing of the current request"""
+    timing = request_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.queries += 1
+        timing.db_seconds += time.perf_counter() - start
+
+
+def install_query_recorder(connection):
+    # a thread reconnects with the same connection object, wrapper is added once
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class PerformanceMiddleware:
+    """Measures database queries, template rendering and total time of requests.
+    With METRICS_ENABLED every request is added to metrics of its resolved view name.
+    PERFORMANCE_SAMPLE_RATE is the share of requests also sent in Server-Timing header
+    and logged as JSON, 0 turns it off.
+    Should be the first middleware, so time of the other ones is included
+    and TemplateResponse is rendered right after its process_template_response.
+    Under ASGI requests are awaited without a thread, so requests of async views overlap."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # as MiddlewareMixin does, the ASGI handler awaits the middleware without a thread of its own
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timing = self.start_timing()
+        if timing is None:
+            return self.get_response(request)
+        token = request_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timing.reset(token)
+        return self.finish_timing(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = self.start_timing()
+        if timing is None:
+            return await self.get_response(request)
+        token = request_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timing.reset(token)
+        return self.finish_timing(request, response, timing)
+
+    @staticmethod
+    def start_timing():
+        """Returns timing of a new request, None when it is neither measured nor sampled"""
+        sample_rate = settings.PERFORMANCE_SAMPLE_RATE
+        sampled = bool(sample_rate) and random.random() < sample_rate
+        if not (sampled or settings.METRICS_ENABLED or settings.SLOW_QUERY_MS):
+            return None
+        return RequestTiming(sampled=sampled)
+
+    @staticmethod
+    def finish_timing(request, response, timing):
+        # streamed content is sent later and not included
+        seconds = timing.seconds
+        # view name only, paths may contain tokens
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        if settings.METRICS_ENABLED:
+            metrics.observe_request(view_name, response.status_code, seconds, timing.queries)
+        if not timing.sampled:
+            return response
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={timing.db_seconds * 1000:.2f};desc="{timing.queries} queries"',
+                f"tpl;dur={timing.template_seconds * 1000:.2f}",
+                f"total;dur={seconds * 1000:.2f}",
+            ]
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "view": view_name,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "total_ms": round(seconds * 1000, 2),
+                    "db_ms": round(timing.db_seconds * 1000, 2),
+                    "queries": timing.queries,
+                    "template_ms": round(timing.template_seconds * 1000, 2),
+                }
+            )
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # known to queries of the view, e.g. recorded by slow_queries
+        timing = request_timing.get()
+        if timing is not None:
+            timing.view_name = request.resolver_match.view_name
+
+    def process_template_response(self, request, response):
+        timing = request_timing.get()
+        if timing is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timing.template_seconds += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
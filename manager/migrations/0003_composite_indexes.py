@@ -0,0 +1,79 @@
+# Generated by Django 3.2.19 on 2026-10-18 03:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0002_test_data'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='company',
+            name='added_by',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='companies_added', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='developer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='employment_type',
+            field=models.CharField(blank=True, choices=[('None', 'None'), ('B2B', 'Business to business'), ('PERMANENT', 'Permanent'), ('CONTRACT', 'Contract')], default='None', max_length=16, null=True, verbose_name='employment type'),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='level',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Not provided'), (1, 'Junior'), (2, 'Regular'), (3, 'Senior')], default=0, verbose_name='experience level'),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='skills_required',
+            field=models.ManyToManyField(blank=True, related_name='offers_required_in', to='manager.Skill', verbose_name='skills required'),
+        ),
+        migrations.AlterField(
+            model_name='recruitmentstep',
+            name='offer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='manager.offer'),
+        ),
+        migrations.AlterField(
+            model_name='steptype',
+            name='added_by',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='step_types_added', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['added_by', '-updated_on', '-created_on'], name='company_added_by_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['developer', 'status', '-updated_on', '-created_on'], name='offer_developer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['developer', '-updated_on', '-created_on', 'id'], name='offer_developer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recruitmentstep',
+            index=models.Index(fields=['offer', 'id'], name='step_offer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recruitmentstep',
+            index=models.Index(fields=['offer', '-updated_on', '-created_on'], name='step_offer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='steptype',
+            index=models.Index(fields=['added_by', 'name'], name='steptype_added_by_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='company',
+            constraint=models.UniqueConstraint(fields=('name', 'added_by'), name='company per user unique'),
+        ),
+    ]
@@ -0,0 +1,131 @@
+from django.db import migrations
+
+# FTS5 index of offers: searchable text of the offer, its company and skills.
+# rowid is (developer id << 32 | offer id), so offers of one developer are adjacent in every doclist
+# and searches restricted to their rowid range read only that developer's part of the index
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE manager_offer_fts USING fts5(
+    title, description, comments, company, skills,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+FTS_ROWID = "(({offer}.developer_id << 32) | {offer}.id)"
+COMPANY_NAME = "(SELECT name FROM manager_company WHERE id = {offer}.company_id)"
+SKILL_NAMES = """(
+    SELECT group_concat(name, ' ') FROM manager_skill WHERE id IN (
+        SELECT skill_id FROM manager_offer_skills_required WHERE offer_id = {offer_id}
+        UNION SELECT skill_id FROM manager_offer_skills_optional WHERE offer_id = {offer_id}
+    )
+)"""
+
+
+def insert_document(offer, offer_id):
+    return f"""
+    INSERT INTO manager_offer_fts (rowid, title, description, comments, company, skills)
+    SELECT {FTS_ROWID.format(offer=offer)}, {offer}.title, {offer}.description, {offer}.comments,
+        {COMPANY_NAME.format(offer=offer)}, {SKILL_NAMES.format(offer_id=offer_id)}
+    """
+
+
+POPULATE = insert_document("manager_offer", "manager_offer.id") + "FROM manager_offer"
+
+TRIGGERS = [
+    f"""
+    CREATE TRIGGER manager_offer_fts_insert AFTER INSERT ON manager_offer BEGIN
+        {insert_document("new", "new.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER manager_offer_fts_update
+    AFTER UPDATE OF title, description, comments, company_id, developer_id ON manager_offer
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.comments IS NOT new.comments
+        OR old.company_id IS NOT new.company_id OR old.developer_id IS NOT new.developer_id
+    BEGIN
+        DELETE FROM manager_offer_fts WHERE rowid = {FTS_ROWID.format(offer="old")};
+        {insert_document("new", "new.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER manager_offer_fts_delete AFTER DELETE ON manager_offer BEGIN
+        DELETE FROM manager_offer_fts WHERE rowid = {FTS_ROWID.format(offer="old")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER manager_company_fts_update AFTER UPDATE OF name ON manager_company
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE manager_offer_fts SET company = new.name
+        WHERE rowid IN (
+            SELECT {FTS_ROWID.format(offer="manager_offer")} FROM manager_offer WHERE company_id = new.id
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER manager_skill_fts_update AFTER UPDATE OF name ON manager_skill
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE manager_offer_fts
+        SET skills = {SKILL_NAMES.format(offer_id="(manager_offer_fts.rowid & 4294967295)")}
+        WHERE rowid IN (
+            SELECT {FTS_ROWID.format(offer="manager_offer")} FROM manager_offer WHERE id IN (
+                SELECT offer_id FROM manager_offer_skills_required WHERE skill_id = new.id
+                UNION SELECT offer_id FROM manager_offer_skills_optional WHERE skill_id = new.id
+            )
+        );
+    END
+    """,
+] + [
+    f"""
+    CREATE TRIGGER {table}_fts_{event.lower()} AFTER {event} ON {table} BEGIN
+        UPDATE manager_offer_fts SET skills = {SKILL_NAMES.format(offer_id=f"{row}.offer_id")}
+        WHERE rowid = (
+            SELECT {FTS_ROWID.format(offer="manager_offer")} FROM manager_offer WHERE id = {row}.offer_id
+        );
+    END
+    """
+    for table in ["manager_offer_skills_required", "manager_offer_skills_optional"]
+    for event, row in [("INSERT", "new"), ("DELETE", "old")]
+]
+
+TRIGGER_NAMES = [
+    "manager_offer_fts_insert",
+    "manager_offer_fts_update",
+    "manager_offer_fts_delete",
+    "manager_company_fts_update",
+    "manager_skill_fts_update",
+    "manager_offer_skills_required_fts_insert",
+    "manager_offer_skills_required_fts_delete",
+    "manager_offer_skills_optional_fts_insert",
+    "manager_offer_skills_optional_fts_delete",
+]
+
+
+def forwards_func(apps, schema_editor):
+    # other database backends fall back to plain filtering in manager.search
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_TABLE)
+    schema_editor.execute(POPULATE)
+    for trigger in TRIGGERS:
+        schema_editor.execute(trigger)
+
+
+def reverse_func(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for name in TRIGGER_NAMES:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    schema_editor.execute("DROP TABLE IF EXISTS manager_offer_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manager", "0003_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.19 on 2026-10-18 04:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards_func(apps, schema_editor):
+    Offer = apps.get_model("manager", "Offer")
+    OfferSkillBits = apps.get_model("manager", "OfferSkillBits")
+    db_alias = schema_editor.connection.alias
+
+    bits = {}
+    for index, through in enumerate([Offer.skills_required.through, Offer.skills_optional.through]):
+        for offer_id, skill_id in through.objects.using(db_alias).values_list("offer_id", "skill_id").iterator():
+            bits.setdefault(offer_id, [0, 0])[index] |= 1 << skill_id
+
+    OfferSkillBits.objects.using(db_alias).bulk_create(
+        [
+            OfferSkillBits(
+                offer_id=offer_id,
+                required=required.to_bytes((required.bit_length() + 7) // 8, "little"),
+                optional=optional.to_bytes((optional.bit_length() + 7) // 8, "little"),
+            )
+            for offer_id, (required, optional) in bits.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0004_offer_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSkillBits',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='skill_bits', serialize=False, to='manager.offer')),
+                ('required', models.BinaryField(default=bytes)),
+                ('optional', models.BinaryField(default=bytes)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='developers',
+            field=models.ManyToManyField(blank=True, related_name='skills', to=settings.AUTH_USER_MODEL, verbose_name='developers'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
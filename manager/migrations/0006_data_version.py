@@ -0,0 +1,33 @@
+# Generated by Django 3.2.19 on 2026-10-18 05:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards_func(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    DataVersion = apps.get_model("manager", "DataVersion")
+    db_alias = schema_editor.connection.alias
+    DataVersion.objects.using(db_alias).bulk_create(
+        [DataVersion(developer_id=user_id) for user_id in User.objects.using(db_alias).values_list("id", flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_content_addressed_image'),
+        ('manager', '0005_skill_bits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('developer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='data_version', serialize=False, to='users.user')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
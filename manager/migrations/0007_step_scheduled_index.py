@@ -0,0 +1,17 @@
+# Generated by Django 3.2.19 on 2026-10-18 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0006_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recruitmentstep',
+            index=models.Index(fields=['offer', 'scheduled_on'], name='step_offer_scheduled_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.19 on 2026-10-18 05:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0007_step_scheduled_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('scheduled_on', models.DateTimeField(verbose_name='scheduled on')),
+                ('status', models.SmallIntegerField(choices=[(0, 'Claimed'), (1, 'Sent'), (-1, 'Failed')], default=0, verbose_name='status')),
+                ('sent_on', models.DateTimeField(blank=True, null=True, verbose_name='sent on')),
+            ],
+            options={
+                'verbose_name': 'reminder',
+                'verbose_name_plural': 'reminders',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recruitmentstep',
+            index=models.Index(fields=['status', 'scheduled_on'], name='step_status_scheduled_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='step',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='manager.recruitmentstep'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminder',
+            constraint=models.UniqueConstraint(fields=('step', 'scheduled_on'), name='reminder per step schedule unique'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import F, OuterRef, Prefetch, Subquery, UniqueConstraint
 from django.utils.translation import gettext_lazy as _
 
 
@@ -23,12 +23,45 @@ class BaseManagerModel(models.Model):
         return f"{self.__class__.__name__}('{self.__str__()}')"
 
 
+class OfferQuerySet(models.QuerySet):
+    def with_latest_step(self):
+        """Prefetches only the latest RecruitmentStep (with its StepType) of every Offer in a single query"""
+        latest_step_id = RecruitmentStep.objects.filter(offer=OuterRef("offer")).order_by("-id").values("id")[:1]
+        return self.prefetch_related(
+            Prefetch(
+                "steps",
+                queryset=RecruitmentStep.objects.filter(id=Subquery(latest_step_id)).select_related("type"),
+                to_attr="latest_steps",
+            )
+        )
+
+    def with_steps(self):
+        """Prefetches all RecruitmentSteps (with their StepTypes), latest_step is then taken from them"""
+        return self.prefetch_related(self.steps_prefetch())
+
+    @staticmethod
+    def steps_prefetch():
+        """Prefetch of with_steps, for offers already loaded with prefetch_related_objects"""
+        return Prefetch("steps", queryset=RecruitmentStep.objects.select_related("type"))
+
+
+# Warning: on SQLite the search index manager_offer_fts is kept up to date by triggers on tables of Offer,
+# Company, Skill and offer skills, created by raw SQL of migration 0004_offer_search and unknown to the
+# migration autodetector. Operations rebuilding one of these tables, e.g. AlterField on SQLite, drop its
+# triggers or fail on triggers of the other tables referring to it. Such migration has to drop TRIGGER_NAMES
+# of 0004_offer_search before them and execute its TRIGGERS after them, test_search checks all triggers exist.
 class Offer(BaseManagerModel):
     """Main model of an offer that developer found and added to DB"""
 
     class Meta:
         verbose_name = _("offer")
         verbose_name_plural = _("offers")
+        indexes = [
+            models.Index(
+                fields=["developer", "status", "-updated_on", "-created_on"], name="offer_developer_status_idx"
+            ),
+            models.Index(fields=["developer", "-updated_on", "-created_on", "id"], name="offer_developer_updated_idx"),
+        ]
 
     class Statuses(models.IntegerChoices):
         CREATED = 0, _("Created")
@@ -72,7 +105,7 @@ class Offer(BaseManagerModel):
         null=False,
         blank=True,
     )
-    developer = models.ForeignKey("users.User", on_delete=models.CASCADE, null=False, blank=False)
+    developer = models.ForeignKey("users.User", on_delete=models.CASCADE, null=False, blank=False, db_index=False)
     company = models.ForeignKey("manager.Company", on_delete=models.SET_NULL, null=True, blank=False)
     skills_required = models.ManyToManyField(
         "manager.Skill",
@@ -100,6 +133,8 @@ class Offer(BaseManagerModel):
     description = models.TextField(_("description"), max_length=2048, null=True, blank=True)
     comments = models.TextField(_("comments"), max_length=512, null=True, blank=True)
 
+    objects = OfferQuerySet.as_manager()
+
     @property
     def status_display(self):
         """Finds and returns string value of status set"""
@@ -107,7 +142,11 @@ class Offer(BaseManagerModel):
 
     @property
     def latest_step(self):
-        """Returns latest related RecruitmentStep"""
+        """Returns latest related RecruitmentStep, uses prefetched steps when available"""
+        if hasattr(self, "latest_steps"):
+            return self.latest_steps[-1] if self.latest_steps else None
+        if "steps" in getattr(self, "_prefetched_objects_cache", {}):
+            return max(self.steps.all(), key=lambda step: step.id, default=None)
         return self.steps.order_by("id").last()
 
     @property
@@ -139,9 +178,19 @@ class StepType(BaseManagerModel):
 
     name = models.CharField(_("name"), max_length=32, null=False, blank=False)
     added_by = models.ForeignKey(
-        "users.User", on_delete=models.CASCADE, null=False, blank=False, related_name="step_types_added"
+        "users.User",
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name="step_types_added",
+        db_index=False,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["added_by", "name"], name="steptype_added_by_idx"),
+        ]
+
 
 class RecruitmentStep(BaseManagerModel):
     """Step Many-to-One model related to Offer"""
@@ -161,6 +210,7 @@ class RecruitmentStep(BaseManagerModel):
         related_name="steps",
         null=False,
         blank=False,
+        db_index=False,
     )
     description = models.TextField(_("description"), max_length=2048, null=True, blank=True)
     status = models.SmallIntegerField(_("status"), choices=Statuses.choices, default=Statuses.CREATED)
@@ -170,6 +220,12 @@ class RecruitmentStep(BaseManagerModel):
         verbose_name = _("recruitment step")
         verbose_name_plural = _("recruitment steps")
         ordering = ["-updated_on", "-created_on"]
+        indexes = [
+            models.Index(fields=["offer", "id"], name="step_offer_idx"),
+            models.Index(fields=["offer", "-updated_on", "-created_on"], name="step_offer_updated_idx"),
+            models.Index(fields=["offer", "scheduled_on"], name="step_offer_scheduled_idx"),
+            models.Index(fields=["status", "scheduled_on"], name="step_status_scheduled_idx"),
+        ]
 
     @property
     def status_display(self):
@@ -191,13 +247,21 @@ class Company(BaseManagerModel):
     location = models.CharField(_("location"), max_length=32, null=True, blank=True)
     website = models.CharField(_("website"), max_length=64, null=True, blank=True)
     added_by = models.ForeignKey(
-        "users.User", on_delete=models.CASCADE, null=False, blank=False, related_name="companies_added"
+        "users.User",
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name="companies_added",
+        db_index=False,
     )
 
     class Meta:
         verbose_name = _("company")
         verbose_name_plural = _("companies")
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["added_by", "-updated_on", "-created_on"], name="company_added_by_updated_idx"),
+        ]
         constraints = [
             UniqueConstraint(
                 fields=["name", "added_by"],
@@ -210,6 +274,12 @@ class Skill(BaseManagerModel):
     """Developer's skill"""
 
     name = models.CharField(_("name"), max_length=64, null=False, blank=False, unique=True)
+    developers = models.ManyToManyField(
+        "users.User",
+        verbose_name=_("developers"),
+        blank=True,
+        related_name="skills",
+    )
 
     # TODO should we add rating here?
 
@@ -217,3 +287,55 @@ class Skill(BaseManagerModel):
         verbose_name = _("skill")
         verbose_name_plural = _("skills")
         ordering = ["name"]
+
+
+class OfferSkillBits(models.Model):
+    """Skills of an Offer as bitsets with bit number equal to Skill id, kept by manager.skills.
+    Offers without any skills have no row."""
+
+    offer = models.OneToOneField("manager.Offer", on_delete=models.CASCADE, primary_key=True, related_name="skill_bits")
+    required = models.BinaryField(default=bytes)
+    optional = models.BinaryField(default=bytes)
+
+
+class DataVersionQuerySet(models.QuerySet):
+    def bump(self, developers):
+        """Increases versions of developers given as ids or a queryset of ids, in a single UPDATE"""
+        return self.filter(developer__in=developers).update(version=F("version") + 1)
+
+
+class DataVersion(models.Model):
+    """Counter of changes of everything shown on developer's offer and company pages, used as their ETag.
+    Bumped by manager.signals, workflow and importer in the same transaction as the change."""
+
+    developer = models.OneToOneField(
+        "users.User", on_delete=models.CASCADE, primary_key=True, related_name="data_version"
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = DataVersionQuerySet.as_manager()
+
+
+class Reminder(BaseManagerModel):
+    """Email reminder of a planned RecruitmentStep, one per step and its scheduled time.
+    Claimed before sending, so a step rescheduled later gets a new reminder and the same one is never sent twice."""
+
+    class Statuses(models.IntegerChoices):
+        CLAIMED = 0, _("Claimed")
+        SENT = 1, _("Sent")
+        FAILED = -1, _("Failed")
+
+    # the unique constraint's index starts with step
+    step = models.ForeignKey(
+        "manager.RecruitmentStep", on_delete=models.CASCADE, related_name="reminders", db_index=False
+    )
+    scheduled_on = models.DateTimeField(_("scheduled on"))
+    status = models.SmallIntegerField(_("status"), choices=Statuses.choices, default=Statuses.CLAIMED)
+    sent_on = models.DateTimeField(_("sent on"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("reminder")
+        verbose_name_plural = _("reminders")
+        constraints = [
+            UniqueConstraint(fields=["step", "scheduled_on"], name="reminder per step schedule unique"),
+        ]
@@ -0,0 +1,86 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+class KeysetPage:
+    """Single page of objects returned by KeysetPaginator"""
+
+    def __init__(self, object_list, cursor, next_cursor):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return bool(self.cursor) or self.has_next
+
+
+class KeysetPaginator:
+    """Cursor (keyset) paginator that never runs OFFSET nor COUNT(*) queries.
+    Cursor is an opaque token encoding ordering values of the last object on the page,
+    next page is fetched with "WHERE (ordering fields) are past the cursor" condition.
+    Ordering must end with a unique field (e.g. "id") to be deterministic."""
+
+    def __init__(self, queryset, per_page, ordering=("-updated_on", "-created_on", "id")):
+        self.ordering = tuple(ordering)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+        self.fields = [
+            (self.queryset.model._meta.get_field(field.lstrip("-")), field.startswith("-")) for field in self.ordering
+        ]
+
+    def encode_cursor(self, obj):
+        values = [field.value_to_string(obj) for field, _descending in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for (field, _descending), value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise Http404(_("Invalid page cursor."))
+
+    def get_cursor_filter(self, values):
+        """Builds lexicographic "row after values" condition respecting each field's direction"""
+        conditions = []
+        for position, ((field, descending), value) in enumerate(zip(self.fields, values)):
+            lookup = {f"{field.attname}__{'lt' if descending else 'gt'}": value}
+            lookup.update(
+                {
+                    prev_field.attname: prev_value
+                    for (prev_field, _descending), prev_value in zip(self.fields, values[:position])
+                }
+            )
+            conditions.append(Q(**lookup))
+        return reduce(or_, conditions)
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self.get_cursor_filter(self.decode_cursor(cursor)))
+
+        object_list = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[: self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return KeysetPage(object_list, cursor, next_cursor)
@@ -0,0 +1,181 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from manager.models import RecruitmentStep, Reminder
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "manager/mail/step_reminder.txt"
+# columns used in the message, long offer descriptions are not read
+STEP_FIELDS = (
+    "id",
+    "scheduled_on",
+    "description",
+    "type__name",
+    "offer__title",
+    "offer__location",
+    "offer__company__name",
+    "offer__developer__email",
+    "offer__developer__username",
+)
+# attempts of a batch whose steps were claimed by a concurrent dispatcher in the meantime
+CLAIM_ATTEMPTS = 3
+
+
+@dataclass
+class DispatchResult:
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def messages_per_second(self):
+        return (self.sent + self.failed) / self.seconds if self.seconds else 0.0
+
+
+def get_due_steps(now, lead):
+    """Planned steps scheduled within lead from now that have no reminder of their current schedule yet,
+    in one range scan of step_status_scheduled_idx"""
+    reminded = Reminder.objects.filter(step=OuterRef("pk"), scheduled_on=OuterRef("scheduled_on"))
+    return (
+        RecruitmentStep.objects.filter(
+            status=RecruitmentStep.Statuses.PLANNED,
+            scheduled_on__gt=now,
+            scheduled_on__lte=now + lead,
+            offer__developer__is_active=True,
+        )
+        .filter(~Exists(reminded))
+        .select_related("type", "offer__company", "offer__developer")
+        .only(*STEP_FIELDS)
+        .order_by("scheduled_on", "id")
+    )
+
+
+class ReminderDispatcher:
+    """Sends reminders of due planned steps in batches over a single connection of EMAIL_BACKEND.
+    Reminders are claimed (inserted) before their messages are sent, so every step schedule is reminded
+    at most once, also with several dispatchers running; messages that failed are recorded as such,
+    claims of messages not attempted because the mail connection failed are released."""
+
+    def __init__(self, lead=None, batch_size=100, connection=None):
+        self.lead = lead if lead is not None else timedelta(hours=settings.REMINDER_LEAD_HOURS)
+        self.batch_size = batch_size
+        self.connection = connection
+
+    def dispatch(self, now=None, progress=None):
+        """Sends all reminders due at now, calls progress with DispatchResult after every batch"""
+        result = DispatchResult()
+        now = now or timezone.now()
+        mail_connection = None
+        conflicts = 0
+        try:
+            while steps := list(get_due_steps(now, self.lead)[: self.batch_size]):
+                try:
+                    reminders = self.claim(steps)
+                except IntegrityError:
+                    conflicts += 1
+                    if conflicts == CLAIM_ATTEMPTS:
+                        raise
+                    continue
+                conflicts = 0
+                if mail_connection is None:
+                    # opened only when there is something to send, kept open for all batches
+                    mail_connection = self.connection or get_connection()
+                    try:
+                        mail_connection.open()
+                    except Exception:
+                        self.release(reminders.values())
+                        raise
+                self.send(mail_connection, steps, reminders, result)
+                result.batches += 1
+                if progress:
+                    progress(result)
+        finally:
+            if mail_connection is not None:
+                mail_connection.close()
+        return result
+
+    @staticmethod
+    def claim(steps):
+        """Inserts reminders of steps in one transaction, fails with IntegrityError if any was claimed before.
+        Returns step id to reminder id mapping."""
+        with transaction.atomic():
+            reminders = Reminder.objects.bulk_create(
+                [Reminder(step=step, scheduled_on=step.scheduled_on) for step in steps]
+            )
+            if connection.features.can_return_rows_from_bulk_insert:
+                return {reminder.step_id: reminder.id for reminder in reminders}
+            claimed = Reminder.objects.filter(
+                step_id__in=[step.id for step in steps], status=Reminder.Statuses.CLAIMED
+            ).values_list("step_id", "scheduled_on", "id")
+            schedules = {step.id: step.scheduled_on for step in steps}
+            return {
+                step_id: reminder_id
+                for step_id, scheduled_on, reminder_id in claimed
+                if schedules[step_id] == scheduled_on
+            }
+
+    def send(self, mail_connection, steps, reminders, result):
+        """Sends messages of claimed steps. When the connection cannot be opened again after an error,
+        e.g. the mail server is down, messages sent so far are recorded and claims of the rest released."""
+        # step id ends the step-detail URL, so it is reversed once for the batch
+        step_url = settings.BASE_URL + reverse("step-detail", kwargs={"pk": 0})[:-1]
+        sent, failed = [], []
+        try:
+            for step in steps:
+                try:
+                    mail_connection.send_messages([self.build_message(step, step_url)])
+                except Exception:
+                    logger.exception("Reminder of step %s could not be sent", step.id)
+                    failed.append(reminders[step.id])
+                    # the connection may be broken after an error
+                    mail_connection.close()
+                    mail_connection.open()
+                else:
+                    sent.append(reminders[step.id])
+        finally:
+            Reminder.objects.filter(id__in=sent).update(status=Reminder.Statuses.SENT, sent_on=timezone.now())
+            Reminder.objects.filter(id__in=failed).update(status=Reminder.Statuses.FAILED)
+            self.release(set(reminders.values()).difference(sent, failed))
+            result.sent += len(sent)
+            result.failed += len(failed)
+
+    @staticmethod
+    def release(reminder_ids):
+        """Deletes claims of reminders whose messages were not attempted, a later dispatch claims them again"""
+        Reminder.objects.filter(id__in=reminder_ids, status=Reminder.Statuses.CLAIMED).delete()
+
+    @staticmethod
+    def build_message(step, step_url):
+        step_name = step.type.name if step.type else capfirst(RecruitmentStep._meta.verbose_name)
+        subject = _("Reminder: %(step)s for %(offer)s") % {"step": step_name, "offer": step.offer.title}
+        if step.offer.company:
+            subject += f" ({step.offer.company.name})"
+        body = render_to_string(
+            TEMPLATE_NAME,
+            {
+                "step": step,
+                "step_name": step_name,
+                "offer": step.offer,
+                "developer": step.offer.developer,
+                "url": f"{step_url}{step.id}",
+            },
+        )
+        return EmailMessage(subject, body, to=[step.offer.developer.email])
@@ -0,0 +1,169 @@
+"""Rows of long tables, rendered by template tags of manager_tags with templates of manager/templates/manager/segments.
+
+Including a template for every row resolves a new context for it, reverses each of its {% url %} tags
+and looks up attributes of its objects, which takes most of the time of long lists.
+Here row templates are loaded once and every row is rendered with a flat context of its values,
+URLs are reversed and status labels looked up once per table."""
+
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.translation import get_language
+
+from manager.models import Offer, RecruitmentStep
+
+# reversed in place of an object's id, then replaced by ids of rows
+ID_PLACEHOLDER = 987654321
+ROW_CACHE_TIMEOUT = 24 * 60 * 60
+# buttons of offer_nav_buttons.html, every row has all of them, so that templates do not look up missing keys
+OFFER_ACTIONS = ("send", "plan", "finish", "accept", "reject", "new_step", "sign_contract", "resign")
+
+OFFER_ROW = get_template("manager/segments/offer_row.html").template
+COMPANY_ROW = get_template("manager/segments/company_row.html").template
+STEP_ROW = get_template("manager/segments/step_row.html").template
+
+
+class UrlFormat:
+    """URL of a view reversed once, with id of any object put in later"""
+
+    def __init__(self, name):
+        self.prefix, self.suffix = reverse(name, args=[ID_PLACEHOLDER]).split(str(ID_PLACEHOLDER))
+
+    def __call__(self, object_id):
+        return f"{self.prefix}{object_id}{self.suffix}"
+
+
+class TableRenderer:
+    """Renders rows of one table, URL names and status labels are resolved by the first row using them"""
+
+    def __init__(self, context):
+        self.context = context
+        self.urls = {}
+        self.labels = {}
+
+    def url(self, name, object_id):
+        if name not in self.urls:
+            self.urls[name] = UrlFormat(name)
+        return self.urls[name](object_id)
+
+    def status(self, statuses, status):
+        key = (statuses, status)
+        if key not in self.labels:
+            self.labels[key] = str(statuses(status).label)
+        return self.labels[key]
+
+    def render(self, template, row):
+        """Renders template with values of row on top of the table's context"""
+        with self.context.push(row):
+            return template.render(self.context)
+
+
+def render_offer_rows(offers, context):
+    """Returns rows of offers.
+    Rows are cached under versions of everything they show, a write of the offer, its latest step, company
+    or step type changes the key, so they are never stale. All rows are looked up in the cache at once."""
+    renderer = TableRenderer(context)
+    cache = caches["template_fragments"]
+    language = get_language()
+    keys = {offer.id: make_template_fragment_key("offer_row", get_offer_versions(offer, language)) for offer in offers}
+    rows = cache.get_many(keys.values())
+    missing = {}
+    for offer in offers:
+        if keys[offer.id] not in rows:
+            missing[keys[offer.id]] = rows[keys[offer.id]] = render_offer_row(offer, renderer)
+    if missing:
+        cache.set_many(missing, ROW_CACHE_TIMEOUT)
+    return "".join(rows[keys[offer.id]] for offer in offers)
+
+
+def get_offer_versions(offer, language):
+    step = offer.latest_step
+    company = offer.company
+    return [
+        offer.id,
+        offer.updated_on,
+        company.updated_on if company else None,
+        step.id if step else None,
+        step.updated_on if step else None,
+        step.type.updated_on if step and step.type else None,
+        language,
+    ]
+
+
+def render_offer_row(offer, renderer):
+    step = offer.latest_step
+    row = {
+        "update_url": renderer.url("offer-update", offer.id),
+        "detail_url": renderer.url("offer-detail", offer.id),
+        "title": offer.title,
+        "status": renderer.status(Offer.Statuses, offer.status),
+        "company": offer.company.name if offer.company else "",
+        "step": None,
+        "actions": get_offer_actions(offer, step, renderer),
+    }
+    if step:
+        row["step"] = {
+            "update_url": renderer.url("step-update", step.id),
+            "detail_url": renderer.url("step-detail", step.id),
+            "type": step.type,
+            "status": renderer.status(RecruitmentStep.Statuses, step.status),
+        }
+    return renderer.render(OFFER_ROW, row)
+
+
+def get_offer_actions(offer, step, renderer):
+    """Returns URLs of next actions of offer by OFFER_ACTIONS, None for actions not available"""
+    statuses, step_statuses = Offer.Statuses, RecruitmentStep.Statuses
+    actions = dict.fromkeys(OFFER_ACTIONS)
+    if offer.status == statuses.CREATED:
+        actions["send"] = renderer.url("offer-send", offer.id)
+    elif offer.status != statuses.CONTRACT_SIGNED:
+        if step and not step.has_result:
+            if step.status == step_statuses.CREATED:
+                actions["plan"] = renderer.url("step-update", step.id)
+            elif step.status == step_statuses.PLANNED:
+                actions["finish"] = renderer.url("step-finish", step.id)
+            if step.status in (step_statuses.FINISHED, step_statuses.PLANNED):
+                actions["accept"] = renderer.url("step-accept", step.id)
+                actions["reject"] = renderer.url("step-reject", step.id)
+        elif offer.status > statuses.CREATED:
+            actions["new_step"] = renderer.url("step-create", offer.id)
+            if offer.status == statuses.ACTIVE and step and step.status == step_statuses.SUCCESS:
+                actions["sign_contract"] = renderer.url("offer-sign-contract", offer.id)
+    if not offer.is_finished:
+        actions["resign"] = renderer.url("offer-resign", offer.id)
+    return actions
+
+
+def render_company_rows(companies, context):
+    renderer = TableRenderer(context)
+    return "".join(
+        renderer.render(
+            COMPANY_ROW,
+            {
+                "update_url": renderer.url("company-update", company.id),
+                "name": company.name,
+                "location": company.location,
+                "website": company.website,
+            },
+        )
+        for company in companies
+    )
+
+
+def render_step_rows(steps, context):
+    renderer = TableRenderer(context)
+    return "".join(
+        renderer.render(
+            STEP_ROW,
+            {
+                "update_url": renderer.url("step-update", step.id),
+                "type": step.type,
+                "status": renderer.status(RecruitmentStep.Statuses, step.status),
+                "scheduled_on": step.scheduled_on,
+                "description": step.description,
+            },
+        )
+        for step in steps
+    )
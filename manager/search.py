@@ -0,0 +1,135 @@
+import operator
+import re
+from functools import reduce
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from manager.models import Offer
+
+FTS_TABLE = "manager_offer_fts"
+# FTS rowid is (developer id << FTS_ROWID_SHIFT | offer id), see migration 0004_offer_search
+FTS_ROWID_SHIFT = 32
+FTS_OFFER_ID_MASK = (1 << FTS_ROWID_SHIFT) - 1
+# bm25 weights of title, description, comments, company and skills columns
+BM25_WEIGHTS = (10.0, 1.0, 1.0, 4.0, 4.0)
+MAX_TERMS = 8
+SNIPPET_TOKENS = 16
+# control characters never typed by users, replaced with <mark> after the text is escaped
+MARK_START, MARK_END = "\x02", "\x03"
+# words of the query, a trailing "*" asks for prefix match
+TERM_PATTERN = re.compile(r"(\w+)(\*?)")
+FALLBACK_LOOKUPS = (
+    "title__icontains",
+    "description__icontains",
+    "comments__icontains",
+    "company__name__icontains",
+    "skills_required__name__icontains",
+    "skills_optional__name__icontains",
+)
+
+
+def get_terms(query):
+    """Returns (word, is_prefix) pairs of the query"""
+    return [(word, bool(star)) for word, star in TERM_PATTERN.findall(query.lower())[:MAX_TERMS]]
+
+
+def build_match_query(terms):
+    """Builds FTS5 query matching all terms, every term is quoted so that user input is never FTS5 syntax.
+    Terms are matched as prefixes only on request, as a prefix query merges doclists of all matching tokens
+    in the whole index, while a whole word query reads only the developer's part of its doclist."""
+    return " AND ".join(f'"{word}"*' if is_prefix else f'"{word}"' for word, is_prefix in terms)
+
+
+def get_rowid_range(developer):
+    """Returns FTS rowid range of developer's offers"""
+    return developer.pk << FTS_ROWID_SHIFT, (developer.pk << FTS_ROWID_SHIFT) | FTS_OFFER_ID_MASK
+
+
+def highlight(text):
+    """Escapes text returned by FTS5 and turns match markers into <mark> tags"""
+    if not text:
+        return ""
+    return mark_safe(escape(text).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>"))
+
+
+def is_fts_available():
+    return connection.vendor == "sqlite"
+
+
+def search_offers(developer, query, limit=50):
+    """Returns developer's offers matching all words of query, best matches first.
+    Every offer has search_title and search_snippet attributes with matches marked."""
+    terms = get_terms(query)
+    if not terms:
+        return []
+    if not is_fts_available():
+        return search_offers_fallback(developer, terms, limit)
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT rowid,
+                highlight({FTS_TABLE}, 0, %s, %s),
+                snippet({FTS_TABLE}, 1, %s, %s, '…', %s),
+                snippet({FTS_TABLE}, 2, %s, %s, '…', %s),
+                highlight({FTS_TABLE}, 3, %s, %s),
+                highlight({FTS_TABLE}, 4, %s, %s)
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s AND rowid BETWEEN %s AND %s
+            ORDER BY bm25({FTS_TABLE}, {weights})
+            LIMIT %s
+            """,
+            [
+                *(MARK_START, MARK_END),
+                *(MARK_START, MARK_END, SNIPPET_TOKENS),
+                *(MARK_START, MARK_END, SNIPPET_TOKENS),
+                *(MARK_START, MARK_END),
+                *(MARK_START, MARK_END),
+                build_match_query(terms),
+                *get_rowid_range(developer),
+                limit,
+            ],
+        )
+        rows = cursor.fetchall()
+
+    offers = (
+        Offer.objects.select_related("company")
+        .with_latest_step()
+        .in_bulk([rowid & FTS_OFFER_ID_MASK for rowid, *_columns in rows])
+    )
+    results = []
+    for rowid, title, description, comments, company, skills in rows:
+        offer = offers.get(rowid & FTS_OFFER_ID_MASK)
+        if offer is None:
+            continue
+        offer.search_title = highlight(title)
+        # the first column with a match is shown, as snippet() of a column without one is only its beginning
+        offer.search_snippet = next(
+            (highlight(text) for text in (description, comments, company, skills) if text and MARK_START in text),
+            "",
+        )
+        results.append(offer)
+    return results
+
+
+def search_offers_fallback(developer, terms, limit):
+    """Unranked search for database backends without FTS5, scans all offers of the developer"""
+    condition = Q()
+    for word, _is_prefix in terms:
+        condition &= reduce(operator.or_, (Q(**{lookup: word}) for lookup in FALLBACK_LOOKUPS))
+    offers = (
+        Offer.objects.filter(developer=developer)
+        .filter(condition)
+        .distinct()
+        .select_related("company")
+        .with_latest_step()
+        .order_by("-updated_on", "-created_on", "id")[:limit]
+    )
+    for offer in offers:
+        offer.search_title = escape(offer.title)
+        offer.search_snippet = ""
+    return list(offers)
@@ -1,31 +1,115 @@
-from django.db.models.signals import post_save, pre_save
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
-from .models import Offer, RecruitmentStep
+from manager import database, metrics, skills, workflow
+from manager.middleware import install_query_recorder
+from manager.slow_queries import install_slow_query_recorder
+
+from .models import Company, DataVersion, Offer, RecruitmentStep, Skill, StepType
 
 
 @receiver(pre_save, sender=RecruitmentStep)
 def change_status_to_planned_if_scheduled(sender, instance, **kwargs):
-    if instance.status == RecruitmentStep.Statuses.CREATED and instance.scheduled_on:
-        instance.status = RecruitmentStep.Statuses.PLANNED
+    workflow.plan_scheduled_step(instance)
 
 
 @receiver(post_save, sender=RecruitmentStep)
 def change_offer_status(sender, instance, **kwargs):
-    if instance.status in [
-        RecruitmentStep.Statuses.CREATED,
-        RecruitmentStep.Statuses.PLANNED,
-    ] and instance.offer.status in [
-        Offer.Statuses.CREATED,
-        Offer.Statuses.APPLICATION_SENT,
-    ]:
-        instance.offer.status = Offer.Statuses.ACTIVE
-        instance.offer.save()
-
-    if instance.status == RecruitmentStep.Statuses.NEGATIVE and instance.offer.status != Offer.Statuses.NEGATIVE:
-        instance.offer.status = Offer.Statuses.NEGATIVE
-        instance.offer.save()
-
-    if instance.status == RecruitmentStep.Statuses.RESIGNED and instance.offer.status != Offer.Statuses.RESIGNED:
-        instance.offer.status = Offer.Statuses.RESIGNED
-        instance.offer.save()
+    if workflow.sync_offer_statuses([instance], step_statuses=[instance.status]) and RecruitmentStep.offer.is_cached(
+        instance
+    ):
+        instance.offer.refresh_from_db(fields=["status", "updated_on"])
+
+
+@receiver(m2m_changed, sender=Offer.skills_required.through)
+@receiver(m2m_changed, sender=Offer.skills_optional.through)
+def update_offer_skill_bits(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # offers losing the skill are not known after clearing
+        instance._cleared_offer_ids = list(
+            sender.objects.filter(skill_id=instance.pk).values_list("offer_id", flat=True)
+        )
+    elif action == "post_clear":
+        skills.update_offer_skill_bits(instance.__dict__.pop("_cleared_offer_ids", []) if reverse else [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        skills.update_offer_skill_bits(pk_set if reverse else [instance.pk])
+
+
+@receiver(pre_delete, sender=Skill)
+def collect_offers_of_deleted_skill(sender, instance, **kwargs):
+    instance._deleted_offer_ids = list(
+        Offer.objects.filter(Q(skills_required=instance) | Q(skills_optional=instance)).values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Skill)
+def update_offers_of_deleted_skill(sender, instance, **kwargs):
+    # M2M rows of deleted skill are removed without m2m_changed signal
+    skills.update_offer_skill_bits(getattr(instance, "_deleted_offer_ids", []))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_data_version(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        DataVersion.objects.get_or_create(developer=instance)
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def bump_offer_data_version(sender, instance, **kwargs):
+    DataVersion.objects.bump([instance.developer_id])
+
+
+@receiver(post_save, sender=RecruitmentStep)
+@receiver(post_delete, sender=RecruitmentStep)
+def bump_step_data_version(sender, instance, **kwargs):
+    DataVersion.objects.bump(Offer.objects.filter(id=instance.offer_id).values("developer_id"))
+
+
+@receiver(post_save, sender=Company)
+@receiver(pre_delete, sender=Company)
+def bump_company_data_version(sender, instance, **kwargs):
+    # offers of other developers show the company too, before deletion sets their company to NULL
+    DataVersion.objects.bump([instance.added_by_id])
+    DataVersion.objects.bump(Offer.objects.filter(company=instance).values("developer_id"))
+
+
+@receiver(post_save, sender=StepType)
+@receiver(pre_delete, sender=StepType)
+def bump_step_type_data_version(sender, instance, **kwargs):
+    DataVersion.objects.bump([instance.added_by_id])
+    DataVersion.objects.bump(Offer.objects.filter(steps__type=instance).values("developer_id"))
+
+
+@receiver(connection_created)
+def record_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
+    install_slow_query_recorder(connection)
+
+
+@receiver(connection_created)
+def tune_connection(sender, connection, **kwargs):
+    database.apply_sqlite_pragmas(connection)
+
+
+@receiver(request_started)
+def check_database_connections(sender, **kwargs):
+    database.close_unusable_connections()
+
+
+@receiver(workflow.transition_applied)
+def count_status_transitions(sender, transition, ids, **kwargs):
+    if settings.METRICS_ENABLED:
+        # transitions rolled back are not counted
+        transaction.on_commit(lambda: metrics.count_transition(transition, len(ids)))
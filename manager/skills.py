@@ -0,0 +1,111 @@
+import heapq
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from manager.models import Offer, OfferSkillBits
+
+# required skills count this many times more than optional ones in the match score
+REQUIRED_WEIGHT = 2
+OPTIONAL_WEIGHT = 1
+
+
+def to_bitset(skill_ids):
+    """Returns int with bits set on positions equal to skill ids"""
+    bitset = 0
+    for skill_id in skill_ids:
+        bitset |= 1 << skill_id
+    return bitset
+
+
+def to_bytes(bitset):
+    return bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+
+
+def from_bytes(data):
+    return int.from_bytes(data or b"", "little")
+
+
+def update_offer_skill_bits(offer_ids):
+    """Rebuilds skill bitsets of given offers from their skills_required and skills_optional"""
+    offer_ids = set(offer_ids)
+    if not offer_ids:
+        return
+    bits = {}
+    for index, through in enumerate([Offer.skills_required.through, Offer.skills_optional.through]):
+        for offer_id, skill_id in through.objects.filter(offer_id__in=offer_ids).values_list("offer_id", "skill_id"):
+            bits.setdefault(offer_id, [0, 0])[index] |= 1 << skill_id
+
+    with transaction.atomic():
+        OfferSkillBits.objects.filter(offer_id__in=offer_ids).delete()
+        create_offer_skill_bits(bits)
+
+
+def create_offer_skill_bits(bits):
+    """Inserts skill bitsets of offers that have none yet, bits maps offer id to (required, optional) bitsets"""
+    OfferSkillBits.objects.bulk_create(
+        [
+            OfferSkillBits(offer_id=offer_id, required=to_bytes(required), optional=to_bytes(optional))
+            for offer_id, (required, optional) in bits.items()
+            if required or optional
+        ]
+    )
+
+
+def match_score(required, optional, developer_bits):
+    """Returns weighted share of offer's skills the developer has, from 0 to 1"""
+    total = REQUIRED_WEIGHT * required.bit_count() + OPTIONAL_WEIGHT * optional.bit_count()
+    if not total:
+        return 0.0
+    matched = REQUIRED_WEIGHT * (required & developer_bits).bit_count()
+    return (matched + OPTIONAL_WEIGHT * (optional & developer_bits).bit_count()) / total
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    """Coverage of offer's skills by developer's skills"""
+
+    score: float
+    required_matched: int
+    required_total: int
+    optional_matched: int
+    optional_total: int
+
+    @classmethod
+    def from_bits(cls, required, optional, developer_bits):
+        return cls(
+            score=match_score(required, optional, developer_bits),
+            required_matched=(required & developer_bits).bit_count(),
+            required_total=required.bit_count(),
+            optional_matched=(optional & developer_bits).bit_count(),
+            optional_total=optional.bit_count(),
+        )
+
+    @property
+    def percent(self):
+        return round(self.score * 100)
+
+
+def rank_offers(developer, limit=50, offers=None):
+    """Returns developer's offers best covered by developer's skills, each with skill_match attribute.
+    All offers are scored from their skill bitsets loaded in a single query, only the top ones are loaded fully."""
+    developer_bits = to_bitset(developer.skills.values_list("id", flat=True))
+    offers = Offer.objects.filter(developer=developer) if offers is None else offers
+    rows = offers.values_list("id", "skill_bits__required", "skill_bits__optional").order_by()
+
+    def scored():
+        for offer_id, required, optional in rows.iterator():
+            required, optional = from_bytes(required), from_bytes(optional)
+            score = match_score(required, optional, developer_bits)
+            yield score, (required & developer_bits).bit_count(), offer_id, required, optional
+
+    # ties go to offers with more required skills covered, then to newer offers
+    top = heapq.nlargest(limit, scored())
+
+    loaded = Offer.objects.select_related("company").with_latest_step().in_bulk([item[2] for item in top])
+    results = []
+    for _score, _required_matched, offer_id, required, optional in top:
+        offer = loaded[offer_id]
+        offer.skill_match = SkillMatch.from_bits(required, optional, developer_bits)
+        results.append(offer)
+    return results
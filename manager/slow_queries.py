@@ -0,0 +1,181 @@
+"""Opt-in log of slow database queries.
+
+Queries taking at least SLOW_QUERY_MS are recorded with their parameters, the view handling the request,
+the innermost project code making the query and the database's plan of SELECT queries.
+Records are kept in a ring buffer of the process and logged as JSON lines by the "manager.slow_queries" logger,
+which writes them to a rotating SLOW_QUERY_LOG file. The slow_queries command aggregates the file."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.template.base import Node
+from django.utils import timezone
+
+from manager import async_views, middleware
+
+logger = logging.getLogger(__name__)
+
+# the latest records of this process, newest last
+recent = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+PARAM_LENGTH = 200
+# long IN lists are cut, their length is in the fingerprint's SQL anyway
+PARAMS_LIMIT = 20
+PROJECT_DIR = str(settings.BASE_DIR)
+IGNORED_DIRS = ("site-packages", "dist-packages")
+# modules calling views or rendering their responses, queries are not made by their code
+IGNORED_FILES = {__file__, middleware.__file__, async_views.__file__}
+
+
+def record_slow_query(execute, sql, params, many, context):
+    """Database execute wrapper recording queries taking at least SLOW_QUERY_MS"""
+    threshold = settings.SLOW_QUERY_MS
+    if not threshold:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms >= threshold:
+        record(context["connection"], sql, params, many, duration_ms)
+    return result
+
+
+def install_slow_query_recorder(connection):
+    # a thread reconnects with the same connection object, wrapper is added once
+    if record_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_query)
+
+
+def record(connection, sql, params, many, duration_ms):
+    timing = middleware.request_timing.get()
+    entry = {
+        "time": timezone.now().isoformat(),
+        "duration_ms": round(duration_ms, 3),
+        "fingerprint": get_fingerprint(sql),
+        "sql": sql,
+        # executemany gets a list of parameters of every row, the first one is enough to reproduce it
+        "params": format_params(next(iter(params), None) if many and params else params),
+        "many": many,
+        "view": timing.view_name if timing else None,
+        "location": get_location(),
+        "plan": None if many else explain(connection, sql, params),
+    }
+    recent.append(entry)
+    logger.warning(json.dumps(entry))
+    return entry
+
+
+def format_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: format_param(value) for key, value in params.items()}
+    params = list(params)
+    formatted = [format_param(value) for value in params[:PARAMS_LIMIT]]
+    if len(params) > PARAMS_LIMIT:
+        formatted.append(f"... {len(params) - PARAMS_LIMIT} more")
+    return formatted
+
+
+def format_param(value):
+    value = value if isinstance(value, (int, float, bool, type(None))) else str(value)
+    if isinstance(value, str) and len(value) > PARAM_LENGTH:
+        return f"{value[:PARAM_LENGTH]}..."
+    return value
+
+
+def normalize(sql):
+    """Returns SQL with literals replaced by ? and lists of placeholders of any length by one,
+    so that the same query with different parameters has the same form"""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    # savepoints of atomic blocks are named by thread and counter
+    sql = re.sub(r'"s\d+_x\d+"', '"s?"', sql)
+    sql = re.sub(r"(?<![\w\"])-?\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"%s|\?", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def get_fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:16]
+
+
+def get_location():
+    """Returns the innermost project code making the query, as path:line in function
+    or path:line of the template tag rendered, relative to BASE_DIR"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if code is Node.render_annotated.__code__:
+            # nodes of blocks know their own template, also when rendered by the template they extend
+            node = frame.f_locals["self"]
+            if node.origin and is_project_file(node.origin.name):
+                return f"{os.path.relpath(node.origin.name, PROJECT_DIR)}:{node.token.lineno}"
+        elif is_project_file(code.co_filename) and code.co_filename not in IGNORED_FILES:
+            return f"{os.path.relpath(code.co_filename, PROJECT_DIR)}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def is_project_file(path):
+    return str(path).startswith(PROJECT_DIR) and not any(directory in path for directory in IGNORED_DIRS)
+
+
+def explain(connection, sql, params):
+    """Returns rows of the database's plan of SELECT query, explaining other statements could change data"""
+    if not re.match(r"\s*(SELECT|WITH)\b", sql, re.IGNORECASE):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            # cursor of the database backend, so the plan is not counted as a query of the request
+            cursor.cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return [" ".join(str(column) for column in row) for row in cursor.cursor.fetchall()]
+    except DatabaseError as error:
+        # plan is optional, the query itself has already succeeded
+        return [f"EXPLAIN failed: {error}"]
+
+
+def read_log(paths):
+    """Yields records of JSON lines of log files, lines that are not records are skipped"""
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and "fingerprint" in entry:
+                    yield entry
+
+
+def aggregate(entries, apps=None):
+    """Returns statistics of every fingerprint of slow queries made by code of apps (all when None),
+    sorted by their total time, the slowest query of each is kept as its example"""
+    fingerprints = {}
+    for entry in entries:
+        location = entry.get("location") or ""
+        if apps and location.split("/", 1)[0] not in apps:
+            continue
+        stats = fingerprints.setdefault(
+            entry["fingerprint"],
+            {"fingerprint": entry["fingerprint"], "count": 0, "total_ms": 0.0, "views": set(), "locations": set()},
+        )
+        stats["count"] += 1
+        stats["total_ms"] += entry["duration_ms"]
+        stats["views"].add(entry.get("view") or "-")
+        stats["locations"].add(location or "-")
+        if entry["duration_ms"] >= stats.get("max_ms", 0):
+            stats.update(max_ms=entry["duration_ms"], example=entry)
+    results = sorted(fingerprints.values(), key=lambda stats: stats["total_ms"], reverse=True)
+    for stats in results:
+        stats["mean_ms"] = stats["total_ms"] / stats["count"]
+        stats["normalized"] = normalize(stats["example"]["sql"])
+        stats["views"], stats["locations"] = sorted(stats["views"]), sorted(stats["locations"])
+    return results
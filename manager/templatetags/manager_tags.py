@@ -0,0 +1,30 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from manager import rows
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def offer_rows(context, offers):
+    """Usage: {% offer_rows offers %}"""
+    return mark_safe(rows.render_offer_rows(offers, context))
+
+
+@register.simple_tag(takes_context=True)
+def company_rows(context, companies):
+    """Usage: {% company_rows companies %}"""
+    return mark_safe(rows.render_company_rows(companies, context))
+
+
+@register.simple_tag(takes_context=True)
+def step_row(context, step):
+    """Usage: {% step_row offer.latest_step %}"""
+    return mark_safe(rows.render_step_rows([step], context))
+
+
+@register.simple_tag(takes_context=True)
+def step_rows(context, steps):
+    """Usage: {% step_rows offer.steps.all %}"""
+    return mark_safe(rows.render_step_rows(steps, context))
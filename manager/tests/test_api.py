@@ -0,0 +1,110 @@
+import base64
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager.models import Company, Offer, RecruitmentStep, Skill, StepType
+from manager.tests import TestingBase
+
+# session, user and the page itself, plus prefetches of offer's skills and latest step
+MAX_QUERIES = {
+    "api-offer-list": 6,
+    "api-step-list": 3,
+    "api-company-list": 3,
+    "api-step-type-list": 3,
+    "api-skill-list": 3,
+}
+
+
+class ApiTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.skill = Skill.objects.create(name="Py")
+        self.offer.skills_required.add(self.skill)
+        self.step.type = self.step_type
+        self.step.save()
+
+    def get(self, name, params=None, **kwargs):
+        response = self.client.get(reverse(name, kwargs=kwargs), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def add_objects(self, count):
+        start = Offer.objects.count()
+        for i in range(start, start + count):
+            company = Company.objects.create(name=f"Company {i}", added_by=self.user)
+            offer = Offer.objects.create(title=f"Offer {i}", developer=self.user, company=company)
+            offer.skills_required.add(Skill.objects.create(name=f"Skill {i}"))
+            offer.skills_optional.add(self.skill)
+            RecruitmentStep.objects.create(offer=offer, type=self.step_type)
+            StepType.objects.create(name=f"Type {i}", added_by=self.user)
+
+    def test_not_authenticated_user(self):
+        self.assertEqual(self.client.get(reverse("api-offer-list")).status_code, 403)
+
+    def test_basic_authentication(self):
+        response = self.client.get(
+            reverse("api-offer-list"),
+            HTTP_AUTHORIZATION="Basic " + base64.b64encode(f"{self.user.email}:{self.password}".encode()).decode(),
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_offers_of_developer_only(self):
+        self.log_user()
+        Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        results = self.get("api-offer-list")["results"]
+        self.assertEqual([offer["id"] for offer in results], [self.offer.id, self.offer_clean.id])
+        self.assertEqual(results[0]["company"], self.company.name)
+        self.assertEqual(results[0]["skills_required"], ["Py"])
+        self.assertEqual(results[0]["latest_step"]["type"], self.step_type.name)
+        self.assertIsNone(results[1]["latest_step"])
+
+    def test_other_developer_object_not_found(self):
+        self.log_user(self.other_user.email, self.password2)
+        response = self.client.get(reverse("api-offer-detail", kwargs={"pk": self.offer.id}))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("api-step-detail", kwargs={"pk": self.step.id}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sparse_fieldset(self):
+        self.log_user()
+        with self.assertNumQueries(3):
+            offer = self.get("api-offer-detail", {"fields": "id,title"}, pk=self.offer.id)
+        self.assertEqual(offer, {"id": self.offer.id, "title": self.offer.title})
+        response = self.client.get(reverse("api-offer-list"), {"fields": "id,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination(self):
+        self.log_user()
+        self.add_objects(3)
+        page = self.get("api-offer-list", {"page_size": 2, "fields": "id"})
+        ids = [offer["id"] for offer in page["results"]]
+        while page["next"]:
+            page = self.client.get(page["next"]).json()
+            ids += [offer["id"] for offer in page["results"]]
+        offers = Offer.objects.filter(developer=self.user).order_by("-updated_on", "-created_on", "id")
+        self.assertEqual(ids, list(offers.values_list("id", flat=True)))
+        self.assertEqual(self.client.get(reverse("api-offer-list"), {"cursor": "bad"}).status_code, 404)
+
+    def test_filters(self):
+        self.log_user()
+        steps = self.get("api-step-list", {"offer": self.offer.id})["results"]
+        self.assertEqual([step["id"] for step in steps], [self.step.id])
+        self.assertEqual(self.client.get(reverse("api-offer-list"), {"status": "abc"}).status_code, 400)
+        self.user.skills.add(self.skill)
+        Skill.objects.create(name="Go")
+        self.assertEqual(self.get("api-skill-list", {"mine": 1})["results"], [{"id": self.skill.id, "name": "Py"}])
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.log_user()
+        self.add_objects(2)
+        for name, max_queries in MAX_QUERIES.items():
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as context:
+                    self.get(name, {"page_size": 1})
+                self.assertLessEqual(len(context), max_queries)
+                self.add_objects(1)
+                with self.assertNumQueries(len(context)):
+                    self.assertGreater(len(self.get(name, {"page_size": 100})["results"]), 1)
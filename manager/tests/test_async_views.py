@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from django.test import TransactionTestCase, override_settings
+from django.urls import include, path, reverse
+
+from devagent.urls import urlpatterns as project_urlpatterns
+from manager import views
+from manager.async_views import async_view
+from manager.models import Offer
+from manager.tests import TestingBase
+
+# read paths served by async views, as with ASYNC_VIEWS set, ahead of the project's sync ones
+urlpatterns = [
+    path("companies", async_view(views.CompanyListView.as_view())),
+    path("offers", async_view(views.OfferListView.as_view())),
+    path("offers/<int:pk>", async_view(views.OfferDetailView.as_view())),
+    path("offers/steps/<int:pk>", async_view(views.RecruitmentStepDetailView.as_view())),
+    path("", include(project_urlpatterns)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTestCase(TestingBase, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.urls = [
+            reverse("company-list"),
+            reverse("offer-list"),
+            reverse("offer-detail", kwargs={"pk": self.offer.id}),
+            reverse("step-detail", kwargs={"pk": self.step.id}),
+        ]
+        self.other_offer = Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        self.async_client.force_login(self.user)
+
+    def test_async_view(self):
+        view = async_view(views.OfferListView.as_view())
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertIs(view.view_class, views.OfferListView)
+
+    async def test_read_paths(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "nav-avatar")
+                # extra arguments of the async client are header names in Django 3.2
+                response = await self.async_client.get(url, **{"If-None-Match": response["ETag"]})
+                self.assertEqual(response.status_code, 304)
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*[self.async_client.get(url) for url in self.urls * 4])
+        self.assertEqual([response.status_code for response in responses], [200] * len(self.urls) * 4)
+
+    async def test_other_developer_object(self):
+        response = await self.async_client.get(reverse("offer-detail", kwargs={"pk": self.other_offer.id}))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_not_logged_in(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get(self.urls[1])
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=1)
+    async def test_queries_of_worker_threads_measured(self):
+        with self.assertLogs("manager.middleware", "INFO") as logs:
+            await self.async_client.get(self.urls[1])
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertGreater(entry["queries"], 1)
+        # rendered in the worker thread, before process_template_response of the middleware
+        self.assertGreater(entry["template_ms"], 0)
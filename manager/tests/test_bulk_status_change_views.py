@@ -0,0 +1,75 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from manager.models import Offer, RecruitmentStep
+from manager.tests import TestingBase
+
+
+class BulkStatusChangeViewTestCase(TestingBase, TestCase):
+    def post_items(self, items):
+        return self.client.post(
+            reverse("bulk-status-change"), data=json.dumps({"items": items}), content_type="application/json"
+        )
+
+    def test_not_authenticated_user(self):
+        response = self.post_items([{"id": self.offer_clean.id, "action": "offer-send"}])
+        self.assertEqual(response.status_code, 302)
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.CREATED)
+
+    def test_get_not_allowed(self):
+        self.log_user()
+        response = self.client.get(reverse("bulk-status-change"))
+        self.assertEqual(response.status_code, 405)
+
+    def test_invalid_body(self):
+        self.log_user()
+        response = self.client.post(reverse("bulk-status-change"), data="{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.post_items([{"action": "offer-send"}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_per_item_results(self):
+        self.log_user()
+        other_offer = Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        self.step.status = RecruitmentStep.Statuses.PLANNED
+        self.step.save()
+        response = self.post_items(
+            [
+                {"id": self.offer_clean.id, "action": "offer-send"},
+                {"id": other_offer.id, "action": "offer-send"},
+                {"id": self.step.id, "action": "step-finish"},
+                {"id": self.step.id, "action": "step-accept"},
+                {"id": self.offer.id, "action": "offer-send"},
+                {"id": self.offer.id, "action": "offer-explode"},
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["result"] for item in response.json()["results"]],
+            ["ok", "not_found", "ok", "ok", "not_allowed", "unknown_action"],
+        )
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.APPLICATION_SENT)
+        other_offer.refresh_from_db()
+        self.assertEqual(other_offer.status, Offer.Statuses.CREATED)
+        self.step.refresh_from_db()
+        self.assertEqual(self.step.status, RecruitmentStep.Statuses.SUCCESS)
+
+    def test_step_of_other_user(self):
+        self.log_user(email=self.other_user.email, password=self.password2)
+        response = self.post_items([{"id": self.step.id, "action": "step-reject"}])
+        self.assertEqual(response.json()["results"][0]["result"], "not_found")
+        self.step.refresh_from_db()
+        self.assertEqual(self.step.status, RecruitmentStep.Statuses.CREATED)
+
+    def test_query_count_does_not_grow_with_items(self):
+        self.log_user()
+        steps = [RecruitmentStep.objects.create(offer=self.offer) for _ in range(10)]
+        self.client.get(reverse("homepage"))
+        with self.assertNumQueries(13):
+            self.post_items([{"id": step.id, "action": "step-reject"} for step in steps[:2]])
+        with self.assertNumQueries(13):
+            self.post_items([{"id": step.id, "action": "step-reject"} for step in steps[2:]])
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from manager import workflow
+from manager.importer import OfferImporter
+from manager.models import Company, Offer, RecruitmentStep
+from manager.tests import TestingBase
+
+
+class ConditionalGetTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.urls = [
+            reverse("offer-list"),
+            reverse("company-list"),
+            reverse("offer-detail", kwargs={"pk": self.offer.id}),
+            reverse("step-detail", kwargs={"pk": self.step.id}),
+        ]
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_not_modified(self):
+        self.log_user()
+        # session, user and data version, read by detail pages together with their object to check ownership
+        for url, queries in zip(self.urls, [3, 3, 3, 3]):
+            with self.subTest(url=url):
+                etag = self.get_etag(url)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+                self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_etag_changes_with_shown_objects(self):
+        self.log_user()
+        url = reverse("offer-list")
+        changes = [
+            lambda: Offer.objects.create(title="New", developer=self.user, company=self.company),
+            lambda: RecruitmentStep.objects.create(offer=self.offer_clean),
+            lambda: self.company.save(),
+            lambda: Company.objects.create(name="Other", added_by=self.user),
+            lambda: self.step_type.save(),
+            lambda: workflow.apply(workflow.OFFER_RESIGN, [self.offer]),
+            lambda: OfferImporter(self.user).import_rows([(2, {"title": "Imported"})]),
+            lambda: self.offer_clean.delete(),
+        ]
+        etags = [self.get_etag(url)]
+        for change in changes:
+            change()
+            etags.append(self.get_etag(url))
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_company_change_seen_by_other_developers(self):
+        self.log_user(self.other_user.email, self.password2)
+        Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        etag = self.get_etag(self.urls[0])
+        self.company.name = "Renamed"
+        self.company.save()
+        self.assertNotEqual(self.get_etag(self.urls[0]), etag)
+
+    def test_etag_depends_on_url(self):
+        self.log_user()
+        self.assertNotEqual(self.get_etag(self.urls[0]), self.get_etag(self.urls[0] + "?sort=1"))
+
+    def test_other_user_object(self):
+        self.log_user()
+        etag = self.get_etag(self.urls[2])
+        self.client.logout()
+        self.log_user(self.other_user.email, self.password2)
+        response = self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_page_with_pending_messages_rendered(self):
+        self.log_user()
+        url = reverse("company-list")
+        etag = self.get_etag(url)
+        # saving skills changes nothing shown on the page, only queues a message
+        self.client.post(reverse("developer-skills"), {"skills": []})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["messages"]), 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
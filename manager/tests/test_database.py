@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.contrib import messages
+from django.db import OperationalError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from manager import database, workflow
+from manager.backends.sqlite3.base import DatabaseWrapper
+from manager.forms import CompanyForm
+from manager.models import Company, DataVersion, Offer
+from manager.tests import TestingBase
+
+
+class DatabaseTuningTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file_connection = self.get_file_connection()
+
+    def get_file_connection(self):
+        file_connection = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": os.path.join(self.directory.name, "db.sqlite3")}, alias="tuning"
+        )
+        self.addCleanup(file_connection.close)
+        return file_connection
+
+    def get_pragma(self, name, database_connection=connection):
+        with database_connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_new_connections(self):
+        self.assertEqual(self.get_pragma("journal_mode", self.file_connection), "wal")
+        self.assertEqual(self.get_pragma("synchronous", self.file_connection), 1)
+        self.assertEqual(self.get_pragma("busy_timeout", self.file_connection), 5000)
+        self.assertEqual(self.get_pragma("cache_size", self.file_connection), -20000)
+        self.assertEqual(self.get_pragma("temp_store", self.file_connection), 2)
+        # the test database is in memory and keeps its own journal
+        self.assertEqual(self.get_pragma("synchronous"), 1)
+
+    def test_pragmas_from_settings(self):
+        with override_settings(SQLITE_PRAGMAS={"journal_mode": "DELETE", "cache_size": -1234}):
+            self.assertEqual(self.get_pragma("journal_mode", self.file_connection), "delete")
+            self.assertEqual(self.get_pragma("cache_size", self.file_connection), -1234)
+
+    def test_unusable_connections_closed(self):
+        self.file_connection.ensure_connection()
+        with patch.object(database.connections, "all", return_value=[self.file_connection]), patch.object(
+            self.file_connection, "is_usable", return_value=False
+        ):
+            database.close_unusable_connections()
+            self.assertIsNotNone(self.file_connection.connection)
+
+            self.file_connection.settings_dict["CONN_HEALTH_CHECKS"] = True
+            database.close_unusable_connections()
+            self.assertIsNone(self.file_connection.connection)
+
+    def test_transactions_take_write_lock_when_they_begin(self):
+        self.assertIsInstance(connections["default"], DatabaseWrapper)
+        other_connection = self.get_file_connection()
+        with other_connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+        self.file_connection.ensure_connection()
+        self.file_connection._start_transaction_under_autocommit()
+        try:
+            with override_settings(SQLITE_PRAGMAS={"busy_timeout": 0}):
+                other_connection.close()
+                # the transaction has not written yet
+                with self.assertRaisesMessage(
+                    OperationalError, "database is locked"
+                ), other_connection.cursor() as cursor:
+                    cursor.execute("INSERT INTO item DEFAULT VALUES")
+        finally:
+            self.file_connection.connection.execute("ROLLBACK")
+
+
+@patch.object(database.time, "sleep")
+class WriteRetryTestCase(TestingBase, TransactionTestCase):
+    def locked_write(self, failures, error="database is locked"):
+        """Returns function failing failures times, then returning the number of its calls"""
+        calls = []
+
+        def write():
+            calls.append(transaction.get_connection().in_atomic_block)
+            if len(calls) <= failures:
+                raise OperationalError(error)
+            return len(calls)
+
+        return write, calls
+
+    def test_retried_while_locked(self, sleep):
+        write, calls = self.locked_write(2)
+        self.assertEqual(database.run_write(write), 3)
+        self.assertEqual(calls, [True] * 3)
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertLessEqual(delays[0], 0.02)
+        self.assertLessEqual(delays[1], 0.04)
+
+    @override_settings(WRITE_RETRY_ATTEMPTS=3)
+    def test_attempts_bounded(self, sleep):
+        write, calls = self.locked_write(10)
+        with self.assertRaisesMessage(OperationalError, "database is locked"):
+            database.run_write(write)
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_not_retried(self, sleep):
+        write, calls = self.locked_write(1, "no such table: item")
+        with self.assertRaises(OperationalError):
+            database.run_write(write)
+        self.assertEqual(len(calls), 1)
+
+    def test_nested_write_is_part_of_transaction(self, sleep):
+        write, calls = self.locked_write(1)
+        with self.assertRaises(OperationalError), transaction.atomic():
+            database.run_write(write)
+        self.assertEqual(len(calls), 1)
+
+    def test_status_change_retried(self, sleep):
+        self.log_user()
+        write, calls = self.locked_write(1)
+        as_queryset = workflow.as_queryset
+        with patch.object(workflow, "as_queryset", side_effect=lambda *args: write() and as_queryset(*args)):
+            response = self.client.get(reverse("offer-send", kwargs={"pk": self.offer_clean.pk}))
+        self.assertRedirects(response, reverse("offer-list"))
+        self.assertEqual(calls, [True, True])
+        # only the write is retried, the message is added once
+        self.assertEqual(len(messages.get_messages(response.wsgi_request)), 1)
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.APPLICATION_SENT)
+
+    def test_form_save_retried(self, sleep):
+        self.log_user()
+        write, calls = self.locked_write(1)
+        save = CompanyForm.save
+        with patch.object(CompanyForm, "save", autospec=True, side_effect=lambda form: write() and save(form)):
+            response = self.client.post(reverse("company-create"), {"name": "Retried company"})
+        self.assertRedirects(response, reverse("company-list"))
+        self.assertEqual(calls, [True, True])
+        self.assertEqual(len(messages.get_messages(response.wsgi_request)), 1)
+        self.assertEqual(Company.objects.filter(name="Retried company").count(), 1)
+
+    def test_signal_writes_are_part_of_the_save(self, sleep):
+        self.log_user()
+        url = reverse("company-update", kwargs={"pk": self.company.pk})
+        with patch.object(DataVersion.objects, "bump", side_effect=OperationalError("disk I/O error")):
+            with self.assertRaises(OperationalError):
+                self.client.post(url, {"name": "Not saved"})
+        self.company.refresh_from_db()
+        self.assertNotEqual(self.company.name, "Not saved")
+
+    @override_settings(WRITE_QUEUE=True)
+    def test_writes_queued(self, sleep):
+        @database.atomic_write
+        def create_company(name):
+            return Company.objects.create(name=name, added_by=self.user), threading.current_thread().name
+
+        company, thread_name = create_company("Queued company")
+        self.assertTrue(thread_name.startswith("database-writer"))
+        self.assertTrue(Company.objects.filter(pk=company.pk).exists())
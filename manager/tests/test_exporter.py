@@ -0,0 +1,89 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager.exporter import export_offers
+from manager.importer import OfferImporter, read_rows
+from manager.models import Offer, RecruitmentStep, Skill
+from manager.tests import TestingBase
+
+
+class ExportOffersTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.offer.skills_required.set([Skill.objects.create(name="Py"), Skill.objects.create(name="Dj")])
+        self.offer.skills_optional.set([Skill.objects.create(name="SQL")])
+        self.step.type = self.step_type
+        self.step.save()
+
+    def export(self, file_format, chunk_size=1000):
+        return "".join(export_offers(self.user, file_format, chunk_size))
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.offer.id, self.offer_clean.id])
+        self.assertEqual(rows[0]["company"], self.company.name)
+        self.assertEqual(rows[0]["skills_required"], ["Dj", "Py"])
+        self.assertEqual(rows[0]["skills_optional"], ["SQL"])
+        self.assertEqual([step["id"] for step in rows[0]["steps"]], [self.step.id])
+        self.assertEqual(rows[0]["steps"][0]["type"], self.step_type.name)
+        self.assertEqual(rows[1]["steps"], [])
+
+    def test_csv_can_be_imported(self):
+        text = self.export("csv")
+        self.assertTrue(text.startswith("id,status,company,title,"))
+        result = OfferImporter(self.other_user).import_rows(read_rows(io.StringIO(text), "csv"))
+        self.assertEqual((result.created, result.failed), (2, 0))
+        imported = Offer.objects.filter(developer=self.other_user).get(title=self.offer.title)
+        self.assertEqual(sorted(imported.skills_required.values_list("name", flat=True)), ["Dj", "Py"])
+        self.assertEqual(imported.company, self.company)
+
+    def test_header_sent_before_offers_are_read(self):
+        pieces = export_offers(self.user, "csv")
+        with self.assertNumQueries(0):
+            next(pieces)
+
+    def test_query_count_depends_on_chunks_only(self):
+        with CaptureQueriesContext(connection) as context:
+            self.export("ndjson", chunk_size=2)
+        for i in range(10):
+            offer = Offer.objects.create(title=f"Offer {i}", developer=self.user, company=self.company)
+            offer.skills_required.set(Skill.objects.all())
+            RecruitmentStep.objects.create(offer=offer, type=self.step_type)
+        with self.assertNumQueries(len(context)):
+            self.export("ndjson", chunk_size=12)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_offers(self.user, "xml")
+
+
+class OfferExportViewTestCase(TestingBase, TestCase):
+    def test_not_authenticated_user(self):
+        self.assertEqual(self.client.get(reverse("offer-export")).status_code, 302)
+
+    def test_export(self):
+        self.log_user()
+        Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        response = self.client.get(reverse("offer-export"), {"format": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="offers.ndjson"')
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["title"] for row in rows], [self.offer.title, self.offer_clean.title])
+
+    def test_unknown_format(self):
+        self.log_user()
+        self.assertEqual(self.client.get(reverse("offer-export"), {"format": "xml"}).status_code, 404)
+
+
+class ExportOffersCommandTestCase(TestingBase, TestCase):
+    def test_export_to_stdout(self):
+        stdout = io.StringIO()
+        call_command("export_offers", developer=self.user.email, format="ndjson", stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
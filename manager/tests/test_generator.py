@@ -0,0 +1,96 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+from django.test import TestCase
+
+from manager.generator import EMAIL_DOMAIN, DataGenerator
+from manager.management.commands.benchmark_indexes import check_benchmark_database
+from manager.models import (
+    Company,
+    DataVersion,
+    Offer,
+    OfferSkillBits,
+    RecruitmentStep,
+    StepType,
+)
+from manager.search import search_offers
+from manager.skills import from_bytes
+
+
+class DataGeneratorTestCase(TestCase):
+    def test_generate(self):
+        result = DataGenerator(batch_size=7).generate(2, companies=3, offers=20, steps=2, skills=40)
+        developers = list(DataVersion.objects.filter(developer__email__endswith=f"@{EMAIL_DOMAIN}"))
+        self.assertEqual(len(developers), 2)
+        self.assertEqual((result.users, result.companies, result.offers), (2, 6, 40))
+        self.assertEqual(Offer.objects.count(), 40)
+        self.assertEqual(RecruitmentStep.objects.count(), result.steps)
+        self.assertEqual(
+            list(Offer.objects.values_list("developer").annotate(count=Count("id")).values_list("count", flat=True)),
+            [20, 20],
+        )
+        self.assertEqual(Company.objects.filter(added_by=developers[0].developer).count(), 3)
+        self.assertEqual(StepType.objects.filter(added_by=developers[0].developer).count(), 5)
+        # steps have types of their offer's developer
+        self.assertFalse(RecruitmentStep.objects.exclude(type__added_by=F("offer__developer")).exists())
+
+    def test_skills_consistent(self):
+        DataGenerator().generate(1, offers=10, skills_per_offer=3)
+        for offer in Offer.objects.prefetch_related("skills_required", "skills_optional"):
+            skills = list(offer.skills_required.all()) + list(offer.skills_optional.all())
+            self.assertEqual(len(skills), 3)
+            bits = OfferSkillBits.objects.get(offer=offer)
+            self.assertEqual(
+                from_bytes(bits.required) | from_bytes(bits.optional), sum(1 << skill.id for skill in skills)
+            )
+        offer = Offer.objects.first()
+        self.assertIn(offer, search_offers(offer.developer, offer.title))
+
+    def test_same_seed_same_data(self):
+        DataGenerator(seed=5).generate(1, offers=10)
+        first = list(Offer.objects.order_by("id").values_list("title", "status", "earnings_min"))
+        Offer.objects.all().delete()
+        DataGenerator(seed=5).generate(1, offers=10)
+        self.assertEqual(list(Offer.objects.order_by("id").values_list("title", "status", "earnings_min")), first)
+
+
+class BenchmarkViewsTestCase(TestCase):
+    def test_benchmark_views(self):
+        call_command("generate_data", users=1, offers=5, steps=3, stdout=StringIO())
+        developer = f"developer-0@{EMAIL_DOMAIN}"
+        statuses = list(Offer.objects.order_by("id").values_list("status", flat=True))
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as file:
+            call_command(
+                "benchmark_views", developer=developer, repeat=2, output=file.name, stdout=StringIO(), stderr=StringIO()
+            )
+            report = json.load(file)
+        self.assertEqual(report["sizes"]["developer_offers"], 5)
+        results = report["results"]
+        self.assertEqual(results["offer-list"]["status"], 200)
+        self.assertGreater(results["offer-list"]["queries"], 0)
+        self.assertIn("password_reset_confirm", results)
+        self.assertIn("step-calendar", results)
+        # every request is rolled back, also of views changing statuses
+        self.assertEqual(results["offer-resign"]["status"], 302)
+        self.assertEqual(list(Offer.objects.order_by("id").values_list("status", flat=True)), statuses)
+
+
+class BenchmarkDatabaseTestCase(TestCase):
+    def test_database_with_offers_refused(self):
+        call_command("generate_data", users=1, offers=1, stdout=StringIO())
+        for command in ("benchmark_indexes", "benchmark_search"):
+            with self.subTest(command=command):
+                with self.assertRaisesMessage(CommandError, "--database"):
+                    call_command(command, offers=1, stdout=StringIO())
+                with self.assertRaisesMessage(CommandError, "is not the configured database"):
+                    call_command(command, offers=1, database="/tmp/bench.sqlite3", stdout=StringIO())
+        self.assertEqual(Offer.objects.count(), 1)
+
+    def test_configured_or_empty_database_accepted(self):
+        check_benchmark_database(None)
+        call_command("generate_data", users=1, offers=1, stdout=StringIO())
+        check_benchmark_database(str(connection.settings_dict["NAME"]))
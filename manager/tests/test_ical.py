@@ -0,0 +1,122 @@
+import re
+from datetime import timedelta
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from manager.ical import check_feed_token, fold_line, get_feed_token, reset_feed_token
+from manager.models import DataVersion, Offer, RecruitmentStep
+from manager.tests import TestingBase
+
+
+class FeedTokenTestCase(TestingBase, TestCase):
+    def test_token(self):
+        token = get_feed_token(self.user)
+        version = DataVersion.objects.get(developer=self.user).version
+        self.assertEqual(check_feed_token(token), (self.user.id, version))
+        self.assertIsNone(check_feed_token(f"{self.other_user.id}-{token.partition('-')[2]}"))
+        self.assertIsNone(check_feed_token("x-y"))
+
+    def test_reset_token(self):
+        token = get_feed_token(self.user)
+        reset_feed_token(self.user)
+        self.user.refresh_from_db()
+        self.assertIsNone(check_feed_token(token))
+        self.assertNotEqual(get_feed_token(self.user), token)
+        self.assertIsNotNone(check_feed_token(get_feed_token(self.user)))
+
+    def test_fold_line(self):
+        line = "DESCRIPTION:" + "ż" * 60
+        folded = fold_line(line).split("\r\n")
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded))
+        self.assertEqual(folded[0] + "".join(part[1:] for part in folded[1:]), line)
+
+
+class StepCalendarViewTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("step-calendar", kwargs={"token": get_feed_token(self.user)})
+        now = timezone.now()
+        self.step.type = self.step_type
+        self.step.scheduled_on = now + timedelta(days=1)
+        self.step.description = "Bring laptop; meet Anna, Bob"
+        self.step.save()
+        self.old_step = RecruitmentStep.objects.create(offer=self.offer_clean, scheduled_on=now - timedelta(days=90))
+        other_offer = Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        RecruitmentStep.objects.create(offer=other_offer, scheduled_on=now)
+
+    def test_feed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        content = response.content.decode()
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(content.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:step-{self.step.id}@testserver", content)
+        self.assertIn(f"SUMMARY:Test type: Test Offer ({self.company.name})", content)
+        self.assertIn("Bring laptop\\; meet Anna\\, Bob", content.replace("\r\n ", ""))
+
+    def test_only_planned_steps(self):
+        for status in (RecruitmentStep.Statuses.FINISHED, RecruitmentStep.Statuses.NEGATIVE):
+            RecruitmentStep.objects.filter(pk=self.step.pk).update(status=status)
+            DataVersion.objects.bump([self.user.pk])
+            with self.subTest(status=status):
+                self.assertNotContains(self.client.get(self.url), "BEGIN:VEVENT")
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.step.scheduled_on += timedelta(hours=1)
+        self.step.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_token(self):
+        url = reverse("step-calendar", kwargs={"token": f"{self.user.id}-invalid"})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_feed_link_on_offer_list(self):
+        self.log_user()
+        self.assertContains(self.client.get(reverse("offer-list")), self.url)
+
+    def test_reset_view(self):
+        self.log_user()
+        response = self.client.post(reverse("step-calendar-reset"))
+        self.assertRedirects(response, reverse("offer-list"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.user.refresh_from_db()
+        self.assertContains(self.client.get(reverse("offer-list")), get_feed_token(self.user))
+
+    def login_with_form(self, client):
+        """Logs in with the login form, which rotates the CSRF token of the client"""
+        client.get(reverse("login"))
+        response = client.post(
+            reverse("login"),
+            {
+                "username": self.user.email,
+                "password": self.password,
+                "csrfmiddlewaretoken": client.cookies["csrftoken"].value,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_reset_from_list_revalidated_after_login(self):
+        client = Client(enforce_csrf_checks=True)
+        self.login_with_form(client)
+        etag = client.get(reverse("offer-list"))["ETag"]
+        client.get(reverse("logout"))
+        self.login_with_form(client)
+
+        response = client.get(reverse("offer-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        token = re.search(r'name="csrfmiddlewaretoken" value="(\w+)"', response.content.decode())[1]
+        response = client.post(reverse("step-calendar-reset"), {"csrfmiddlewaretoken": token})
+        self.assertRedirects(response, reverse("offer-list"), fetch_redirect_response=False)
@@ -0,0 +1,131 @@
+import io
+import json
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager.importer import OfferImporter, read_rows
+from manager.models import Company, Offer, OfferSkillBits, Skill
+from manager.search import search_offers
+from manager.tests import TestingBase
+
+CSV_HEADER = "title,company,skills_required,skills_optional,level,earnings_min,remote,description\n"
+
+
+def csv_rows(count, start=0):
+    return "".join(
+        f'Offer {i},Company {i % 3},"Py; Dj",SQL,2,{1000 + i},false,Description {i}\n'
+        for i in range(start, start + count)
+    )
+
+
+class OfferImporterTestCase(TestingBase, TestCase):
+    def import_text(self, text, file_format="csv", chunk_size=1000):
+        return OfferImporter(self.user, chunk_size).import_rows(read_rows(io.StringIO(text), file_format))
+
+    def test_csv_import(self):
+        Skill.objects.create(name="Py")
+        result = self.import_text(CSV_HEADER + csv_rows(4) + "Test,Test company,,,,,,\n")
+        self.assertEqual((result.rows, result.created, result.failed), (5, 5, 0))
+
+        offer = Offer.objects.get(title="Offer 1")
+        self.assertEqual(offer.developer, self.user)
+        self.assertEqual(offer.company.name, "Company 1")
+        self.assertEqual((offer.level, offer.earnings_min, offer.remote), (2, 1001, False))
+        self.assertEqual(sorted(offer.skills_required.values_list("name", flat=True)), ["Dj", "Py"])
+        self.assertEqual(list(offer.skills_optional.values_list("name", flat=True)), ["SQL"])
+        self.assertTrue(OfferSkillBits.objects.filter(offer=offer).exists())
+        self.assertEqual(Offer.objects.get(title="Test").company, self.company)
+        self.assertEqual(Company.objects.filter(name__startswith="Company").count(), 3)
+        self.assertEqual(Skill.objects.filter(name__in=["Py", "Dj", "SQL"]).count(), 3)
+        self.assertEqual([offer.title for offer in search_offers(self.user, "description 3")], ["Offer 3"])
+
+    def test_ndjson_import_with_invalid_rows(self):
+        lines = [
+            json.dumps({"title": "First", "skills_required": ["Go", "Rust"], "remote": True}),
+            "",
+            json.dumps({"title": "", "company": "Acme"}),
+            "{not json",
+            json.dumps({"title": "Bad level", "level": 9}),
+            json.dumps(["not", "object"]),
+            json.dumps({"title": "Last", "earnings_max": "1200"}),
+        ]
+        result = self.import_text("\n".join(lines), "ndjson")
+        self.assertEqual((result.rows, result.created, result.failed), (6, 2, 4))
+        self.assertEqual([line for line, _error in result.errors], [3, 4, 5, 6])
+        self.assertIn("level", result.errors[2][1])
+        self.assertEqual(Offer.objects.get(title="Last").earnings_max, 1200)
+        self.assertFalse(Company.objects.filter(name="Acme").exists())
+
+    def test_query_count_depends_on_chunks_only(self):
+        self.import_text(CSV_HEADER + csv_rows(3))
+        with CaptureQueriesContext(connection) as context:
+            self.import_text(CSV_HEADER + csv_rows(10, start=3), chunk_size=10)
+        with self.assertNumQueries(len(context)):
+            self.import_text(CSV_HEADER + csv_rows(50, start=13), chunk_size=50)
+        with self.assertNumQueries(len(context) * 2):
+            self.import_text(CSV_HEADER + csv_rows(100, start=63), chunk_size=50)
+
+    def test_import_in_chunks(self):
+        progress = []
+        result = OfferImporter(self.user, chunk_size=3).import_rows(
+            read_rows(io.StringIO(CSV_HEADER + csv_rows(7)), "csv"),
+            progress=lambda result: progress.append(result.rows),
+        )
+        self.assertEqual(progress, [3, 6, 7])
+        self.assertEqual(result.created, 7)
+        self.assertEqual(Offer.objects.filter(title__startswith="Offer ").count(), 7)
+
+    def test_ids_of_deleted_offers_not_used_again(self):
+        self.import_text(CSV_HEADER + csv_rows(3))
+        last_id = Offer.objects.latest("id").id
+        Offer.objects.filter(id=last_id).delete()
+        self.import_text(CSV_HEADER + csv_rows(2, start=3))
+        self.assertEqual(
+            list(Offer.objects.filter(id__gte=last_id).order_by("id").values_list("id", "title")),
+            [(last_id + 1, "Offer 3"), (last_id + 2, "Offer 4")],
+        )
+        # offers created one by one continue after the imported ones
+        self.assertEqual(Offer.objects.create(title="Next", developer=self.user).id, last_id + 3)
+
+
+class ImportOffersCommandTestCase(TestingBase, TestCase):
+    def test_import_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(CSV_HEADER + csv_rows(3))
+            file.flush()
+            stdout = io.StringIO()
+            call_command("import_offers", file.name, developer=self.user.email, stdout=stdout)
+        self.assertIn("3 offers imported, 0 rows failed", stdout.getvalue())
+        self.assertEqual(Offer.objects.filter(developer=self.user, title__startswith="Offer ").count(), 3)
+
+
+class OfferImportViewTestCase(TestingBase, TestCase):
+    def upload(self, name, content, file_format=""):
+        return self.client.post(
+            reverse("offer-import"),
+            {"file": SimpleUploadedFile(name, content.encode()), "format": file_format},
+        )
+
+    def test_not_authenticated_user(self):
+        response = self.upload("offers.csv", CSV_HEADER + csv_rows(1))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Offer.objects.filter(title="Offer 0").exists())
+
+    def test_upload(self):
+        self.log_user()
+        response = self.upload("offers.csv", "﻿" + CSV_HEADER + csv_rows(2) + ",Company without offer\n")
+        self.assertRedirects(response, reverse("offer-list"))
+        self.assertEqual(Offer.objects.filter(developer=self.user, title__startswith="Offer ").count(), 2)
+        messages = [str(message) for message in response.wsgi_request._messages]
+        self.assertEqual(messages[0], "2 offers imported, 1 rows failed.")
+
+    def test_upload_ndjson_format_chosen(self):
+        self.log_user()
+        self.upload("offers.txt", json.dumps({"title": "From JSON"}), file_format="ndjson")
+        self.assertTrue(Offer.objects.filter(developer=self.user, title="From JSON").exists())
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from manager import metrics, workflow
+from manager.tests import TestingBase
+
+User = get_user_model()
+
+
+def parse_metrics(content):
+    """Returns value of every sample by its name with labels"""
+    samples = {}
+    for line in content.splitlines():
+        if line and not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+
+class MetricsTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.clear()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@dev.dev", password=self.password, is_staff=True
+        )
+
+    def get_metrics(self, **headers):
+        response = self.client.get(reverse("metrics"), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        return parse_metrics(response.content.decode())
+
+    def test_access(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.log_user()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.logout()
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+            self.get_metrics(HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+    def test_request_metrics(self):
+        self.log_user()
+        for _ in range(3):
+            self.client.get(reverse("offer-list"))
+        self.client.get("/not-existing")
+        self.log_user("staff@dev.dev")
+        samples = self.get_metrics()
+
+        self.assertEqual(samples['devagent_responses_total{view="offer-list",status="200"}'], 3)
+        self.assertEqual(samples['devagent_responses_total{view="<unresolved>",status="404"}'], 1)
+        self.assertEqual(samples['devagent_request_duration_seconds_count{view="offer-list"}'], 3)
+        self.assertEqual(samples['devagent_request_duration_seconds_bucket{view="offer-list",le="+Inf"}'], 3)
+        self.assertGreater(samples['devagent_request_duration_seconds_sum{view="offer-list"}'], 0)
+        # every request of the list makes the same queries
+        queries = samples['devagent_request_queries_sum{view="offer-list"}'] / 3
+        buckets = [
+            (float(le), samples[f'devagent_request_queries_bucket{{view="offer-list",le="{le}"}}'])
+            for le in map(metrics.format_number, metrics.QUERY_BUCKETS)
+        ]
+        self.assertEqual([count for le, count in buckets], [3 if le >= queries else 0 for le, _count in buckets])
+
+    def test_status_transitions(self):
+        self.log_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("offer-send", kwargs={"pk": self.offer_clean.pk}))
+            self.client.get(reverse("step-accept", kwargs={"pk": self.step.pk}))
+            self.client.post(
+                reverse("bulk-status-change"),
+                {
+                    "items": [
+                        {"id": self.offer.pk, "action": "offer-resign"},
+                        {"id": self.offer_clean.pk, "action": "offer-send"},
+                    ]
+                },
+                content_type="application/json",
+            )
+        # rolled back transitions are not counted
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.assertEqual(workflow.apply(workflow.OFFER_RESIGN, [self.offer_clean]), [self.offer_clean.pk])
+            transaction.set_rollback(True)
+        self.log_user("staff@dev.dev")
+        samples = self.get_metrics()
+        self.assertEqual(samples['devagent_status_transitions_total{model="offer",transition="send"}'], 1)
+        self.assertEqual(samples['devagent_status_transitions_total{model="offer",transition="resign"}'], 1)
+        self.assertEqual(samples['devagent_status_transitions_total{model="recruitmentstep",transition="accept"}'], 1)
+
+    def test_processes_summed(self):
+        metrics.registry.increment("devagent_responses_total", (("view", "homepage"), ("status", "200")), 2)
+        metrics.registry.observe("devagent_request_queries", (("view", "homepage"),), 3)
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # file of another worker process
+            with open(os.path.join(directory, "1.json"), "w") as file:
+                json.dump(metrics.registry.snapshot(), file)
+            with open(os.path.join(directory, "2.json.1.tmp"), "w") as file:
+                file.write("{")
+            content = metrics.render()
+            self.assertTrue(os.path.exists(os.path.join(directory, metrics.registry.get_file_name())))
+        samples = parse_metrics(content)
+        self.assertEqual(samples['devagent_responses_total{view="homepage",status="200"}'], 4)
+        self.assertEqual(samples['devagent_request_queries_bucket{view="homepage",le="2"}'], 0)
+        self.assertEqual(samples['devagent_request_queries_bucket{view="homepage",le="5"}'], 2)
+        self.assertEqual(samples['devagent_request_queries_sum{view="homepage"}'], 6)
+
+    def test_file_of_stopped_process_with_same_pid_kept(self):
+        metrics.registry.increment("devagent_responses_total", (("view", "homepage"), ("status", "200")))
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # file of a stopped worker whose pid this process got
+            with open(os.path.join(directory, f"{os.getpid()}.json"), "w") as file:
+                json.dump(metrics.registry.snapshot(), file)
+            metrics.registry.flush(force=True)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertTrue(metrics.registry.get_file_name().startswith(f"{os.getpid()}-"))
+            samples = parse_metrics(metrics.render())
+        self.assertEqual(samples['devagent_responses_total{view="homepage",status="200"}'], 2)
+
+    def test_label_values_escaped(self):
+        self.assertEqual(metrics.format_labels([("view", 'a"b\\c\nd')]), r'{view="a\"b\\c\nd"}')
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import re
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+
+from manager.tests import TestingBase
+
+User = get_user_model()
+
+SLOW_VIEW_SECONDS = 0.2
+
+
+async def slow_view(request):
+    await asyncio.sleep(SLOW_VIEW_SECONDS)
+    return HttpResponse()
+
+
+urlpatterns = [path("slow", slow_view, name="slow")]
+
+
+def parse_server_timing(header):
+    return {
+        metric.group("name"): (float(metric.group("duration")), metric.group("description"))
+        for metric in re.finditer(r'(?P<name>\w+);dur=(?P<duration>[\d.]+)(?:;desc="(?P<description>[^"]*)")?', header)
+    }
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=1)
+class PerformanceMiddlewareTestCase(TestingBase, TestCase):
+    def get(self, url):
+        with self.assertLogs("manager.middleware", "INFO") as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, json.loads(logs.records[0].getMessage()), len(queries)
+
+    def test_server_timing_and_log(self):
+        self.log_user()
+        response, log, queries = self.get(reverse("offer-list"))
+        timing = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(set(timing), {"db", "tpl", "total"})
+        self.assertEqual(timing["db"][1], f"{queries} queries")
+        self.assertGreater(timing["tpl"][0], 0)
+        self.assertGreaterEqual(timing["total"][0], timing["db"][0])
+        self.assertEqual(log["view"], "offer-list")
+        self.assertEqual((log["method"], log["status"], log["queries"]), ("GET", 200, queries))
+
+    def test_views_of_users_app_and_admin(self):
+        User.objects.create_superuser(username="superuser", email="superuser@dev.dev", password=self.password)
+        self.log_user("superuser@dev.dev")
+        for url, view in [(reverse("profile"), "profile"), (reverse("admin:index"), "admin:index")]:
+            with self.subTest(view=view):
+                response, log, queries = self.get(url)
+                self.assertEqual(log["view"], view)
+                self.assertEqual(log["queries"], queries)
+                self.assertIn("Server-Timing", response)
+
+    def test_not_resolved_path(self):
+        response, log, _queries = self.get("/not-existing")
+        self.assertEqual((log["view"], log["status"]), (None, 404))
+
+    def test_sampling(self):
+        with override_settings(PERFORMANCE_SAMPLE_RATE=0):
+            self.assertFalse(self.client.get(reverse("homepage")).has_header("Server-Timing"))
+        with override_settings(PERFORMANCE_SAMPLE_RATE=0.5), mock.patch("manager.middleware.random.random") as random:
+            random.return_value = 0.7
+            self.assertFalse(self.client.get(reverse("homepage")).has_header("Server-Timing"))
+            random.return_value = 0.2
+            with self.assertLogs("manager.middleware", "INFO"):
+                self.assertTrue(self.client.get(reverse("homepage")).has_header("Server-Timing"))
+
+
+@override_settings(ROOT_URLCONF=__name__, PERFORMANCE_SAMPLE_RATE=1)
+class AsyncPerformanceMiddlewareTestCase(SimpleTestCase):
+    async def test_requests_overlap(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with self.assertLogs("manager.middleware", "INFO") as logs:
+            responses = await asyncio.gather(self.async_client.get("/slow"), self.async_client.get("/slow"))
+        # requests served one by one would take twice as long
+        self.assertLess(loop.time() - start, SLOW_VIEW_SECONDS * 1.5)
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertTrue(all(response.has_header("Server-Timing") for response in responses))
+        self.assertEqual([json.loads(record.getMessage())["view"] for record in logs.records], ["slow", "slow"])
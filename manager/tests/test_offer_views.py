@@ -1,9 +1,16 @@
+import re
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 
-from manager.models import Offer
+from manager import rows, workflow
+from manager.models import Offer, RecruitmentStep
 from manager.tests import TestingBase
-from manager.views import OfferCreateView, OfferUpdateView
+from manager.views import OfferCreateView, OfferListView, OfferUpdateView
 
 
 class OfferDetailViewTestCase(TestingBase, TestCase):
@@ -21,6 +28,12 @@ class OfferDetailViewTestCase(TestingBase, TestCase):
         response = self.client.get(reverse_lazy("offer-detail", kwargs={"pk": self.offer.id}))
         self.assertEqual(response.status_code, 200)
 
+    def test_detail_view_of_offer_without_steps(self):
+        self.log_user()
+        response = self.client.get(reverse_lazy("offer-detail", kwargs={"pk": self.offer_clean.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "<tr style=")
+
 
 class OfferListViewTestCase(TestingBase, TestCase):
     def test_list_view_with_not_authenticated_user(self):
@@ -147,3 +160,152 @@ class OfferSendViewTestCase(TestingBase, TestCase):
             self.assertEqual(response.status_code, 403)
             self.offer.refresh_from_db()
             self.assertEqual(self.offer.status, status)
+
+
+class OfferStatusViewsTestCase(TestingBase, TestCase):
+    def test_finished_offer_not_resigned(self):
+        self.log_user()
+        for status in (Offer.Statuses.NEGATIVE, Offer.Statuses.CONTRACT_SIGNED, Offer.Statuses.RESIGNED):
+            with self.subTest(status=status):
+                Offer.objects.filter(pk=self.offer.pk).update(status=status)
+                response = self.client.get(reverse_lazy("offer-resign", kwargs={"pk": self.offer.id}))
+                self.assertEqual(response.status_code, 403)
+                self.offer.refresh_from_db()
+                self.assertEqual(self.offer.status, status)
+
+    def test_open_offer_resigned(self):
+        self.log_user()
+        response = self.client.get(reverse_lazy("offer-resign", kwargs={"pk": self.offer.id}), follow=True)
+        self.assertRedirects(response, reverse_lazy("offer-list"))
+        self.assertContains(response, "has been updated successfully")
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.status, Offer.Statuses.RESIGNED)
+
+    def test_contract_not_signed_without_steps(self):
+        self.log_user()
+        for status in (Offer.Statuses.ACTIVE, Offer.Statuses.SUCCESS):
+            with self.subTest(status=status):
+                Offer.objects.filter(pk=self.offer_clean.pk).update(status=status)
+                response = self.client.get(reverse_lazy("offer-sign-contract", kwargs={"pk": self.offer_clean.id}))
+                self.assertEqual(response.status_code, 403)
+
+    def test_contract_signed_after_successful_step(self):
+        self.log_user()
+        RecruitmentStep.objects.filter(pk=self.step.pk).update(status=RecruitmentStep.Statuses.SUCCESS)
+        response = self.client.get(reverse_lazy("offer-sign-contract", kwargs={"pk": self.offer.id}))
+        self.assertRedirects(response, reverse_lazy("offer-list"))
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.status, Offer.Statuses.CONTRACT_SIGNED)
+
+
+@patch.object(OfferListView, "cursor_paginate_by", 3)
+class OfferListViewPaginationTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            Offer.objects.create(title=f"Active {i}", developer=self.user, company=self.company)
+            Offer.objects.create(
+                title=f"Archived {i}", developer=self.user, company=self.company, status=Offer.Statuses.NEGATIVE
+            )
+        self.log_user()
+
+    def collect_pages(self, cursor_kwarg, context_key):
+        offers, params = [], {}
+        while True:
+            response = self.client.get(reverse_lazy("offer-list"), params)
+            self.assertEqual(response.status_code, 200)
+            page = response.context_data[f"{context_key}_page"]
+            offers.extend(page.object_list)
+            if not page.has_next:
+                return offers
+            params[cursor_kwarg] = page.next_cursor
+
+    def test_pages_contain_all_active_offers_in_order(self):
+        offers = self.collect_pages("cursor", "offers")
+        expected = list(
+            Offer.objects.filter(developer=self.user, status__in=Offer.statuses_active()).order_by(
+                "-updated_on", "-created_on", "id"
+            )
+        )
+        self.assertEqual(offers, expected)
+
+    def test_pages_contain_all_archived_offers_in_order(self):
+        offers = self.collect_pages("archived_cursor", "archived")
+        expected = list(
+            Offer.objects.filter(developer=self.user)
+            .exclude(status__in=Offer.statuses_active())
+            .order_by("-updated_on", "-created_on", "id")
+        )
+        self.assertEqual(offers, expected)
+
+    def test_lists_are_paged_independently(self):
+        first = self.client.get(reverse_lazy("offer-list"))
+        cursor = first.context_data["archived_page"].next_cursor
+        response = self.client.get(reverse_lazy("offer-list"), {"archived_cursor": cursor})
+        self.assertEqual(response.context_data["offers"], first.context_data["offers"])
+        self.assertNotEqual(response.context_data["archived"], first.context_data["archived"])
+        self.assertIn(f"archived_cursor={cursor}", response.context_data["offers_page"].next_url)
+
+    def test_no_offset_or_count_queries(self):
+        cursor = self.client.get(reverse_lazy("offer-list")).context_data["offers_page"].next_cursor
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse_lazy("offer-list"), {"cursor": cursor})
+        for query in context.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"].upper())
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse_lazy("offer-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class OfferRowCacheTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["template_fragments"].clear()
+        self.log_user()
+
+    def get_list(self, **headers):
+        """Returns content of the list without its CSRF token, masked differently on every response,
+        and number of rows rendered, not taken from the cache"""
+        with patch.object(rows, "render_offer_row", wraps=rows.render_offer_row) as render_offer_row:
+            content = self.client.get(reverse_lazy("offer-list"), **headers).content.decode()
+        return re.sub(r'name="csrfmiddlewaretoken" value="\w+"', "", content), render_offer_row.call_count
+
+    def test_rows_rendered_once(self):
+        content, rendered = self.get_list()
+        self.assertEqual(rendered, 2)
+        self.assertEqual(self.get_list(), (content, 0))
+        self.assertEqual(content.count("<tr style='background-color:"), 2)
+
+    def test_rows_rendered_again_after_write(self):
+        self.get_list()
+        self.offer.title = "Renamed Offer"
+        self.offer.save()
+        content, rendered = self.get_list()
+        self.assertEqual(rendered, 1)
+        self.assertIn("Renamed Offer", content)
+
+        workflow.apply(workflow.STEP_ACCEPT, [self.step])
+        content, rendered = self.get_list()
+        self.assertEqual(rendered, 1)
+        self.assertIn(str(RecruitmentStep.Statuses.SUCCESS.label), content)
+
+        self.company.name = "Renamed company"
+        self.company.save()
+        content, rendered = self.get_list()
+        self.assertEqual(rendered, 2)
+        self.assertIn("Renamed company", content)
+
+        self.step_type.name = "Renamed type"
+        self.step_type.save()
+        self.step.type = self.step_type
+        self.step.save()
+        content, rendered = self.get_list()
+        self.assertEqual(rendered, 1)
+        self.assertIn("Renamed type", content)
+
+    def test_rows_cached_per_language(self):
+        self.get_list()
+        self.assertEqual(self.get_list(HTTP_ACCEPT_LANGUAGE="pl")[1], 2)
+        self.assertEqual(self.get_list()[1], 0)
@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager.models import Offer, RecruitmentStep
+from manager.tests import TestingBase
+
+
+class QueryCountTestingBase(TestingBase):
+    def add_offers(self, count, status=Offer.Statuses.ACTIVE, steps=2):
+        for i in range(count):
+            offer = Offer.objects.create(title=f"Offer {i}", developer=self.user, company=self.company, status=status)
+            for _ in range(steps):
+                RecruitmentStep.objects.create(offer=offer, type=self.step_type)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+
+class OfferListQueryCountTestCase(QueryCountTestingBase, TestCase):
+    def test_query_count_does_not_grow_with_active_offers(self):
+        self.log_user()
+        self.add_offers(2)
+        queries_before = self.count_queries(reverse("offer-list"))
+        self.add_offers(10)
+        self.assertEqual(self.count_queries(reverse("offer-list")), queries_before)
+
+    def test_query_count_does_not_grow_with_archived_offers(self):
+        self.log_user()
+        self.add_offers(2, status=Offer.Statuses.NEGATIVE)
+        queries_before = self.count_queries(reverse("offer-list"))
+        self.add_offers(10, status=Offer.Statuses.NEGATIVE)
+        self.assertEqual(self.count_queries(reverse("offer-list")), queries_before)
+
+
+class OfferDetailQueryCountTestCase(QueryCountTestingBase, TestCase):
+    def test_query_count_does_not_grow_with_steps(self):
+        self.log_user()
+        url = reverse("offer-detail", kwargs={"pk": self.offer.id})
+        RecruitmentStep.objects.create(offer=self.offer, type=self.step_type)
+        queries_before = self.count_queries(url)
+        for _ in range(10):
+            RecruitmentStep.objects.create(offer=self.offer, type=self.step_type)
+        self.assertEqual(self.count_queries(url), queries_before)
+
+
+class OfferLatestStepTestCase(QueryCountTestingBase, TestCase):
+    def test_prefetched_latest_step_matches_query(self):
+        self.add_offers(3)
+        for offer in Offer.objects.with_latest_step():
+            self.assertEqual(offer.latest_step, Offer.objects.get(id=offer.id).latest_step)
+
+    def test_steps_prefetched_latest_step_matches_query(self):
+        self.add_offers(3)
+        for offer in Offer.objects.with_steps():
+            self.assertEqual(offer.latest_step, Offer.objects.get(id=offer.id).latest_step)
+
+    def test_prefetched_latest_step_without_steps(self):
+        offer = Offer.objects.with_latest_step().get(id=self.offer_clean.id)
+        with self.assertNumQueries(0):
+            self.assertIsNone(offer.latest_step)
+
+
+class OwnedObjectQueryCountTestCase(QueryCountTestingBase, TestCase):
+    def count_object_selects(self, url, table):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        return len(
+            [query for query in context if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]]
+        )
+
+    def test_object_is_selected_once(self):
+        self.log_user()
+        self.step.status = RecruitmentStep.Statuses.PLANNED
+        self.step.save()
+        urls = [
+            (reverse("offer-detail", kwargs={"pk": self.offer.id}), "manager_offer"),
+            (reverse("offer-update", kwargs={"pk": self.offer.id}), "manager_offer"),
+            (reverse("company-update", kwargs={"pk": self.company.id}), "manager_company"),
+            (reverse("step-create", kwargs={"offer_id": self.offer.id}), "manager_offer"),
+            (reverse("step-detail", kwargs={"pk": self.step.id}), "manager_recruitmentstep"),
+            (reverse("step-update", kwargs={"pk": self.step.id}), "manager_recruitmentstep"),
+        ]
+        for url, table in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_object_selects(url, table), 1)
+
+    def test_status_change_selects_object_once_before_transition(self):
+        self.log_user()
+        self.step.status = RecruitmentStep.Statuses.PLANNED
+        self.step.save()
+        for url in [
+            reverse("step-finish", kwargs={"pk": self.step.id}),
+            reverse("offer-resign", kwargs={"pk": self.offer_clean.id}),
+        ]:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            self.assertEqual(len([query for query in context if '"is_owner"' in query["sql"]]), 1)
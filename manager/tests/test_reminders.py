@@ -0,0 +1,169 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from manager.management.commands import send_reminders
+from manager.models import Offer, RecruitmentStep, Reminder
+from manager.reminders import DispatchResult, ReminderDispatcher, get_due_steps
+from manager.tests import TestingBase
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend counting opened connections, failing on messages with "fail" in the subject"""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("fail" in message.subject for message in messages):
+            raise SMTPException("Recipient refused")
+        return super().send_messages(messages)
+
+
+class ServerDownBackend(CountingBackend):
+    """Counting backend whose connection can be opened only opened_limit times"""
+
+    opened_limit = 1
+
+    def open(self):
+        if CountingBackend.opened == self.opened_limit:
+            raise SMTPException("Connection refused")
+        return super().open()
+
+
+class StopLoop(Exception):
+    pass
+
+
+class ReminderDispatcherTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        CountingBackend.opened = 0
+        self.now = timezone.now()
+        self.step.type = self.step_type
+        self.step.scheduled_on = self.now + timedelta(hours=2)
+        self.step.save()
+        self.dispatcher = ReminderDispatcher(timedelta(hours=24))
+
+    def add_steps(self, count, **kwargs):
+        return [
+            RecruitmentStep.objects.create(offer=self.offer_clean, scheduled_on=self.now + timedelta(hours=1), **kwargs)
+            for _ in range(count)
+        ]
+
+    def test_reminder_sent_once(self):
+        result = self.dispatcher.dispatch(self.now)
+        self.assertEqual((result.sent, result.failed), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, [self.user.email])
+        self.assertEqual(message.subject, f"Reminder: Test type for Test Offer ({self.company.name})")
+        self.assertIn(reverse("step-detail", kwargs={"pk": self.step.id}), message.body)
+        reminder = Reminder.objects.get()
+        self.assertEqual((reminder.status, reminder.scheduled_on), (Reminder.Statuses.SENT, self.step.scheduled_on))
+        self.assertIsNotNone(reminder.sent_on)
+
+        self.assertEqual(self.dispatcher.dispatch(self.now + timedelta(minutes=5)).sent, 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_rescheduled_step_reminded_again(self):
+        self.dispatcher.dispatch(self.now)
+        self.step.scheduled_on += timedelta(hours=1)
+        self.step.save()
+        self.assertEqual(self.dispatcher.dispatch(self.now).sent, 1)
+        self.assertEqual(Reminder.objects.filter(step=self.step).count(), 2)
+
+    def test_steps_not_due(self):
+        self.add_steps(1, status=RecruitmentStep.Statuses.SUCCESS)
+        RecruitmentStep.objects.create(offer=self.offer_clean, scheduled_on=self.now + timedelta(days=2))
+        RecruitmentStep.objects.create(offer=self.offer_clean, scheduled_on=self.now - timedelta(hours=1))
+        other_offer = Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        RecruitmentStep.objects.create(offer=other_offer, scheduled_on=self.now + timedelta(hours=1))
+        self.other_user.is_active = False
+        self.other_user.save()
+        self.assertEqual(list(get_due_steps(self.now, timedelta(hours=24))), [self.step])
+
+    def test_batches_sent_over_one_connection(self):
+        self.add_steps(4)
+        dispatcher = ReminderDispatcher(timedelta(hours=24), batch_size=2, connection=CountingBackend())
+        result = dispatcher.dispatch(self.now)
+        self.assertEqual((result.sent, result.batches), (5, 3))
+        self.assertEqual(CountingBackend.opened, 1)
+
+    def test_queries_do_not_depend_on_batch_size(self):
+        self.add_steps(1)
+        dispatcher = ReminderDispatcher(timedelta(hours=24), batch_size=10)
+        # due steps, claim with its savepoint, claimed ids, sent update and the final empty due steps
+        with self.assertNumQueries(7):
+            self.assertEqual(dispatcher.dispatch(self.now).sent, 2)
+        self.add_steps(5)
+        with self.assertNumQueries(7):
+            self.assertEqual(dispatcher.dispatch(self.now).sent, 5)
+
+    def test_failed_message_recorded(self):
+        failing = Offer.objects.create(title="Will fail", developer=self.user, company=self.company)
+        RecruitmentStep.objects.create(offer=failing, scheduled_on=self.now + timedelta(hours=1))
+        dispatcher = ReminderDispatcher(timedelta(hours=24), connection=CountingBackend())
+        with self.assertLogs("manager.reminders", "ERROR"):
+            result = dispatcher.dispatch(self.now)
+        self.assertEqual((result.sent, result.failed), (1, 1))
+        self.assertEqual(Reminder.objects.get(step__offer=failing).status, Reminder.Statuses.FAILED)
+        # failed reminders are not retried
+        self.assertEqual(dispatcher.dispatch(self.now).failed, 0)
+
+    def test_connection_not_opened_again(self):
+        (sent_step,) = self.add_steps(1)
+        failing = Offer.objects.create(title="Will fail", developer=self.user, company=self.company)
+        failing_step = RecruitmentStep.objects.create(offer=failing, scheduled_on=self.now + timedelta(hours=1))
+        self.add_steps(2)
+        dispatcher = ReminderDispatcher(timedelta(hours=24), connection=ServerDownBackend())
+        with self.assertLogs("manager.reminders", "ERROR"), self.assertRaisesMessage(SMTPException, "refused"):
+            dispatcher.dispatch(self.now)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            dict(Reminder.objects.values_list("step_id", "status")),
+            {sent_step.id: Reminder.Statuses.SENT, failing_step.id: Reminder.Statuses.FAILED},
+        )
+        # claims of steps not attempted were released, they are sent when the server is back
+        self.assertEqual(ReminderDispatcher(timedelta(hours=24)).dispatch(self.now).sent, 3)
+
+    def test_claims_released_when_connection_not_opened(self):
+        dispatcher = ReminderDispatcher(timedelta(hours=24), connection=ServerDownBackend())
+        ServerDownBackend.opened_limit = 0
+        self.addCleanup(setattr, ServerDownBackend, "opened_limit", 1)
+        with self.assertRaises(SMTPException):
+            dispatcher.dispatch(self.now)
+        self.assertFalse(Reminder.objects.exists())
+
+    def test_loop_continues_after_error(self):
+        dispatch = [SMTPException("Connection refused"), DispatchResult(sent=1)]
+        stderr = StringIO()
+        with patch.object(ReminderDispatcher, "dispatch", side_effect=dispatch), patch.object(
+            send_reminders.time, "sleep", side_effect=[None, StopLoop]
+        ), self.assertLogs(send_reminders.logger, "ERROR"), self.assertRaises(StopLoop):
+            call_command("send_reminders", loop=True, stderr=stderr)
+        self.assertIn("1 reminders sent", stderr.getvalue())
+
+    def test_claimed_step_not_claimed_again(self):
+        steps = list(get_due_steps(self.now, timedelta(hours=24)))
+        self.assertEqual(list(ReminderDispatcher.claim(steps)), [self.step.id])
+        with self.assertRaises(IntegrityError):
+            ReminderDispatcher.claim(steps)
+
+    def test_command(self):
+        stderr = StringIO()
+        call_command("send_reminders", lead_hours=24, stderr=stderr)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("1 reminders sent, 0 failed", stderr.getvalue())
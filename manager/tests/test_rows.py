@@ -0,0 +1,101 @@
+import datetime
+
+from django.core.cache import caches
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.translation import gettext
+
+from manager import rows
+from manager.models import Company, Offer, RecruitmentStep, StepType
+
+Statuses, StepStatuses = Offer.Statuses, RecruitmentStep.Statuses
+
+
+def render(source, **context):
+    caches["template_fragments"].clear()
+    return Template("{% load manager_tags %}" + source).render(Context(context))
+
+
+class RowRendererTestCase(TestCase):
+    def setUp(self):
+        self.company = Company(id=7, name="Company & Co", location="Kraków", website="company.dev")
+        self.step_type = StepType(id=3, name="<b>Technical</b>")
+
+    def get_offer(self, status, step_status=None):
+        offer = Offer(id=1, title='Offer "1" <script>', status=status, company=self.company)
+        step = RecruitmentStep(id=2, status=step_status, type=self.step_type) if step_status is not None else None
+        offer.latest_steps = [step] if step else []
+        return offer
+
+    def test_offer_actions(self):
+        for status, step_status, actions in [
+            (Statuses.CREATED, None, ["send", "resign"]),
+            (Statuses.APPLICATION_SENT, None, ["new_step", "resign"]),
+            (Statuses.ACTIVE, None, ["new_step", "resign"]),
+            (Statuses.ACTIVE, StepStatuses.CREATED, ["plan", "resign"]),
+            (Statuses.ACTIVE, StepStatuses.PLANNED, ["finish", "accept", "reject", "resign"]),
+            (Statuses.ACTIVE, StepStatuses.FINISHED, ["accept", "reject", "resign"]),
+            (Statuses.ACTIVE, StepStatuses.SUCCESS, ["new_step", "sign_contract", "resign"]),
+            (Statuses.ACTIVE, StepStatuses.NEGATIVE, ["new_step", "resign"]),
+            (Statuses.CONTRACT_SIGNED, StepStatuses.SUCCESS, []),
+            (Statuses.NEGATIVE, StepStatuses.NEGATIVE, []),
+        ]:
+            with self.subTest(status=status, step_status=step_status):
+                offer = self.get_offer(status, step_status)
+                renderer = rows.TableRenderer(Context())
+                urls = rows.get_offer_actions(offer, offer.latest_step, renderer)
+                self.assertEqual([action for action, url in urls.items() if url], actions)
+
+    def test_offer_row(self):
+        offer = self.get_offer(Statuses.ACTIVE, StepStatuses.PLANNED)
+        for language in ("en", "pl"):
+            with self.subTest(language=language), translation.override(language):
+                content = render("{% offer_rows offers %}", offers=[offer])
+                for url in [
+                    reverse("offer-update", args=[1]),
+                    reverse("offer-detail", args=[1]),
+                    reverse("step-detail", args=[2]),
+                    reverse("step-finish", args=[2]),
+                    reverse("offer-resign", args=[1]),
+                ]:
+                    self.assertIn(f'href="{url}"', content)
+                for label in [Statuses.ACTIVE.label, StepStatuses.PLANNED.label, *map(gettext, ["Finish", "Resign"])]:
+                    self.assertIn(str(label), content)
+                self.assertEqual(content.count("<tr "), 1)
+
+    def test_offer_row_without_step_and_company(self):
+        offer = self.get_offer(Statuses.CREATED)
+        offer.company = None
+        content = render("{% offer_rows offers %}", offers=[offer])
+        self.assertEqual(content.count("<span>-</span>"), 2)
+        self.assertIn(reverse("offer-send", args=[1]), content)
+
+    def test_values_escaped(self):
+        content = render("{% offer_rows offers %}", offers=[self.get_offer(Statuses.ACTIVE, StepStatuses.CREATED)])
+        self.assertIn("Offer &quot;1&quot; &lt;script&gt;", content)
+        self.assertIn("&lt;b&gt;Technical&lt;/b&gt;", content)
+        self.assertNotIn("<script>", content)
+
+    def test_company_rows(self):
+        companies = [self.company, Company(id=8, name="<i>Bare</i>"), Company(id=9, name="Site", website="a.dev?x=1&y")]
+        content = render("{% company_rows companies %}", companies=companies)
+        self.assertEqual(content.count("<tr "), 3)
+        self.assertIn(f'href="{reverse("company-update", args=[8])}"', content)
+        self.assertIn("Company &amp; Co", content)
+        self.assertIn("&lt;i&gt;Bare&lt;/i&gt;", content)
+        self.assertIn('href="https://a.dev?x=1&amp;y"', content)
+
+    def test_step_rows(self):
+        scheduled_on = timezone.make_aware(datetime.datetime(2023, 5, 17, 14, 30))
+        steps = [
+            RecruitmentStep(id=1, type=self.step_type, status=StepStatuses.PLANNED, scheduled_on=scheduled_on),
+            RecruitmentStep(id=2, status=StepStatuses.CREATED, description="<p>"),
+        ]
+        with translation.override("pl"):
+            content = render("{% step_rows steps %}", steps=steps)
+            self.assertIn(str(StepStatuses.PLANNED.label), content)
+            self.assertIn(render("{{ scheduled_on }}", scheduled_on=scheduled_on), content)
+        self.assertIn("&lt;p&gt;", content)
+        self.assertIn(f'href="{reverse("step-update", args=[2])}"', content)
@@ -0,0 +1,116 @@
+import importlib
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from manager.models import Offer, Skill
+from manager.search import search_offers, search_offers_fallback
+from manager.tests import TestingBase
+
+
+class OfferSearchTestCase(TestingBase, TestCase):
+    def search(self, query, developer=None):
+        return [offer.id for offer in search_offers(developer or self.user, query)]
+
+    def test_title_match_ranks_above_description_match(self):
+        in_description = Offer.objects.create(
+            title="Backend", description="Backend work with Django", developer=self.user, company=self.company
+        )
+        in_title = Offer.objects.create(title="Django developer", developer=self.user, company=self.company)
+        self.assertEqual(self.search("django"), [in_title.id, in_description.id])
+
+    def test_all_terms_match(self):
+        offer = Offer.objects.create(
+            title="Senior developer", comments="Remote, nice team", developer=self.user, company=self.company
+        )
+        self.assertEqual(self.search("senior team"), [offer.id])
+        self.assertEqual(self.search("senior office"), [])
+
+    def test_prefix_match_on_request(self):
+        offer = Offer.objects.create(title="Senior developer", developer=self.user, company=self.company)
+        self.assertEqual(self.search("sen"), [])
+        self.assertEqual(self.search("sen* dev*"), [offer.id])
+
+    def test_results_of_developer_only(self):
+        Offer.objects.create(title="Kotlin developer", developer=self.other_user, company=self.company)
+        self.assertEqual(self.search("kotlin"), [])
+        self.assertEqual(len(self.search("kotlin", self.other_user)), 1)
+
+    def test_index_follows_offer_company_and_skill_changes(self):
+        skill = Skill.objects.create(name="Elixir")
+        self.offer.skills_required.add(skill)
+        self.assertEqual(self.search("elixir"), [self.offer.id])
+
+        skill.name = "Erlang"
+        skill.save()
+        self.assertEqual(self.search("elixir"), [])
+        self.assertEqual(self.search("erlang"), [self.offer.id])
+
+        self.offer.skills_required.remove(skill)
+        self.assertEqual(self.search("erlang"), [])
+
+        self.company.name = "Acme"
+        self.company.save()
+        self.assertCountEqual(self.search("acme"), [self.offer.id, self.offer_clean.id])
+
+        self.offer.title = "Renamed"
+        self.offer.save()
+        self.assertEqual(self.search("renamed"), [self.offer.id])
+
+        self.offer.delete()
+        self.assertEqual(self.search("renamed"), [])
+
+    def test_highlighted_text_is_escaped(self):
+        Offer.objects.create(
+            title="<b>Python</b>",
+            description="Use <script>python</script> daily",
+            developer=self.user,
+            company=self.company,
+        )
+        offer = search_offers(self.user, "python")[0]
+        self.assertEqual(offer.search_title, "&lt;b&gt;<mark>Python</mark>&lt;/b&gt;")
+        self.assertIn("&lt;script&gt;<mark>python</mark>&lt;/script&gt;", offer.search_snippet)
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ['"', "test*", "*", "NOT test", "title : test", "title:(", "AND OR"]:
+            with self.subTest(query=query):
+                search_offers(self.user, query)
+        self.assertEqual(self.search("NEAR"), [])
+
+    def test_fallback_finds_same_offers(self):
+        skill = Skill.objects.create(name="Rust")
+        self.offer.skills_optional.add(skill)
+        offers = search_offers_fallback(self.user, [("rust", False), ("test", False)], 10)
+        self.assertEqual([offer.id for offer in offers], [self.offer.id])
+
+
+class SearchTriggersTestCase(TestCase):
+    def test_triggers_exist_after_migrations(self):
+        """Migrations rebuilding a table on SQLite drop its triggers, they have to be created again"""
+        if connection.vendor != "sqlite":
+            self.skipTest("Search index is built on SQLite only.")
+        migration = importlib.import_module("manager.migrations.0004_offer_search")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%fts%'")
+            triggers = {name for (name,) in cursor.fetchall()}
+        self.assertEqual(triggers, set(migration.TRIGGER_NAMES))
+
+
+class OfferSearchViewTestCase(TestingBase, TestCase):
+    def test_not_authenticated_user(self):
+        response = self.client.get(reverse("offer-search"), {"q": "test"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_results_rendered(self):
+        self.log_user()
+        response = self.client.get(reverse("offer-search"), {"q": "clean"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["offers"]), [self.offer_clean])
+        self.assertContains(response, "Test Offer <mark>Clean</mark>", html=True)
+
+    def test_empty_query(self):
+        self.log_user()
+        response = self.client.get(reverse("offer-search"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["offers"], [])
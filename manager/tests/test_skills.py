@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager.models import Offer, OfferSkillBits, Skill
+from manager.skills import from_bytes, rank_offers, to_bitset
+from manager.tests import TestingBase
+
+
+class SkillBitsTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.python, self.django, self.sql = [Skill.objects.create(name=name) for name in ["Py", "Dj", "SQL"]]
+
+    def assertBits(self, offer, required, optional):
+        bits = OfferSkillBits.objects.filter(offer=offer).first()
+        self.assertEqual(from_bytes(bits.required) if bits else 0, to_bitset(skill.id for skill in required))
+        self.assertEqual(from_bytes(bits.optional) if bits else 0, to_bitset(skill.id for skill in optional))
+
+    def test_bits_follow_offer_side_changes(self):
+        self.offer.skills_required.add(self.python, self.django)
+        self.offer.skills_optional.set([self.sql])
+        self.assertBits(self.offer, [self.python, self.django], [self.sql])
+
+        self.offer.skills_required.remove(self.django)
+        self.assertBits(self.offer, [self.python], [self.sql])
+
+        self.offer.skills_optional.clear()
+        self.offer.skills_required.clear()
+        self.assertFalse(OfferSkillBits.objects.filter(offer=self.offer).exists())
+
+    def test_bits_follow_skill_side_changes(self):
+        self.python.offers_required_in.add(self.offer, self.offer_clean)
+        self.sql.offers_optional_in.add(self.offer)
+        self.assertBits(self.offer, [self.python], [self.sql])
+        self.assertBits(self.offer_clean, [self.python], [])
+
+        self.python.offers_required_in.remove(self.offer_clean)
+        self.assertBits(self.offer_clean, [], [])
+
+        self.sql.offers_optional_in.clear()
+        self.assertBits(self.offer, [self.python], [])
+
+        self.python.delete()
+        self.assertBits(self.offer, [], [])
+
+
+class RankOffersTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.skills = [Skill.objects.create(name=f"Skill {i}") for i in range(4)]
+        self.user.skills.set(self.skills[:2])
+
+    def add_offer(self, required=(), optional=()):
+        offer = Offer.objects.create(title="Offer", developer=self.user, company=self.company)
+        offer.skills_required.set(required)
+        offer.skills_optional.set(optional)
+        return offer
+
+    def test_required_skills_weigh_more(self):
+        known, unknown = self.skills[:2], self.skills[2:]
+        all_known = self.add_offer(required=known)
+        required_known = self.add_offer(required=known[:1], optional=unknown[:1])
+        optional_known = self.add_offer(required=unknown[:1], optional=known[:1])
+        nothing_known = self.add_offer(required=unknown)
+
+        ranked = rank_offers(self.user, limit=4)
+        self.assertEqual(ranked, [all_known, required_known, optional_known, nothing_known])
+        self.assertEqual(ranked[0].skill_match.percent, 100)
+        self.assertEqual(ranked[1].skill_match.percent, 67)
+        self.assertEqual(ranked[2].skill_match.percent, 33)
+        self.assertEqual(ranked[3].skill_match.percent, 0)
+
+    def test_offers_of_developer_only(self):
+        Offer.objects.create(title="Other", developer=self.other_user, company=self.company)
+        self.assertCountEqual(rank_offers(self.user), [self.offer, self.offer_clean])
+
+    def test_query_count_does_not_grow_with_offers(self):
+        self.add_offer(required=self.skills[:1])
+        with CaptureQueriesContext(connection) as context:
+            rank_offers(self.user)
+        for _ in range(10):
+            self.add_offer(required=self.skills[1:3], optional=self.skills[:1])
+        with self.assertNumQueries(len(context)):
+            rank_offers(self.user)
+
+
+class SkillViewsTestCase(TestingBase, TestCase):
+    def test_not_authenticated_user(self):
+        for url in [reverse("developer-skills"), reverse("offer-ranking")]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_skills_saved(self):
+        self.log_user()
+        skill = Skill.objects.create(name="Elm")
+        response = self.client.post(reverse("developer-skills"), {"skills": [skill.id]})
+        self.assertRedirects(response, reverse("offer-ranking"))
+        self.assertEqual(list(self.user.skills.all()), [skill])
+
+    def test_ranking_of_active_offers(self):
+        self.log_user()
+        self.offer_clean.status = Offer.Statuses.RESIGNED
+        self.offer_clean.save()
+        response = self.client.get(reverse("offer-ranking"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["offers"], [self.offer])
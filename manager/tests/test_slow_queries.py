@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from manager import slow_queries
+from manager.models import Offer
+from manager.tests import TestingBase
+
+
+class SlowQueryRecorderTestCase(TestingBase, TestCase):
+    def setUp(self):
+        super().setUp()
+        slow_queries.recent.clear()
+
+    @contextmanager
+    def recording(self):
+        """Records every query, records are not written to the log file"""
+        with override_settings(SLOW_QUERY_MS=0.000001), self.assertLogs("manager.slow_queries", "WARNING") as logs:
+            yield logs
+
+    def test_queries_of_view_recorded(self):
+        self.log_user()
+        with self.recording() as logs, CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("offer-detail", kwargs={"pk": self.offer.pk}))
+        # plans are read without adding queries
+        self.assertEqual(len(slow_queries.recent), len(queries))
+        self.assertEqual([json.loads(record.getMessage()) for record in logs.records], list(slow_queries.recent))
+
+        entry = next(entry for entry in slow_queries.recent if '"manager_offer"' in entry["sql"])
+        self.assertEqual(entry["view"], "offer-detail")
+        self.assertRegex(entry["location"], r"^manager/views\.py:\d+ in get_object$")
+        self.assertIn(self.offer.pk, entry["params"])
+        self.assertTrue(entry["plan"])
+        self.assertFalse(any("EXPLAIN failed" in row for row in entry["plan"]))
+
+    def test_template_location(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.recording():
+            get_template("manager/offer_ranking.html").render({"offers": Offer.objects.all()}, request)
+        locations = {entry["location"] for entry in slow_queries.recent if '"manager_company"' in entry["sql"]}
+        # the tag of the template, not the template it extends
+        self.assertEqual(locations, {"manager/templates/manager/offer_ranking.html:23"})
+        self.assertFalse([location for location in locations if "base.html" in location])
+
+    def test_not_recorded(self):
+        with override_settings(SLOW_QUERY_MS=0):
+            list(Offer.objects.all())
+        with override_settings(SLOW_QUERY_MS=60 * 1000):
+            list(Offer.objects.all())
+        self.assertFalse(slow_queries.recent)
+
+    def test_statements_other_than_select_not_explained(self):
+        with self.recording():
+            Offer.objects.filter(pk=self.offer.pk).update(title="Updated")
+        self.assertIsNone(slow_queries.recent[-1]["plan"])
+        self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, "Updated")
+
+    def test_params_cut(self):
+        ids = list(range(1, 100))
+        with self.recording():
+            list(Offer.objects.filter(pk__in=ids, title="x" * 500))
+        params = slow_queries.recent[-1]["params"]
+        self.assertEqual(len(params), slow_queries.PARAMS_LIMIT + 1)
+        self.assertEqual(params[-1], f"... {len(ids) + 1 - slow_queries.PARAMS_LIMIT} more")
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            slow_queries.normalize("SELECT * FROM t1 WHERE id IN (%s, %s,%s) AND name = 'it''s' LIMIT 21"),
+            "SELECT * FROM t1 WHERE id IN (?) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(slow_queries.normalize('SAVEPOINT "s1397047_x5"'), 'SAVEPOINT "s?"')
+        self.assertEqual(
+            slow_queries.get_fingerprint('SELECT "a" FROM "t" WHERE "id" IN (%s)'),
+            slow_queries.get_fingerprint('SELECT "a" FROM "t" WHERE "id" IN (%s, %s, %s)'),
+        )
+        self.assertNotEqual(
+            slow_queries.get_fingerprint('SELECT "a" FROM "t" WHERE "id" = %s'),
+            slow_queries.get_fingerprint('SELECT "b" FROM "t" WHERE "id" = %s'),
+        )
+
+
+class SlowQueriesCommandTestCase(TestCase):
+    def entry(self, sql, duration_ms, location, view="offer-list"):
+        return {
+            "duration_ms": duration_ms,
+            "fingerprint": slow_queries.get_fingerprint(sql),
+            "sql": sql,
+            "params": [duration_ms],
+            "view": view,
+            "location": location,
+            "plan": ["SCAN t"],
+        }
+
+    def test_aggregate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, "slow.log")
+            entries = [
+                (f"{log}.1", self.entry("SELECT a FROM t WHERE id = %s", 30, "manager/views.py:1 in get")),
+                (log, self.entry("SELECT a FROM t WHERE id = %s", 50, "users/views.py:2 in get", view="profile")),
+                (log, self.entry("SELECT b FROM t WHERE id IN (%s, %s)", 70, "manager/views.py:3 in get")),
+                (log, self.entry("SELECT c FROM t", 500, "devagent/urls.py:4 in get")),
+            ]
+            for path, entry in entries:
+                with open(path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+            with open(log, "a", encoding="utf-8") as file:
+                file.write("not a record\n")
+
+            stdout = StringIO()
+            call_command("slow_queries", log=log, json=True, stdout=stdout)
+            results = json.loads(stdout.getvalue())
+            self.assertEqual([result["count"] for result in results], [2, 1])
+            self.assertEqual((results[0]["total_ms"], results[0]["max_ms"]), (80, 50))
+            self.assertEqual(results[0]["views"], ["offer-list", "profile"])
+            self.assertEqual(results[0]["normalized"], "SELECT a FROM t WHERE id = ?")
+
+            stdout = StringIO()
+            call_command("slow_queries", log=log, apps=[], sort="max", limit=1, stdout=stdout)
+            self.assertIn("SELECT c FROM t", stdout.getvalue())
+            self.assertIn("SCAN t", stdout.getvalue())
+
+    def test_no_log(self):
+        with self.assertRaises(CommandError):
+            call_command("slow_queries", log="/not/existing.log")
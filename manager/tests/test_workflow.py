@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from manager import workflow
+from manager.models import Offer, RecruitmentStep
+from manager.tests import TestingBase
+
+
+class TransitionTestCase(TestingBase, TestCase):
+    def test_apply_to_single_object(self):
+        self.assertEqual(workflow.apply(workflow.OFFER_SEND, [self.offer_clean]), [self.offer_clean.id])
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.APPLICATION_SENT)
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.APPLICATION_SENT)
+        self.assertIsNotNone(self.offer_clean.application_sent_on)
+
+    def test_apply_only_from_allowed_statuses(self):
+        Offer.objects.filter(id=self.offer.id).update(status=Offer.Statuses.NEGATIVE)
+        changed = workflow.apply(workflow.OFFER_SEND, Offer.objects.filter(developer=self.user))
+        self.assertEqual(changed, [self.offer_clean.id])
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.status, Offer.Statuses.NEGATIVE)
+
+    def test_apply_to_batch_runs_constant_number_of_queries(self):
+        steps = [RecruitmentStep.objects.create(offer=self.offer_clean) for _ in range(2)]
+        with self.assertNumQueries(7):
+            workflow.apply(workflow.STEP_ACCEPT, steps[:1])
+        more_steps = [RecruitmentStep.objects.create(offer=self.offer_clean) for _ in range(10)]
+        with self.assertNumQueries(7):
+            workflow.apply(workflow.STEP_ACCEPT, more_steps)
+
+    def test_apply_with_condition(self):
+        Offer.objects.filter(id=self.offer.id).update(status=Offer.Statuses.ACTIVE)
+        self.assertEqual(workflow.apply(workflow.OFFER_SIGN_CONTRACT, [self.offer]), [])
+        workflow.apply(workflow.STEP_ACCEPT, [self.step])
+        self.assertEqual(workflow.apply(workflow.OFFER_SIGN_CONTRACT, [self.offer]), [self.offer.id])
+
+    def test_plan_scheduled_steps(self):
+        RecruitmentStep.objects.filter(id=self.step.id).update(scheduled_on=timezone.now())
+        unscheduled = RecruitmentStep.objects.create(offer=self.offer)
+        self.assertEqual(workflow.apply(workflow.STEP_PLAN, [self.step, unscheduled]), [self.step.id])
+
+
+class OfferStatusSyncTestCase(TestingBase, TestCase):
+    def test_step_rejection_rejects_offers(self):
+        other_step = RecruitmentStep.objects.create(offer=self.offer_clean)
+        workflow.apply(workflow.STEP_REJECT, [self.step, other_step])
+        self.assertEqual(
+            set(Offer.objects.filter(id__in=[self.offer.id, self.offer_clean.id]).values_list("status", flat=True)),
+            {Offer.Statuses.NEGATIVE},
+        )
+
+    def test_step_resignation_resigns_offer(self):
+        workflow.apply(workflow.STEP_RESIGN, [self.step])
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.status, Offer.Statuses.RESIGNED)
+
+    def test_sync_after_bulk_update(self):
+        step = RecruitmentStep.objects.create(offer=self.offer_clean)
+        RecruitmentStep.objects.filter(id__in=[self.step.id, step.id]).update(status=RecruitmentStep.Statuses.NEGATIVE)
+        self.assertEqual(workflow.sync_offer_statuses(RecruitmentStep.objects.all()), 2)
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.NEGATIVE)
+
+    def test_saving_step_activates_offer(self):
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.CREATED)
+        RecruitmentStep.objects.create(offer=self.offer_clean)
+        self.offer_clean.refresh_from_db()
+        self.assertEqual(self.offer_clean.status, Offer.Statuses.ACTIVE)
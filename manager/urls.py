@@ -1,20 +1,29 @@
 from django.urls import path
 
 from . import views
+from .async_views import read_view
 
 urlpatterns = [
     path("", views.HomePage.as_view(), name="homepage"),
     path("about/", views.AboutPage.as_view(), name="about-page"),
-    path("companies", views.CompanyListView.as_view(), name="company-list"),
+    path("companies", read_view(views.CompanyListView.as_view()), name="company-list"),
     path("companies/new", views.CompanyCreateView.as_view(), name="company-create"),
     path(
         "companies/<int:pk>/update",
         views.CompanyUpdateView.as_view(),
         name="company-update",
     ),
-    path("offers", views.OfferListView.as_view(), name="offer-list"),
+    path("offers", read_view(views.OfferListView.as_view()), name="offer-list"),
+    path("offers/search", views.OfferSearchView.as_view(), name="offer-search"),
+    path("offers/ranking", views.OfferRankingView.as_view(), name="offer-ranking"),
+    path("skills", views.DeveloperSkillsView.as_view(), name="developer-skills"),
+    path("offers/import", views.OfferImportView.as_view(), name="offer-import"),
+    path("offers/export", views.OfferExportView.as_view(), name="offer-export"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
+    path("calendar/<str:token>.ics", views.StepCalendarView.as_view(), name="step-calendar"),
+    path("calendar/reset", views.StepCalendarResetView.as_view(), name="step-calendar-reset"),
     path("offers/new", views.OfferCreateView.as_view(), name="offer-create"),
-    path("offers/<int:pk>", views.OfferDetailView.as_view(), name="offer-detail"),
+    path("offers/<int:pk>", read_view(views.OfferDetailView.as_view()), name="offer-detail"),
     path(
         "offers/<int:pk>/update",
         views.OfferUpdateView.as_view(),
@@ -35,6 +44,11 @@ urlpatterns = [
         views.OfferResignView.as_view(),
         name="offer-resign",
     ),
+    path(
+        "offers/bulk-status-change",
+        views.BulkStatusChangeView.as_view(),
+        name="bulk-status-change",
+    ),
     path(
         "offers/<int:offer_id>/new-step",
         views.RecruitmentStepCreateView.as_view(),
@@ -42,7 +56,7 @@ urlpatterns = [
     ),
     path(
         "offers/steps/<int:pk>",
-        views.RecruitmentStepDetailView.as_view(),
+        read_view(views.RecruitmentStepDetailView.as_view()),
         name="step-detail",
     ),
     path(
@@ -1,25 +1,54 @@
+import functools
+import hashlib
+import io
+import json
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.core.exceptions import PermissionDenied
+from django.db.models import (
+    BooleanField,
+    ExpressionWrapper,
+    Q,
+    Subquery,
+    prefetch_related_objects,
+)
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
-from django.utils import timezone
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import (
     CreateView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
+    View,
 )
+from django.views.generic.edit import ModelFormMixin
 
+from manager import database, ical, metrics, workflow
+from manager.exporter import CONTENT_TYPES, export_offers
 from manager.forms import (
     CompanyForm,
+    DeveloperSkillsForm,
     OfferCreateForm,
+    OfferImportForm,
     OfferUpdateForm,
     RecruitmentStepForm,
 )
-from manager.models import Company, Offer, RecruitmentStep
+from manager.importer import FORMATS, OfferImporter, guess_format, read_rows
+from manager.models import Company, DataVersion, Offer, OfferQuerySet, RecruitmentStep
+from manager.pagination import KeysetPaginator
+from manager.search import search_offers
+from manager.skills import rank_offers
 
 
 class HomePage(TemplateView):
@@ -30,6 +59,97 @@ class AboutPage(TemplateView):
     template_name = "manager/about_page.html"
 
 
+def annotate_owner(queryset, owner_field, user):
+    """Annotates is_owner so that ownership is checked within the same SELECT as the object is loaded"""
+    return queryset.annotate(
+        is_owner=ExpressionWrapper(Q(**{owner_field: user.pk}), output_field=BooleanField()),
+    )
+
+
+class OwnedObjectMixin(UserPassesTestMixin):
+    """Loads the view's object once per request together with its ownership check.
+    owner_field is a lookup from the model to the owning User, related_fields are select_related.
+    Views with ConditionalGetMixin read the user's DataVersion for their ETag in the same query."""
+
+    owner_field = None
+    related_fields = ()
+
+    def get_queryset(self):
+        queryset = annotate_owner(super().get_queryset(), self.owner_field, self.request.user)
+        if self.related_fields:
+            queryset = queryset.select_related(*self.related_fields)
+        if isinstance(self, ConditionalGetMixin):
+            version = DataVersion.objects.filter(developer=self.request.user).values("version")[:1]
+            queryset = queryset.annotate(data_version=Subquery(version))
+        return queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def test_func(self):
+        return self.get_object().is_owner
+
+    def get_version(self):
+        return self.get_object().data_version
+
+
+class ConditionalGetMixin:
+    """Answers GET requests with 304 Not Modified when the page would render the same as the client's copy.
+    ETag comes from the developer's DataVersion, read with a single primary key lookup,
+    which every change of offers, steps, companies and step types increases."""
+
+    def get_version(self):
+        return DataVersion.objects.filter(developer=self.request.user).values_list("version", flat=True).first()
+
+    def get_etag(self):
+        version = self.get_version()
+        if version is None:
+            return None
+        user = self.request.user
+        # everything else the page shows: its URL, language, the user in the navigation bar and CSRF token
+        # of its forms, which login rotates, so a page cached before it does not post a rejected token.
+        # get_token creates the token of a client without one, which its first page sets as a cookie.
+        get_token(self.request)
+        key = [
+            self.request.get_full_path(),
+            get_language(),
+            user.pk,
+            user.get_username(),
+            user.image.name,
+            self.request.META.get("CSRF_COOKIE"),
+            version,
+        ]
+        return f'"{hashlib.md5(repr(key).encode()).hexdigest()}"'
+
+    def dispatch(self, request, *args, **kwargs):
+        # pending messages are shown once on the rendered page, 304 would lose them
+        if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag) if etag else None
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if etag and response.status_code in (200, 304):
+            response["ETag"] = etag
+            # browser revalidates on every load instead of showing a stale page
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AtomicWriteMixin:
+    """Saves the form's object as one write transaction, which is run again when the database is locked,
+    see manager.database. Writes of signal receivers of the save are part of it, messages and the response are not.
+    Must precede ModelFormMixin, whose form_valid saves the form outside of it."""
+
+    def form_valid(self, form):
+        self.object = database.run_write(form.save)
+        return super(ModelFormMixin, self).form_valid(form)
+
+
 def error_403(request, exception):
     return render(
         request,
@@ -52,17 +172,17 @@ def error_500(request):
     return render(request, "main/error_500.html", status=500)
 
 
-class CompanyListView(LoginRequiredMixin, ListView):
+class CompanyListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Company
     context_object_name = "companies"
     ordering = ["-updated_on", "-created_on"]
     extra_context = {"title": _("Company list")}
 
     def get_queryset(self):
-        return self.model.objects.filter(added_by=self.request.user)
+        return super().get_queryset().filter(added_by=self.request.user)
 
 
-class CompanyCreateView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
+class CompanyCreateView(SuccessMessageMixin, LoginRequiredMixin, AtomicWriteMixin, CreateView):
     model = Company
     form_class = CompanyForm
     extra_context = {"title": _("Add new company"), "action": "create"}
@@ -78,16 +198,11 @@ class CompanyCreateView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
         return f"Company {self.object.name} has been created successfully."
 
 
-class CompanyUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class CompanyUpdateView(LoginRequiredMixin, AtomicWriteMixin, OwnedObjectMixin, UpdateView):
     model = Company
     form_class = CompanyForm
     extra_context = {"title": _("Update Company"), "action": "update"}
-
-    def test_func(self):
-        company = self.get_object()
-        if company.added_by == self.request.user:
-            return True
-        return False
+    owner_field = "added_by"
 
     def get_success_url(self):
         return reverse_lazy("company-list")
@@ -96,40 +211,117 @@ class CompanyUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return f"Company {self.object.name} has been updated successfully."
 
 
-class OfferDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class OfferDetailView(LoginRequiredMixin, OwnedObjectMixin, ConditionalGetMixin, DetailView):
     model = Offer
     context_object_name = "offer"
     extra_context = {"title": _("Offer details")}
+    owner_field = "developer"
+    related_fields = ("company",)
 
-    def test_func(self):
-        offer = self.get_object()
-        if self.request.user == offer.developer:
-            return True
-        return False
+    def get_context_data(self, **kwargs):
+        # steps are loaded for the rendered page only, not to answer 304 Not Modified
+        prefetch_related_objects([self.object], OfferQuerySet.steps_prefetch())
+        return super().get_context_data(**kwargs)
 
 
-class OfferListView(LoginRequiredMixin, ListView):
+class OfferListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Offer
     context_object_name = "offers"
-    ordering = ["-updated_on", "-created_on"]
+    ordering = ["-updated_on", "-created_on", "id"]
     extra_context = {"title": _("Offers list")}
+    cursor_paginate_by = 25
+    cursor_kwarg = "cursor"
+    archived_cursor_kwarg = "archived_cursor"
+
+    def get_user_offers(self):
+        return super().get_queryset().filter(developer=self.request.user).select_related("company").with_latest_step()
 
     def get_queryset(self):
-        return self.model.objects.filter(developer=self.request.user, status__in=self.model.statuses_active())
+        return self.get_user_offers().filter(status__in=self.model.statuses_active())
+
+    def get_archived_queryset(self):
+        return self.get_user_offers().exclude(status__in=self.model.statuses_active())
+
+    def get_cursor_url(self, cursor_kwarg, cursor=None):
+        """Returns current URL with only one of the lists' cursor changed"""
+        query = self.request.GET.copy()
+        query.pop(cursor_kwarg, None)
+        if cursor:
+            query[cursor_kwarg] = cursor
+        return f"{self.request.path}?{query.urlencode()}" if query else self.request.path
+
+    def paginate_by_cursor(self, queryset, cursor_kwarg):
+        page = KeysetPaginator(queryset, self.cursor_paginate_by, self.ordering).page(
+            self.request.GET.get(cursor_kwarg)
+        )
+        page.first_url = self.get_cursor_url(cursor_kwarg)
+        page.next_url = self.get_cursor_url(cursor_kwarg, page.next_cursor)
+        return page
+
+    def get_context_data(self, **kwargs):
+        offers_page = self.paginate_by_cursor(self.object_list, self.cursor_kwarg)
+        archived_page = self.paginate_by_cursor(self.get_archived_queryset(), self.archived_cursor_kwarg)
+        context = super().get_context_data(object_list=offers_page.object_list, **kwargs)
+        context.update(
+            {
+                "offers_page": offers_page,
+                "archived": archived_page.object_list,
+                "archived_page": archived_page,
+                "calendar_token": ical.get_feed_token(self.request.user),
+            }
+        )
+        return context
+
+
+class OfferSearchView(LoginRequiredMixin, TemplateView):
+    template_name = "manager/offer_search.html"
+    extra_context = {"title": _("Search offers")}
+    query_kwarg = "q"
+    results_limit = 50
 
     def get_context_data(self, **kwargs):
+        query = self.request.GET.get(self.query_kwarg, "").strip()
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "archived": self.model.objects.filter(developer=self.request.user).exclude(
-                    status__in=self.model.statuses_active()
-                )
+                "query": query,
+                "offers": search_offers(self.request.user, query, self.results_limit) if query else [],
             }
         )
         return context
 
 
-class OfferCreateView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
+class OfferRankingView(LoginRequiredMixin, TemplateView):
+    template_name = "manager/offer_ranking.html"
+    extra_context = {"title": _("Best matching offers")}
+    results_limit = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["offers"] = rank_offers(
+            self.request.user,
+            self.results_limit,
+            Offer.objects.filter(developer=self.request.user, status__in=Offer.statuses_active()),
+        )
+        return context
+
+
+class DeveloperSkillsView(SuccessMessageMixin, LoginRequiredMixin, FormView):
+    form_class = DeveloperSkillsForm
+    template_name = "manager/skills_form.html"
+    extra_context = {"title": _("Your skills")}
+    success_url = reverse_lazy("offer-ranking")
+    success_message = _("Your skills have been saved!")
+
+    def get_initial(self):
+        return {"skills": self.request.user.skills.all()}
+
+    def form_valid(self, form):
+        database.run_write(functools.partial(self.request.user.skills.set, form.cleaned_data["skills"]))
+        return super().form_valid(form)
+
+
+class OfferCreateView(SuccessMessageMixin, LoginRequiredMixin, AtomicWriteMixin, CreateView):
     model = Offer
     form_class = OfferCreateForm
     extra_context = {"title": _("Add new offer"), "action": "create"}
@@ -150,26 +342,121 @@ class OfferCreateView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
         return f"Offer for {self.object.title} ({self.object.company}) has been created successfully."
 
 
-class OfferUpdateBaseView(SuccessMessageMixin, LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class OfferImportView(LoginRequiredMixin, FormView):
+    form_class = OfferImportForm
+    template_name = "manager/offer_import.html"
+    extra_context = {"title": _("Import offers")}
+    success_url = reverse_lazy("offer-list")
+    reported_errors = 10
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        file_format = form.cleaned_data["format"] or guess_format(upload.name)
+        # uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are on disk already, rows are read one at a time
+        with io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="") as file:
+            result = OfferImporter(self.request.user).import_rows(read_rows(file, file_format))
+
+        messages.success(
+            self.request,
+            _("%(created)s offers imported, %(failed)s rows failed.")
+            % {"created": result.created, "failed": result.failed},
+        )
+        for line, error in result.errors[: self.reported_errors]:
+            messages.warning(self.request, _("Line %(line)s: %(error)s") % {"line": line, "error": error})
+        return super().form_valid(form)
+
+
+class OfferExportView(LoginRequiredMixin, View):
+    """Streams all offers of the user, rows are sent while the following ones are still being read"""
+
+    format_kwarg = "format"
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get(self.format_kwarg, "csv")
+        if file_format not in FORMATS:
+            raise Http404(_("Unknown export format."))
+        response = StreamingHttpResponse(
+            export_offers(request.user, file_format), content_type=f"{CONTENT_TYPES[file_format]}; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="offers.{file_format}"'
+        return response
+
+
+class StepCalendarView(View):
+    """iCalendar feed of developer's planned steps for calendar clients, authenticated by the token in its URL.
+    Polls of an unchanged feed are answered with 304 after a single query of the developer's DataVersion."""
+
+    def get(self, request, token):
+        feed = ical.check_feed_token(token)
+        if feed is None:
+            raise Http404(_("Calendar not found."))
+        developer_id, version = feed
+        since = ical.get_feed_since()
+        etag = ical.get_feed_etag(developer_id, version, since)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # step id ends the step-detail URL, so it is reversed once for all events
+            step_url = request.build_absolute_uri(reverse("step-detail", kwargs={"pk": 0}))
+            content = ical.render_calendar(
+                ical.get_feed_steps(developer_id, since), request.get_host(), step_url[:-1], _("Recruitment steps")
+            )
+            response = HttpResponse(content, content_type="text/calendar; charset=utf-8")
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class StepCalendarResetView(LoginRequiredMixin, View):
+    """Replaces the token of user's calendar feed URL, e.g. when it was shared by mistake"""
+
+    def post(self, request, *args, **kwargs):
+        ical.reset_feed_token(request.user)
+        messages.success(request, _("Calendar feed link has been reset, the previous one no longer works."))
+        return redirect("offer-list")
+
+
+class MetricsView(View):
+    """Metrics of all worker processes in Prometheus text format, for staff users
+    and scrapers sending METRICS_TOKEN as a bearer token"""
+
+    def has_access(self, request):
+        if request.user.is_staff:
+            return True
+        scheme, _separator, token = request.headers.get("Authorization", "").partition(" ")
+        return (
+            bool(settings.METRICS_TOKEN) and scheme == "Bearer" and constant_time_compare(token, settings.METRICS_TOKEN)
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access(request):
+            raise PermissionDenied
+        response = HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class OfferUpdateBaseView(SuccessMessageMixin, LoginRequiredMixin, AtomicWriteMixin, OwnedObjectMixin, UpdateView):
     model = Offer
     message_action = _("updated")
     success_message = "Offer for %s (%s) has been %s successfully."
-    target_status = None
-
-    def test_func(self):
-        offer = self.get_object()
-        if self.request.user == offer.developer:
-            return True
-        return False
+    transition = None
+    owner_field = "developer"
+    related_fields = ("company",)
 
     def get_success_url(self):
         return reverse_lazy("offer-list")
 
+    def test_func(self):
+        # views changing status are allowed only from statuses of their transition
+        if super().test_func():
+            if self.transition is None or self.get_object().status in self.transition.statuses_from:
+                return True
+        return False
+
     def update_status(self, request):
-        offer = self.get_object()
-        offer.status = self.target_status
-        offer.save(update_fields=["status", "updated_on"])
-        self.send_success_message(request)
+        if workflow.apply(self.transition, [self.get_object()]):
+            self.send_success_message(request)
         return redirect("offer-list")
 
     def get_success_message(self, cleaned_data):
@@ -188,72 +475,54 @@ class OfferUpdateView(OfferUpdateBaseView):
 class OfferSendView(OfferUpdateBaseView):
     fields = ["status"]
     message_action = _("sent")
-    target_status = Offer.Statuses.APPLICATION_SENT
-
-    def test_func(self):
-        if super().test_func():
-            offer = self.get_object()
-            if offer.status == Offer.Statuses.CREATED:
-                return True
-        return False
+    transition = workflow.OFFER_SEND
 
     def get(self, request, *args, **kwargs):
-        offer = self.get_object()
-        offer.status = self.target_status
-        offer.application_sent_on = timezone.now()
-        offer.save(update_fields=["status", "updated_on", "application_sent_on"])
-        self.send_success_message(request)
-        return redirect("offer-list")
+        return self.update_status(request)
 
 
 class OfferSignContractView(OfferUpdateBaseView):
     model = Offer
     fields = ["status"]
     message_action = _("signed")
-    target_status = Offer.Statuses.CONTRACT_SIGNED
+    transition = workflow.OFFER_SIGN_CONTRACT
+
+    def get_queryset(self):
+        return super().get_queryset().with_latest_step()
 
     def test_func(self):
         if super().test_func():
-            offer = self.get_object()
-            if offer.status == Offer.Statuses.ACTIVE and offer.latest_step.status == RecruitmentStep.Statuses.SUCCESS:
+            step = self.get_object().latest_step
+            if step is not None and step.status == RecruitmentStep.Statuses.SUCCESS:
                 return True
         return False
 
     def get(self, request, *args, **kwargs):
-        super().get(request, *args, **kwargs)
         return self.update_status(request)
 
 
 class OfferResignView(OfferUpdateBaseView):
     model = Offer
     fields = ["status"]
-    target_status = Offer.Statuses.RESIGNED
-
-    def test_func(self):
-        offer = self.get_object()
-        if self.request.user == offer.developer:
-            return True
-        return False
+    transition = workflow.OFFER_RESIGN
 
     def get(self, request, *args, **kwargs):
-        super().get(request, *args, **kwargs)
         return self.update_status(request)
 
 
-class RecruitmentStepDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class RecruitmentStepOwnedMixin(OwnedObjectMixin):
+    owner_field = "offer__developer"
+    related_fields = ("offer",)
+
+
+class RecruitmentStepDetailView(LoginRequiredMixin, RecruitmentStepOwnedMixin, ConditionalGetMixin, DetailView):
     model = RecruitmentStep
     context_object_name = "step"
     template_name = "manager/step_detail.html"
     extra_context = {"title": _("Recruitment Step details")}
 
-    def test_func(self):
-        step = self.get_object()
-        if self.request.user == step.offer.developer:
-            return True
-        return False
 
-
-class RecruitmentStepFormViewBase(LoginRequiredMixin, UserPassesTestMixin):
+class RecruitmentStepFormViewBase(LoginRequiredMixin, AtomicWriteMixin, RecruitmentStepOwnedMixin):
     model = RecruitmentStep
     form_class = RecruitmentStepForm
     template_name = "manager/step_form.html"
@@ -266,87 +535,120 @@ class RecruitmentStepFormViewBase(LoginRequiredMixin, UserPassesTestMixin):
 class RecruitmentStepCreateView(RecruitmentStepFormViewBase, CreateView):
     extra_context = {"title": _("Add new Recruitment Step")}
 
+    def get_offer(self):
+        if not hasattr(self, "_offer"):
+            self._offer = get_object_or_404(
+                annotate_owner(Offer.objects.all(), "developer", self.request.user), id=self.kwargs.get("offer_id")
+            )
+        return self._offer
+
     def test_func(self):
-        offer = get_object_or_404(Offer, id=self.kwargs.get("offer_id"))
-        if self.request.user == offer.developer:
-            return True
-        return False
+        return self.get_offer().is_owner
 
     def form_valid(self, form):
-        form.instance.offer = get_object_or_404(Offer, id=self.kwargs.get("offer_id"))
+        form.instance.offer = self.get_offer()
         return super().form_valid(form)
 
 
 class RecruitmentStepUpdateView(RecruitmentStepFormViewBase, UpdateView):
     extra_context = {"title": _("Recruitment Step update")}
 
-    def test_func(self):
-        step = get_object_or_404(RecruitmentStep, id=self.kwargs.get("pk"))
-        if self.request.user == step.offer.developer:
-            return True
-        return False
 
-
-class RecruitmentStepChangeStatusBaseView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
-    """Base View for all RecruitmentStep status change Views. Inheriting View must have its own attributes:
-    statuses_from (tuple of RecruitmentStep.Status statuses)
-    and status_to (single object RecruitmentStep.Status status)"""
+class RecruitmentStepChangeStatusBaseView(LoginRequiredMixin, RecruitmentStepOwnedMixin, UpdateView):
+    """Base View for all RecruitmentStep status change Views. Inheriting View must have its own attribute:
+    transition (workflow.Transition of RecruitmentStep)"""
 
     model = RecruitmentStep
     fields = ["status"]
 
-    # Mandatory attributes in a child view
-    statuses_from = None
-    status_to = None
-
-    def test_func(self):
-        step = self.get_object()
-        if self.request.user == step.offer.developer:
-            return True
-        return False
+    # Mandatory attribute in a child view
+    transition = None
 
     def get(self, request, *args, **kwargs):
-        if not self.status_to or not self.statuses_from:
-            raise NotImplementedError(f"{self} needs to have both status_to and statuses_from set.")
+        if not self.transition:
+            raise NotImplementedError(f"{self} needs to have transition set.")
 
-        if (step := self.get_object()).status in self.statuses_from:
-            step.status = self.status_to
-            step.save(update_fields=["status", "updated_on"])
+        workflow.apply(self.transition, [self.get_object()])
         return redirect("offer-list")
 
     def is_step_valid(self):
         step = self.get_object()
-        if step.status in self.statuses_from:
+        if step.status in self.transition.statuses_from:
             return step
 
 
 class RecruitmentStepFinishView(RecruitmentStepChangeStatusBaseView):
-    statuses_from = (RecruitmentStep.Statuses.PLANNED,)
-    status_to = RecruitmentStep.Statuses.FINISHED
+    transition = workflow.STEP_FINISH
 
 
 class RecruitmentStepAcceptView(RecruitmentStepChangeStatusBaseView):
-    statuses_from = (
-        RecruitmentStep.Statuses.CREATED,
-        RecruitmentStep.Statuses.PLANNED,
-        RecruitmentStep.Statuses.FINISHED,
-    )
-    status_to = RecruitmentStep.Statuses.SUCCESS
+    transition = workflow.STEP_ACCEPT
 
 
 class RecruitmentStepRejectView(RecruitmentStepChangeStatusBaseView):
-    statuses_from = (
-        RecruitmentStep.Statuses.CREATED,
-        RecruitmentStep.Statuses.PLANNED,
-        RecruitmentStep.Statuses.FINISHED,
-    )
-    status_to = RecruitmentStep.Statuses.NEGATIVE
+    transition = workflow.STEP_REJECT
 
 
 class RecruitmentStepResignView(RecruitmentStepChangeStatusBaseView):
-    statuses_from = (
-        RecruitmentStep.Statuses.CREATED,
-        RecruitmentStep.Statuses.PLANNED,
-        RecruitmentStep.Statuses.FINISHED,
-    )
-    status_to = RecruitmentStep.Statuses.RESIGNED
+    transition = workflow.STEP_RESIGN
+
+
+class BulkStatusChangeView(LoginRequiredMixin, View):
+    """Applies many status changes in one request and one transaction.
+    Expects JSON body {"items": [{"id": <offer or step id>, "action": <workflow.ACTIONS key>}, ...]}
+    and responds with the result of every item in the same order."""
+
+    max_items = 500
+    owner_lookups = {Offer: "developer", RecruitmentStep: "offer__developer"}
+
+    def get_items(self, request):
+        try:
+            items = json.loads(request.body)["items"]
+            if not isinstance(items, list) or len(items) > self.max_items:
+                raise ValueError
+            return [(int(item["id"]), str(item["action"])) for item in items]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def apply_actions(self, ids_by_action):
+        """Returns result of every pair of id and action"""
+        results = {}
+        for action, ids in ids_by_action.items():
+            if not (transition := workflow.ACTIONS.get(action)):
+                results.update({(obj_id, action): "unknown_action" for obj_id in ids})
+                continue
+
+            owned = transition.model.objects.filter(
+                pk__in=ids, **{self.owner_lookups[transition.model]: self.request.user}
+            )
+            owned_ids = set(owned.values_list("id", flat=True))
+            changed_ids = set(workflow.apply(transition, owned))
+            for obj_id in ids:
+                if obj_id in changed_ids:
+                    results[(obj_id, action)] = "ok"
+                elif obj_id in owned_ids:
+                    results[(obj_id, action)] = "not_allowed"
+                else:
+                    results[(obj_id, action)] = "not_found"
+        return results
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items(request)
+        if items is None:
+            return JsonResponse(
+                {"error": f"Expected JSON object with list of at most {self.max_items} items with id and action."},
+                status=400,
+            )
+
+        ids_by_action = {}
+        for obj_id, action in items:
+            ids_by_action.setdefault(action, []).append(obj_id)
+
+        results = database.run_write(functools.partial(self.apply_actions, ids_by_action))
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": obj_id, "action": action, "result": results[(obj_id, action)]} for obj_id, action in items
+                ]
+            }
+        )
@@ -0,0 +1,212 @@
+"""Status transitions of Offers and RecruitmentSteps.
+
+Every transition is applied as a set of ``UPDATE ... WHERE status IN (...)`` statements in one transaction,
+run again when the database is locked (see ``manager.database``), so it behaves the same for a single object
+and for a batch. Code changing step statuses in bulk (``bulk_update``, ``QuerySet.update``) should call
+``sync_offer_statuses`` afterwards."""
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.dispatch import Signal
+from django.utils import timezone
+
+from manager import database
+from manager.models import DataVersion, Offer, RecruitmentStep
+
+# sent with transition and ids of objects that changed their status, within the transaction
+transition_applied = Signal()
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Change of status allowed only from statuses_from, optionally narrowed by condition"""
+
+    name: str
+    model: type
+    statuses_from: Tuple[int, ...]
+    status_to: int
+    condition: Optional[Callable[[QuerySet], QuerySet]] = None
+    # datetime fields set to the time of transition
+    timestamps: Tuple[str, ...] = field(default=())
+
+    def eligible(self, queryset):
+        queryset = queryset.filter(status__in=self.statuses_from)
+        if self.condition:
+            queryset = self.condition(queryset)
+        return queryset
+
+
+@dataclass(frozen=True)
+class OfferRule:
+    """Offer status following statuses of its RecruitmentSteps"""
+
+    step_statuses: Tuple[int, ...]
+    offer_statuses_from: Tuple[int, ...]
+    offer_status_to: int
+
+
+def latest_step_succeeded(queryset):
+    latest_step_status = RecruitmentStep.objects.filter(offer=OuterRef("pk")).order_by("-id").values("status")[:1]
+    return queryset.annotate(latest_step_status=Subquery(latest_step_status)).filter(
+        latest_step_status=RecruitmentStep.Statuses.SUCCESS
+    )
+
+
+def is_scheduled(queryset):
+    return queryset.filter(scheduled_on__isnull=False)
+
+
+OFFER_SEND = Transition(
+    "send",
+    Offer,
+    statuses_from=(Offer.Statuses.CREATED,),
+    status_to=Offer.Statuses.APPLICATION_SENT,
+    timestamps=("application_sent_on",),
+)
+OFFER_SIGN_CONTRACT = Transition(
+    "sign-contract",
+    Offer,
+    statuses_from=(Offer.Statuses.ACTIVE,),
+    status_to=Offer.Statuses.CONTRACT_SIGNED,
+    condition=latest_step_succeeded,
+)
+OFFER_RESIGN = Transition(
+    "resign",
+    Offer,
+    statuses_from=(
+        Offer.Statuses.CREATED,
+        Offer.Statuses.APPLICATION_SENT,
+        Offer.Statuses.ACTIVE,
+        Offer.Statuses.SUCCESS,
+    ),
+    status_to=Offer.Statuses.RESIGNED,
+)
+
+STEP_STATUSES_OPEN = (
+    RecruitmentStep.Statuses.CREATED,
+    RecruitmentStep.Statuses.PLANNED,
+    RecruitmentStep.Statuses.FINISHED,
+)
+STEP_PLAN = Transition(
+    "plan",
+    RecruitmentStep,
+    statuses_from=(RecruitmentStep.Statuses.CREATED,),
+    status_to=RecruitmentStep.Statuses.PLANNED,
+    condition=is_scheduled,
+)
+STEP_FINISH = Transition(
+    "finish",
+    RecruitmentStep,
+    statuses_from=(RecruitmentStep.Statuses.PLANNED,),
+    status_to=RecruitmentStep.Statuses.FINISHED,
+)
+STEP_ACCEPT = Transition(
+    "accept", RecruitmentStep, statuses_from=STEP_STATUSES_OPEN, status_to=RecruitmentStep.Statuses.SUCCESS
+)
+STEP_REJECT = Transition(
+    "reject", RecruitmentStep, statuses_from=STEP_STATUSES_OPEN, status_to=RecruitmentStep.Statuses.NEGATIVE
+)
+STEP_RESIGN = Transition(
+    "resign", RecruitmentStep, statuses_from=STEP_STATUSES_OPEN, status_to=RecruitmentStep.Statuses.RESIGNED
+)
+
+# transitions available to users, named as their views' URLs
+ACTIONS = {
+    "offer-send": OFFER_SEND,
+    "offer-sign-contract": OFFER_SIGN_CONTRACT,
+    "offer-resign": OFFER_RESIGN,
+    "step-finish": STEP_FINISH,
+    "step-accept": STEP_ACCEPT,
+    "step-reject": STEP_REJECT,
+    "step-resign": STEP_RESIGN,
+}
+
+OFFER_RULES = (
+    OfferRule(
+        step_statuses=(RecruitmentStep.Statuses.CREATED, RecruitmentStep.Statuses.PLANNED),
+        offer_statuses_from=(Offer.Statuses.CREATED, Offer.Statuses.APPLICATION_SENT),
+        offer_status_to=Offer.Statuses.ACTIVE,
+    ),
+    OfferRule(
+        step_statuses=(RecruitmentStep.Statuses.NEGATIVE,),
+        offer_statuses_from=tuple(status for status in Offer.Statuses if status != Offer.Statuses.NEGATIVE),
+        offer_status_to=Offer.Statuses.NEGATIVE,
+    ),
+    OfferRule(
+        step_statuses=(RecruitmentStep.Statuses.RESIGNED,),
+        offer_statuses_from=tuple(status for status in Offer.Statuses if status != Offer.Statuses.RESIGNED),
+        offer_status_to=Offer.Statuses.RESIGNED,
+    ),
+)
+
+
+def as_queryset(model, objects):
+    """Accepts QuerySet, model instances or primary keys"""
+    if isinstance(objects, QuerySet):
+        return objects
+    return model.objects.filter(pk__in=[getattr(obj, "pk", obj) for obj in objects])
+
+
+def apply(transition, objects):
+    """Applies transition to all eligible objects, returns list of ids that changed their status"""
+    now = timezone.now()
+
+    def change_statuses():
+        ids = list(
+            transition.eligible(as_queryset(transition.model, objects))
+            .select_for_update()
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return ids
+
+        transition.model.objects.filter(id__in=ids, status__in=transition.statuses_from).update(
+            status=transition.status_to,
+            updated_on=now,
+            **{timestamp: now for timestamp in transition.timestamps},
+        )
+        if transition.model is RecruitmentStep:
+            sync_offer_statuses(ids, step_statuses=[transition.status_to])
+            DataVersion.objects.bump(RecruitmentStep.objects.filter(id__in=ids).values("offer__developer_id"))
+        else:
+            DataVersion.objects.bump(Offer.objects.filter(id__in=ids).values("developer_id"))
+        transition_applied.send(sender=transition.model, transition=transition, ids=ids)
+        return ids
+
+    ids = database.run_write(change_statuses)
+
+    if not isinstance(objects, QuerySet):
+        for obj in objects:
+            if getattr(obj, "pk", None) in ids:
+                obj.status = transition.status_to
+                obj.updated_on = now
+                for timestamp in transition.timestamps:
+                    setattr(obj, timestamp, now)
+    return ids
+
+
+def sync_offer_statuses(steps, step_statuses=None):
+    """Updates Offers of given steps according to OFFER_RULES, returns number of updated Offers.
+    step_statuses limits rules to check when statuses of the steps are already known"""
+    steps = as_queryset(RecruitmentStep, steps)
+    now = timezone.now()
+    updated = 0
+    with transaction.atomic():
+        for rule in OFFER_RULES:
+            if step_statuses is not None and not set(rule.step_statuses) & set(step_statuses):
+                continue
+            updated += Offer.objects.filter(
+                id__in=steps.filter(status__in=rule.step_statuses).values("offer_id"),
+                status__in=rule.offer_statuses_from,
+            ).update(status=rule.offer_status_to, updated_on=now)
+    return updated
+
+
+def plan_scheduled_step(step):
+    """STEP_PLAN rule for a step instance that is about to be saved"""
+    if step.status in STEP_PLAN.statuses_from and step.scheduled_on:
+        step.status = STEP_PLAN.status_to
@@ -0,0 +1,110 @@
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from PIL import Image
+
+from .storage import profile_image_storage
+
+# square sizes pre-generated for every profile image, the largest one is used on profile page
+RENDITION_SIZES = (32, 64, 128, 300)
+RENDITION_FORMAT = "WEBP"
+RENDITION_EXTENSION = ".webp"
+RENDITION_PATTERN = re.compile(rf"^(?P<root>.+)_(?P<size>\d+){re.escape(RENDITION_EXTENSION)}$")
+# 0 processes images synchronously in the calling thread
+PROFILE_IMAGE_WORKERS = getattr(settings, "PROFILE_IMAGE_WORKERS", 2)
+
+logger = logging.getLogger(__name__)
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PROFILE_IMAGE_WORKERS, thread_name_prefix="profile-image")
+    return _executor
+
+
+def rendition_name(name, size):
+    return f"{os.path.splitext(name)[0]}_{size}{RENDITION_EXTENSION}"
+
+
+def original_name(name):
+    """Returns root of original image name for rendition name, or None if name is not a rendition"""
+    if match := RENDITION_PATTERN.match(name):
+        return match.group("root")
+
+
+def crop_to_square(img):
+    width, height = img.size  # get dimensions
+
+    # check which one is smaller
+    if height < width:
+        # make square by cutting off equal amounts left and right
+        left = (width - height) / 2
+        right = (width + height) / 2
+        top = 0
+        bottom = height
+        img = img.crop((left, top, right, bottom))
+
+    elif width < height:
+        # make square by cutting off bottom
+        left = 0
+        right = width
+        top = 0
+        bottom = width
+        img = img.crop((left, top, right, bottom))
+
+    return img
+
+
+def create_renditions(name, storage=profile_image_storage):
+    """Creates missing square renditions of stored original image in RENDITION_SIZES.
+    Every rendition is written to a temporary file and atomically moved in place,
+    so until it is ready the original image is served instead."""
+    missing = [size for size in RENDITION_SIZES if not storage.exists(rendition_name(name, size))]
+    if not missing:
+        return
+
+    with Image.open(storage.path(name)) as img:
+        square = crop_to_square(img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB"))
+
+    for size in missing:
+        rendition = square.copy()
+        if rendition.width > size:
+            rendition.thumbnail((size, size))
+        path = storage.path(rendition_name(name, size))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=RENDITION_EXTENSION)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                rendition.save(tmp_file, format=RENDITION_FORMAT)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def create_renditions_logged(name):
+    try:
+        create_renditions(name)
+    except Exception:
+        logger.exception("Processing of profile image %s failed", name)
+
+
+def process_profile_image(name):
+    """Creates renditions in background worker pool, or right away when PROFILE_IMAGE_WORKERS is 0"""
+    if PROFILE_IMAGE_WORKERS:
+        return get_executor().submit(create_renditions_logged, name)
+    create_renditions(name)
+
+
+def image_url(image, size, storage=profile_image_storage):
+    """Returns URL of the smallest rendition not smaller than size, or of the original until it is ready"""
+    size = next((rendition_size for rendition_size in RENDITION_SIZES if rendition_size >= size), RENDITION_SIZES[-1])
+    name = rendition_name(image.name, size)
+    if storage.exists(name):
+        return storage.url(name)
+    return image.url
@@ -0,0 +1,62 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from users.images import create_renditions, original_name
+from users.storage import profile_image_storage
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Deletes stored profile images and their renditions that are not referenced by any user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only list files that would be deleted.")
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Skip files younger than this many seconds, they may belong to an upload not committed yet.",
+        )
+        parser.add_argument(
+            "--renditions", action="store_true", help="Also create missing renditions of referenced images."
+        )
+
+    def handle(self, *args, **options):
+        storage = profile_image_storage
+        upload_to = User._meta.get_field("image").upload_to
+        referenced = set(User.objects.values_list("image", flat=True).distinct().iterator())
+        referenced_roots = {os.path.splitext(name)[0] for name in referenced}
+
+        if options["renditions"]:
+            for name in referenced:
+                if storage.exists(name):
+                    create_renditions(name)
+
+        deleted = 0
+        min_mtime = time.time() - options["min_age"]
+        for name in self.walk(storage, upload_to):
+            if name in referenced or original_name(name) in referenced_roots:
+                continue
+            if os.path.getmtime(storage.path(name)) > min_mtime:
+                continue
+            self.stdout.write(f"{'would delete' if options['dry_run'] else 'deleting'} {name}")
+            if not options["dry_run"]:
+                storage.delete(name)
+            deleted += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} unreferenced files {'found' if options['dry_run'] else 'deleted'}.")
+        )
+
+    def walk(self, storage, path):
+        if not storage.exists(path):
+            return
+        directories, files = storage.listdir(path)
+        for filename in files:
+            yield os.path.join(path, filename)
+        for directory in directories:
+            yield from self.walk(storage, os.path.join(path, directory))
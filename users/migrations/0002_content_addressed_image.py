@@ -0,0 +1,19 @@
+# Generated by Django 3.2.19 on 2026-10-18 03:56
+
+from django.db import migrations, models
+import users.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=models.ImageField(default='default_profile_image.jpg', storage=users.storage.ContentAddressedStorage(), upload_to='profile_pics', verbose_name='profile photo'),
+        ),
+    ]
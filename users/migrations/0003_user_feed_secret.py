@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_content_addressed_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_secret',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='calendar feed secret'),
+        ),
+    ]
@@ -2,11 +2,14 @@ from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from PIL import Image
 
+from manager.database import atomic_write
+
+from .images import RENDITION_SIZES, image_url, process_profile_image
+from .storage import profile_image_storage
 from .utils import password_expiration_time
 
 
@@ -35,7 +38,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     image = models.ImageField(
         _("profile photo"),
         default="default_profile_image.jpg",
-        upload_to="profile_pics/%Y",
+        upload_to="profile_pics",
+        storage=profile_image_storage,
     )
     password_expiration = models.DateTimeField(_("password expiration time"), default=password_expiration_time)
 
@@ -52,6 +56,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         ),
     )
     date_joined = models.DateTimeField(_("date joined"), default=timezone.now)
+    # signs the calendar feed URL, reset to revoke it
+    feed_secret = models.CharField(_("calendar feed secret"), max_length=32, blank=True, editable=False)
 
     objects = UserManager()
 
@@ -63,30 +69,33 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = _("user")
         verbose_name_plural = _("users")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image = instance.__dict__.get("image")
+        return instance
+
+    def image_changed(self, update_fields=None):
+        """Returns True if a new image, other than the default one, is being saved"""
+        if update_fields is not None and "image" not in update_fields:
+            return False
+        if "image" in self.get_deferred_fields():
+            return False
+        if not self.image or self.image.name == self.image.field.default:
+            return False
+        return self._state.adding or self.image.name != self._loaded_image
+
+    # logins update last_login, they compete for the lock of the database with other writes
+    @atomic_write
     def save(self, *args, **kwargs):
+        image_changed = self.image_changed(kwargs.get("update_fields"))
         super().save(*args, **kwargs)
+        self._loaded_image = self.image.name
+
+        if image_changed:
+            name = self.image.name
+            transaction.on_commit(lambda: process_profile_image(name))
 
-        img = Image.open(self.image.path)
-        width, height = img.size  # get dimensions
-
-        # check which one is smaller
-        if height < width:
-            # make square by cutting off equal amounts left and right
-            left = (width - height) / 2
-            right = (width + height) / 2
-            top = 0
-            bottom = height
-            img = img.crop((left, top, right, bottom))
-
-        elif width < height:
-            # make square by cutting off bottom
-            left = 0
-            right = width
-            top = 0
-            bottom = width
-            img = img.crop((left, top, right, bottom))
-
-        if width > 300 and height > 300:
-            img.thumbnail((300, 300))
-
-        img.save(self.image.path)
+    def get_image_url(self, size=RENDITION_SIZES[-1]):
+        """Returns URL of profile image rendition fitting size in pixels"""
+        return image_url(self.image, size)
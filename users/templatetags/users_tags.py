@@ -0,0 +1,9 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def profile_image_url(user, size):
+    """Usage: {{ user|profile_image_url:64 }}"""
+    return user.get_image_url(int(size))
@@ -1,7 +1,17 @@
+import io
+import tempfile
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.core import mail
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse, reverse_lazy
+from PIL import Image
+
+from users.images import RENDITION_SIZES, create_renditions, rendition_name
+from users.storage import profile_image_storage
 
 User = get_user_model()
 
@@ -85,3 +95,73 @@ class PasswordResetTestCase(BaseTestCase):
             target_status_code=200,
             fetch_redirect_response=True,
         )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProfileImageTestCase(BaseTestCase):
+    def upload(self, size=(600, 400), color="black"):
+        buffer = io.BytesIO()
+        Image.new("RGB", size, color=color).save(buffer, format="JPEG")
+        return SimpleUploadedFile("photo.JPG", buffer.getvalue(), content_type="image/jpeg")
+
+    def set_image(self, user, upload):
+        with patch("users.models.process_profile_image"):
+            user.image = upload
+            user.save()
+
+    @patch("users.models.process_profile_image")
+    def test_image_not_processed_on_login(self, process_profile_image):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username=USER.get("email"), password=USER.get("pass"))
+        process_profile_image.assert_not_called()
+
+    @patch("users.models.process_profile_image")
+    def test_image_not_processed_without_change(self, process_profile_image):
+        user = User.objects.get(id=self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.username = "changed"
+            user.save()
+        process_profile_image.assert_not_called()
+
+    @patch("users.models.process_profile_image")
+    def test_image_processed_after_commit_when_changed(self, process_profile_image):
+        user = User.objects.get(id=self.user.id)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            user.image = self.upload()
+            user.save()
+        process_profile_image.assert_not_called()
+        for callback in callbacks:
+            callback()
+        process_profile_image.assert_called_once_with(user.image.name)
+
+    def test_identical_uploads_are_stored_once(self):
+        other_user = User.objects.create_user(username="other", email="other@gmail.com", password=USER.get("pass"))
+        self.set_image(self.user, self.upload())
+        self.set_image(other_user, self.upload())
+        self.assertEqual(self.user.image.name, other_user.image.name)
+        self.assertRegex(self.user.image.name, r"^profile_pics/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$")
+
+    def test_create_renditions(self):
+        self.set_image(self.user, self.upload(size=(800, 500)))
+        self.assertEqual(self.user.get_image_url(64), self.user.image.url)
+        create_renditions(self.user.image.name)
+        for size in RENDITION_SIZES:
+            with Image.open(profile_image_storage.path(rendition_name(self.user.image.name, size))) as rendition:
+                self.assertEqual(rendition.size, (size, size))
+                self.assertEqual(rendition.format, "WEBP")
+        self.assertEqual(
+            self.user.get_image_url(50), profile_image_storage.url(rendition_name(self.user.image.name, 64))
+        )
+
+    def test_gc_deletes_only_unreferenced_images(self):
+        self.set_image(self.user, self.upload(color="red"))
+        old_image = self.user.image.name
+        create_renditions(old_image)
+        self.set_image(self.user, self.upload(color="blue"))
+        create_renditions(self.user.image.name)
+
+        call_command("gc_profile_images", min_age=0, stdout=io.StringIO())
+        self.assertFalse(profile_image_storage.exists(old_image))
+        self.assertFalse(profile_image_storage.exists(rendition_name(old_image, 32)))
+        self.assertTrue(profile_image_storage.exists(self.user.image.name))
+        self.assertTrue(profile_image_storage.exists(rendition_name(self.user.image.name, 32)))
@@ -1,5 +1,3 @@
-import os
-
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -7,7 +5,7 @@ from django.contrib.auth.views import (
     PasswordResetConfirmView as DjangoPasswordResetConfirmView,
 )
 from django.contrib.auth.views import PasswordResetView as DjangoPasswordResetView
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import UpdateView
 
@@ -58,17 +56,9 @@ class Profile(LoginRequiredMixin, UpdateView):
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        user = get_object_or_404(klass=self.model, pk=self.request.user.pk)
-        old_image = user.image
-        self.kwargs[self.pk_url_kwarg] = user.pk
-        post = super().post(request, *args, **kwargs)
-        if (
-            get_object_or_404(klass=self.model, pk=self.request.user.pk).image != old_image
-            and os.path.exists(old_image.path)
-            and "default_profile_image.jpg" not in old_image.path
-        ):
-            os.remove(old_image.path)
-        return post
+        # replaced images are content-addressed and may be shared, gc_profile_images command removes unused ones
+        self.kwargs[self.pk_url_kwarg] = self.request.user.pk
+        return super().post(request, *args, **kwargs)
 
     def get_success_url(self):
         return reverse_lazy("profile")